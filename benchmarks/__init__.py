@@ -0,0 +1 @@
+"""Offline benchmarks against a local mock PVGIS server, see benchmarks/run.py."""
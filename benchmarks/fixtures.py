@@ -0,0 +1,160 @@
+"""Synthetic PVGIS responses with the structure and size of the real API output."""
+
+import numpy as np
+
+META = {"inputs": {"location": {"description": "Selected location"}}, "outputs": {"description": "Output values"}}
+
+
+def _hours(startyear, endyear, minute=0):
+    start = np.datetime64(f"{startyear}-01-01T00:{minute:02d}", "m")
+    end = np.datetime64(f"{endyear + 1}-01-01T00:{minute:02d}", "m")
+    return np.arange(start, end, np.timedelta64(60, "m"))
+
+
+def _format(times):
+    # "2010-01-01T00:10" -> "20100101:0010"
+    return [t[:4] + t[5:7] + t[8:10] + ":" + t[11:13] + t[14:16] for t in np.datetime_as_string(times, unit="m")]
+
+
+def _daylight(times, lat):
+    hour = (times - times.astype("datetime64[D]")).astype(np.float64) / 60
+    day = (times.astype("datetime64[D]") - times.astype("datetime64[Y]")).astype(np.float64)
+    declination = np.radians(23.44) * np.sin(2 * np.pi * (day - 80) / 365)
+    phi = np.radians(lat)
+    hour_angle = np.radians(15 * (hour - 12))
+    sin_elevation = np.sin(phi) * np.sin(declination) + np.cos(phi) * np.cos(declination) * np.cos(hour_angle)
+    return np.clip(sin_elevation, 0, 1), np.degrees(np.arcsin(np.clip(sin_elevation, -1, 1)))
+
+
+def seriescalc(params: dict) -> dict:
+    lat = float(params.get("lat", 45))
+    startyear = int(params.get("startyear", 2005))
+    endyear = int(params.get("endyear", 2023))
+    pv = int(params.get("pvcalculation", 0)) == 1
+    components = int(params.get("components", 0)) == 1
+
+    times = _hours(startyear, endyear, minute=10)
+    rng = np.random.default_rng(startyear * 1000 + int(lat * 10))
+    sun, elevation = _daylight(times, lat)
+    clearness = rng.uniform(0.2, 1.0, len(times))
+    irradiance = np.round(1000 * sun * clearness, 2)
+    temperature = np.round(10 + 10 * sun + rng.normal(0, 3, len(times)), 2)
+    wind = np.round(rng.uniform(0, 8, len(times)), 2)
+
+    columns = {}
+    if pv:
+        peakpower = float(params.get("peakpower", 1))
+        loss = float(params.get("loss", 14))
+        columns["P"] = np.round(irradiance * peakpower * (1 - loss / 100) * 0.95, 2)
+    if components:
+        columns["Gb(i)"] = np.round(irradiance * 0.7, 2)
+        columns["Gd(i)"] = np.round(irradiance * 0.3, 2)
+        columns["Gr(i)"] = np.zeros(len(times))
+    else:
+        columns["G(i)"] = irradiance
+    columns["H_sun"] = np.round(np.maximum(elevation, 0), 2)
+    columns["T2m"] = temperature
+    columns["WS10m"] = wind
+
+    names = list(columns)
+    values = [columns[name].tolist() for name in names]
+    rows = [dict(zip(["time"] + names, row), Int=0) for row in zip(_format(times), *values)]
+    return {
+        "inputs": {
+            "location": {"latitude": lat, "longitude": float(params.get("lon", 9)), "elevation": 250.0},
+            "meteo_data": {"radiation_db": params.get("raddatabase", "PVGIS-SARAH3"), "meteo_db": "ERA5",
+                           "year_min": startyear, "year_max": endyear, "use_horizon": True,
+                           "horizon_db": "DEM-calculated"},
+            "mounting_system": {"fixed": {"slope": {"value": float(params.get("angle", 0)), "optimal": False},
+                                          "azimuth": {"value": float(params.get("aspect", 0)), "optimal": False},
+                                          "type": "free-standing"}},
+        },
+        "outputs": {"hourly": rows},
+        "meta": META,
+    }
+
+
+def tmy(params: dict) -> dict:
+    lat = float(params.get("lat", 45))
+    times = _hours(2015, 2015)
+    rng = np.random.default_rng(int(lat * 10))
+    sun, _ = _daylight(times, lat)
+    global_horizontal = np.round(1000 * sun * rng.uniform(0.2, 1.0, len(times)), 2)
+    columns = {
+        "T2m": np.round(10 + 10 * sun + rng.normal(0, 3, len(times)), 2),
+        "RH": np.round(rng.uniform(40, 100, len(times)), 2),
+        "G(h)": global_horizontal,
+        "Gb(n)": np.round(global_horizontal * 0.9, 2),
+        "Gd(h)": np.round(global_horizontal * 0.3, 2),
+        "IR(h)": np.round(rng.uniform(250, 400, len(times)), 2),
+        "WS10m": np.round(rng.uniform(0, 8, len(times)), 2),
+        "WD10m": np.round(rng.uniform(0, 360, len(times)), 0),
+        "SP": np.round(rng.uniform(97000, 103000, len(times)), 0),
+    }
+    names = list(columns)
+    rows = [dict(zip(["time(UTC)"] + names, row))
+            for row in zip(_format(times), *(columns[name].tolist() for name in names))]
+    return {
+        "inputs": {"location": {"latitude": lat, "longitude": float(params.get("lon", 9)), "elevation": 250.0},
+                   "meteo_data": {"radiation_db": params.get("raddatabase", "PVGIS-SARAH3"), "meteo_db": "ERA5",
+                                  "year_min": 2005, "year_max": 2023, "use_horizon": True}},
+        "outputs": {"months_selected": [{"month": month, "year": 2005 + month, "T2m": 0, "G(h)": 0}
+                                        for month in range(1, 13)],
+                    "tmy_hourly": rows},
+        "meta": META,
+    }
+
+
+def drcalc(params: dict) -> dict:
+    lat = float(params.get("lat", 45))
+    month = int(params.get("month", 1))
+    months = range(1, 13) if month == 0 else [month]
+    rows = []
+    for m in months:
+        times = np.array([f"2015-{m:02d}-15T{hour:02d}:00" for hour in range(24)], dtype="datetime64[m]")
+        sun, _ = _daylight(times, lat)
+        for hour, s in enumerate(sun):
+            rows.append({"month": m, "time": f"{hour:02d}:00", "G(i)": round(800 * s, 2),
+                         "Gb(i)": round(550 * s, 2), "Gd(i)": round(250 * s, 2)})
+    return {"inputs": {"location": {"latitude": lat, "longitude": float(params.get("lon", 9))}},
+            "outputs": {"daily_profile": rows}, "meta": META}
+
+
+def mrcalc(params: dict) -> dict:
+    startyear = int(params.get("startyear", 2005))
+    endyear = int(params.get("endyear", 2023))
+    rng = np.random.default_rng(startyear)
+    rows = [{"year": year, "month": month, "H(h)_m": round(float(rng.uniform(20, 200)), 2)}
+            for year in range(startyear, endyear + 1) for month in range(1, 13)]
+    return {"inputs": {"location": {"latitude": float(params.get("lat", 45)),
+                                    "longitude": float(params.get("lon", 9))}},
+            "outputs": {"monthly": rows}, "meta": META}
+
+
+def to_csv(response: dict, series_key: str) -> str:
+    """
+    Render a seriescalc or tmy response like the csv output of PVGIS: header lines, table and legend.
+    """
+    inputs = response["inputs"]
+    lines = [f"Latitude (decimal degrees):\t{inputs['location']['latitude']:.3f}",
+             f"Longitude (decimal degrees):\t{inputs['location']['longitude']:.3f}",
+             f"Elevation (m):\t{inputs['location']['elevation']:.0f}",
+             f"Radiation database:\t{inputs['meteo_data']['radiation_db']}", ""]
+    if "mounting_system" in inputs:
+        fixed = inputs["mounting_system"]["fixed"]
+        lines += [f"Slope: {fixed['slope']['value']:.0f} deg. ", f"Azimuth: {fixed['azimuth']['value']:.0f} deg. "]
+    if "months_selected" in response["outputs"]:
+        lines.append("month,year")
+        lines += [f"{month['month']},{month['year']}" for month in response["outputs"]["months_selected"]]
+
+    rows = response["outputs"][series_key]
+    names = list(rows[0])
+    lines.append(",".join(names))
+    lines += [",".join(str(row[name]) for name in names) for row in rows]
+    lines += ["", *(f"{name}: {name} values (W/m2)" for name in names[1:]), "",
+              "PVGIS (c) European Union, 2001-2024"]
+    return "\r\n".join(lines) + "\r\n"
+
+
+GENERATORS = {"seriescalc": seriescalc, "tmy": tmy, "DRcalc": drcalc, "MRcalc": mrcalc}
+SERIES_KEYS = {"seriescalc": "hourly", "tmy": "tmy_hourly"}
@@ -0,0 +1,174 @@
+"""Local stand-in for the PVGIS API, replaying recorded or synthetic responses."""
+
+import gzip
+import json
+import os
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from benchmarks import fixtures
+from src.pvgispy.cache import request_key
+from src.pvgispy.transport import Transport
+
+
+class MockPVGIS:
+    def __init__(self, fixture_dir: str = None, latency: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = None, gzip_responses: bool = True, seed: int = 0):
+        """
+        Threaded HTTP server answering seriescalc, tmy, DRcalc and MRcalc requests.
+
+        Responses are read from fixture_dir if a recording for the request exists (see record),
+        otherwise they are generated by benchmarks.fixtures. Bodies are built once per request and reused.
+
+        :param latency: Delay added to every response in seconds.
+        :param error_rate: Fraction of requests answered with a 503.
+        :param rate_limit: Requests per second, excess requests get a 429 with Retry-After.
+        :param gzip_responses: Compress bodies if the client accepts gzip.
+        """
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.gzip_responses = gzip_responses
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+        self._random = random.Random(seed)
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0
+        self._refilled = time.monotonic()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v5_3/"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately, avoid Nagle / delayed ACK stalls.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                mock._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _admit(self):
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit is None:
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.throttled += 1
+            return False
+
+    def body(self, endpoint: str, params: dict, accept_gzip: bool = False) -> bytes:
+        key = (request_key(endpoint, params), accept_gzip)
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            body = self._load(endpoint, params)
+            if accept_gzip:
+                body = gzip.compress(body, compresslevel=6)
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+    def _load(self, endpoint, params):
+        if self.fixture_dir is not None:
+            path = os.path.join(self.fixture_dir, f"{endpoint}-{request_key(endpoint, params)}.json")
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    return file.read()
+        response = fixtures.GENERATORS[endpoint](params)
+        if params.get("outputformat") in ("csv", "basic") and endpoint in fixtures.SERIES_KEYS:
+            return fixtures.to_csv(response, fixtures.SERIES_KEYS[endpoint]).encode("utf-8")
+        return json.dumps(response).encode("utf-8")
+
+    def _handle(self, handler):
+        url = urlsplit(handler.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = dict(parse_qsl(url.query))
+        if self.latency:
+            time.sleep(self.latency)
+
+        if not self._admit():
+            return self._send(handler, 429, b"Too many requests", {"Retry-After": "1"})
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+        if failed:
+            return self._send(handler, 503, b"Service unavailable")
+        if endpoint not in fixtures.GENERATORS:
+            return self._send(handler, 404, json.dumps({"message": "Unknown endpoint"}).encode())
+
+        accept_gzip = self.gzip_responses and "gzip" in handler.headers.get("Accept-Encoding", "")
+        csv = params.get("outputformat") in ("csv", "basic")
+        headers = {"Content-Type": "text/csv" if csv else "application/json"}
+        if accept_gzip:
+            headers["Content-Encoding"] = "gzip"
+        self._send(handler, 200, self.body(endpoint, params, accept_gzip), headers)
+
+    @staticmethod
+    def _send(handler, status, body, headers=None):
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def record(endpoint: str, params: dict, fixture_dir: str, base_url: str = "https://re.jrc.ec.europa.eu/api/v5_3/"):
+    """
+    Record a live PVGIS response, so MockPVGIS replays it instead of synthetic data.
+
+    :return: path of the recording.
+    """
+    response = Transport().get(base_url + endpoint, params=params)
+    response.raise_for_status()
+    os.makedirs(fixture_dir, exist_ok=True)
+    # The server sees query strings, so recordings are keyed by the string form of the params.
+    key = request_key(endpoint, {k: str(v) for k, v in params.items() if v is not None})
+    path = os.path.join(fixture_dir, f"{endpoint}-{key}.json")
+    with open(path, "wb") as file:
+        file.write(response.content)
+    return path
@@ -0,0 +1,189 @@
+"""
+Offline benchmark suite against a local mock PVGIS server.
+
+Run from the repository root:
+
+    python -m benchmarks.run --output bench.json
+
+Results are written as json, one entry per benchmark case, so runs of different releases can be compared.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import TMY, Daily, Hourly, Monthly, Transport, csvformat, fetch_many
+from src.pvgispy.base import BaseAPI
+from src.pvgispy.series import TimeSeries
+from src.pvgispy.stream import read_series
+
+
+def measure(function, repeat: int = 3, memory: bool = False):
+    """
+    Returns the median wall time of `repeat` calls, and the peak traced memory of one extra call if requested.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    result = {"seconds": statistics.median(times), "min_seconds": min(times), "runs": repeat}
+    if memory:
+        tracemalloc.start()
+        function()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def hourly(years: int, **kwargs):
+    return Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2023 - years + 1, endyear=2023,
+                  **kwargs)
+
+
+def bench_fetch(server, transport, repeat, years_list):
+    """
+    End-to-end fetch latency per endpoint and size, over a pooled connection.
+    """
+    cases = {f"Hourly {years}y": (lambda years=years: hourly(years, transport=transport)) for years in years_list}
+    cases.update({
+        "TMY": lambda: TMY(lat=51, lon=9, transport=transport),
+        "Daily": lambda: Daily(lat=51, lon=9, month=6, transport=transport),
+        "Monthly": lambda: Monthly(lat=51, lon=9, transport=transport),
+    })
+    for name, build in cases.items():
+        build().fetch_data()  # warm the server side body cache and the connection
+        yield {"benchmark": "fetch", "case": name, **measure(lambda: build().fetch_data(), repeat)}
+
+    for years in years_list:
+        for mode in ("stream", "compact"):
+            build = (lambda years=years, mode=mode: hourly(years, transport=transport, **{mode: True}))
+            build().fetch_data()
+            yield {"benchmark": "fetch", "case": f"Hourly {years}y {mode}",
+                   **measure(lambda: build().fetch_data(), repeat)}
+
+
+def bench_parse(server, repeat, years_list):
+    """
+    Decode time and peak memory of hourly bodies: json rows, columnar conversion, streaming and csv.
+    """
+    for years in years_list:
+        params = {k: str(v) for k, v in hourly(years).params.items()}
+        body = server.body("seriescalc", params)
+        rows = json.loads(body)["outputs"]["hourly"]
+        chunks = [body[start:start + 65536] for start in range(0, len(body), 65536)]
+        size = {"body_bytes": len(body), "rows": len(rows)}
+
+        yield {"benchmark": "parse", "case": f"json {years}y", **size,
+               **measure(lambda: json.loads(body), repeat, memory=True)}
+        yield {"benchmark": "parse", "case": f"json + columnar {years}y", **size,
+               **measure(lambda: TimeSeries.from_records(json.loads(body)["outputs"]["hourly"]), repeat, memory=True)}
+        yield {"benchmark": "parse", "case": f"stream {years}y", **size,
+               **measure(lambda: read_series(chunks, "hourly"), repeat, memory=True)}
+
+        csv = server.body("seriescalc", dict(params, outputformat="csv"))
+        yield {"benchmark": "parse", "case": f"csv {years}y", "body_bytes": len(csv), "rows": len(rows),
+               **measure(lambda: csvformat.parse(csv, "hourly"), repeat, memory=True)}
+
+
+def bench_aggregate(server, transport, repeat, years_list):
+    """
+    Throughput of the aggregations on fetched data.
+    """
+    for years in years_list:
+        for columnar in (False, True):
+            api = hourly(years, transport=transport, columnar=columnar)
+            api.fetch_data()
+            rows = len(api.hourly())
+            label = f"{years}y {'columnar' if columnar else 'rows'}"
+
+            def fresh(method, *args, **kwargs):
+                # Drop the memoized series so every run pays the full cost.
+                api._load(api.data)
+                return getattr(api, method)(*args, **kwargs)
+
+            for name, call in (("yearly_pv_production", lambda: fresh("yearly_pv_production")),
+                               ("aggregate month mean", lambda: fresh("aggregate", "G(i)", "month", "mean")),
+                               ("aggregate hour p90", lambda: fresh("aggregate", "P", "hour", "percentile", 90))):
+                result = measure(call, repeat)
+                yield {"benchmark": "aggregate", "case": f"{name} {label}", "rows": rows,
+                       "rows_per_second": rows / result["seconds"], **result}
+
+
+def bench_sites(server, transport, sites_list, workers):
+    """
+    Batch fetch of many distinct sites with fetch_many.
+    """
+    for sites in sites_list:
+        grid = np.linspace(40, 55, max(sites, 1))
+        items = [{"lat": float(lat), "lon": 9.0, "month": 6, "transport": transport} for lat in grid[:sites]]
+        result = measure(lambda: fetch_many(items, endpoint=Daily, max_workers=workers), repeat=1)
+        yield {"benchmark": "sites", "case": f"Daily x{sites}", "sites": sites, "workers": workers,
+               "sites_per_second": sites / result["seconds"], **result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write results to this json file instead of stdout.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 19], help="Hourly year ranges to test.")
+    parser.add_argument("--sites", type=int, nargs="+", default=[1, 100], help="Batch sizes, e.g. 1 100 10000.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server latency per request in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="Mock server requests per second.")
+    parser.add_argument("--fixtures", help="Directory of recorded responses to replay.")
+    parser.add_argument("--only", nargs="+", choices=["fetch", "parse", "aggregate", "sites"])
+    args = parser.parse_args(argv)
+
+    selected = set(args.only or ["fetch", "parse", "aggregate", "sites"])
+    results = []
+    base_url = BaseAPI.BASE_URL
+    with MockPVGIS(args.fixtures, args.latency, args.error_rate, args.rate_limit) as server:
+        BaseAPI.BASE_URL = server.url
+        transport = Transport(retries=5, backoff=0.05, pool_size=max(args.workers, 10))
+        try:
+            if "fetch" in selected:
+                results.extend(bench_fetch(server, transport, args.repeat, args.years))
+            if "parse" in selected:
+                results.extend(bench_parse(server, args.repeat, args.years))
+            if "aggregate" in selected:
+                results.extend(bench_aggregate(server, transport, args.repeat, args.years))
+            if "sites" in selected:
+                results.extend(bench_sites(server, transport, args.sites, args.workers))
+        finally:
+            BaseAPI.BASE_URL = base_url
+            transport.close()
+        server_stats = {"requests": server.requests, "throttled": server.throttled, "errors": server.errors}
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "args": vars(args),
+            "server": server_stats,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 from pvgispy import Hourly, TMY
-import pandas as pd
 
 hourly = Hourly(
     lat=51.0,
@@ -11,7 +10,8 @@ hourly = Hourly(
     pvcalculation=False, # disable pv claulations, we only want radiation data
 )
 
-df_hourly = pd.json_normalize(hourly.hourly())
+# DataFrame with a UTC DatetimeIndex, pandas is only imported here
+df_hourly = hourly.to_frame()
 
 print(df_hourly.head())
 
@@ -23,6 +23,6 @@ tmy = TMY(
     lon=9.0,
 )
 
-df_tmy = pd.json_normalize(tmy.hourly())
+df_tmy = tmy.to_frame()
 
-print(df_tmy.head())
\ No newline at end of file
+print(df_tmy.head())
@@ -8,7 +8,16 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "requests"
+        "requests",
+        "numpy"
     ],
+    extras_require={
+        "async": ["aiohttp"],
+        "arrow": ["pyarrow"],
+        "pandas": ["pandas"],
+    },
+    entry_points={
+        "console_scripts": ["pvgispy=pvgispy.cli:main"],
+    },
     license='MIT',
 )
@@ -1,8 +1,20 @@
 """An interface for the PVGIS Api."""
 
+from .batch import BatchResult, fetch_many
+from .cache import ResponseCache
 from .daily import Daily
+from .exceptions import APIError, PVGISError
+from .flight import SingleFlight
+from .governor import RateGovernor
 from .hourly import Hourly
+from .metrics import Metrics
 from .monthly import Monthly
+from .portfolio import Portfolio
+from .spatial import SiteIndex
+from .sweep import OrientationSweep
 from .tmy import TMY
+from .transport import Transport
 
-__all__ = ["Daily", "Hourly", "TMY", "Monthly"]
+__all__ = ["Daily", "Hourly", "TMY", "Monthly", "ResponseCache", "Transport", "APIError", "PVGISError", "BatchResult",
+           "fetch_many", "OrientationSweep", "SiteIndex", "Metrics",
+           "Portfolio", "RateGovernor", "SingleFlight"]
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import time
+import weakref
+
+from .cache import request_key
+from .daily import Daily
+from .hourly import Hourly
+from .metrics import NULL_RECORD, track
+from .monthly import Monthly
+from .tmy import TMY
+from .transport import Transport
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncResponse:
+    def __init__(self, status_code: int, headers, content: bytes):
+        """
+        Fully read response, mirroring the parts of requests.Response used by BaseAPI.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class AsyncTransport(Transport):
+    def __init__(self, *args, **kwargs):
+        """
+        asyncio counterpart of Transport, based on aiohttp.
+
+        Takes the same arguments as Transport. One pooled aiohttp.ClientSession is kept per event loop,
+        pool_size bounds the number of open connections.
+        """
+        if aiohttp is None:
+            raise ImportError("The async client requires aiohttp. Install it with 'pip install pvgispy[async]'.")
+        super().__init__(*args, **kwargs)
+        self._sessions = weakref.WeakKeyDictionary()
+
+    @property
+    def session(self):
+        """
+        Returns the pooled session of the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            if isinstance(self.timeout, tuple):
+                timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+            else:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers)
+            self._sessions[loop] = session
+        return session
+
+    async def get(self, url: str, params: dict = None, stream: bool = False) -> AsyncResponse:
+        """
+        Send a GET request, retrying transient failures. See Transport.get.
+        The body is always read completely, stream is accepted for compatibility.
+        """
+        params = {k: str(v) for k, v in (params or {}).items()}
+        attempt = 0
+        backoff = 0.0
+        while True:
+            ticket = await self.governor.acquire_async() if self.governor is not None else None
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url, params=params) as raw:
+                    wait = time.perf_counter() - start
+                    response = AsyncResponse(raw.status, raw.headers, await raw.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self._report(ticket, None)
+                if attempt >= self.retries:
+                    raise
+                response = None
+            except BaseException:
+                if ticket is not None:
+                    self.governor.cancel(ticket)
+                raise
+            else:
+                self._report(ticket, response)
+
+            if response is not None and (response.status_code not in self.RETRY_STATUS or attempt >= self.retries):
+                response.retries = attempt
+                response.timings = self.timings(start, wait, backoff)
+                return response
+
+            delay = self._delay(attempt, response)
+            await asyncio.sleep(delay)
+            backoff += delay
+            attempt += 1
+
+    async def aclose(self):
+        """
+        Close the session of the running event loop.
+        """
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def close(self):
+        raise RuntimeError("Use 'await transport.aclose()' to close an AsyncTransport.")
+
+
+def _accessor(name):
+    async def method(self, *args, **kwargs):
+        await self._ensure_data()
+        return getattr(self.api, name)(*args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = f"Async version of {name}(), fetches the data first if needed."
+    return method
+
+
+class AsyncAPI:
+    # Synchronous endpoint class providing parameter construction, validation and analysis.
+    API = None
+    transport: AsyncTransport = None
+
+    def __init__(self, *args, transport: AsyncTransport = None, **kwargs):
+        """
+        Async wrapper around a synchronous endpoint. Takes the same arguments as the wrapped class.
+
+        :param transport: (Optional) AsyncTransport used instead of a process-wide default.
+        """
+        if kwargs.get("preload") or kwargs.get("prefetch"):
+            raise ValueError("preload and prefetch are not supported for async endpoints, "
+                             "use 'await fetch_data()' or asyncio.create_task(api.fetch_data()) instead.")
+        self.api = self.API(*args, **kwargs)
+
+        if transport is not None:
+            self.transport = transport
+        elif self.transport is None:
+            AsyncAPI.transport = AsyncTransport()
+
+    def __getattr__(self, name):
+        # Parameters, data and synchronous helpers are served by the wrapped endpoint.
+        if name == "api":
+            raise AttributeError(name)
+        return getattr(self.api, name)
+
+    async def fetch_data(self):
+        """
+        Fetch data from the API, or from the response cache or site index if configured.
+        """
+        api = self.api
+        endpoint = api._get_endpoint()
+        params = api.params
+
+        with track(api.metrics, endpoint) as record:
+            data = await self._fetch(endpoint, params, record)
+            with record.phase("load"):
+                api._load(data)
+
+    async def _fetch(self, endpoint, params, record):
+        """
+        Async version of BaseAPI._fetch.
+        """
+        api = self.api
+        data = api._lookup(endpoint, params, record)
+        if data is not None:
+            return data
+        if api.single_flight is None:
+            return await self._download(endpoint, params, record)
+
+        data, shared = await api.single_flight.do_async(api._flight_key(endpoint, params),
+                                                        lambda: self._download(endpoint, params, record))
+        if shared:
+            record.source = "shared"
+        return data
+
+    async def _download(self, endpoint, params, record):
+        response = await self.transport.get(endpoint, params=params)
+        data = self.api._receive(response, record)
+        self.api._store(endpoint, params, data)
+        return data
+
+    async def _ensure_data(self):
+        if self.api.data is None:
+            await self.fetch_data()
+
+
+class AsyncDaily(AsyncAPI):
+    API = Daily
+
+    async def fetch_data(self):
+        """
+        Fetch data from the API. With share_months the month is taken from a shared month=0 response.
+        """
+        api = self.api
+        if not api.share_months:
+            return await super().fetch_data()
+
+        endpoint = api._get_endpoint()
+        with track(api.metrics, endpoint) as record:
+            data = await self._fetch_all_months(endpoint, record)
+            with record.phase("load"):
+                api._load(data if api.month == 0 else Daily.month_view(data, api.month))
+
+    async def _fetch_all_months(self, endpoint, record=NULL_RECORD):
+        """
+        Async version of Daily._fetch_all_months, the month=0 response is shared with sync Daily objects.
+        """
+        params = dict(self.api.params, month=0)
+        key = request_key(endpoint, params)
+        data = Daily.shared_response(key)
+        if data is not None:
+            record.source = "shared"
+            return data
+        data = await self._fetch(endpoint, params, record)
+        Daily.share_response(key, data)
+        return data
+
+    async def all_months(self) -> dict:
+        """
+        Async version of all_months(), the month=0 request is sent without blocking the event loop.
+        """
+        if self.api.month == 0:
+            await self._ensure_data()
+            data = self.api.data
+        else:
+            data = await self._fetch_all_months(self.api._get_endpoint())
+        return Daily.split_months(data)
+
+    total_irradiance = _accessor("total_irradiance")
+    irradiance = _accessor("irradiance")
+    to_frame = _accessor("to_frame")
+
+
+class AsyncHourly(AsyncAPI):
+    API = Hourly
+
+    async def fetch_data(self):
+        """
+        Fetch data from the API. With chunk_years the year range is fetched as concurrent requests.
+        """
+        ranges = self.api.year_ranges()
+        if len(ranges) == 1:
+            return await super().fetch_data()
+
+        chunks = []
+        for years in ranges:
+            kwargs = self.api._chunk_kwargs(*years)
+            del kwargs["transport"]
+            chunk = AsyncHourly(transport=self.transport, **kwargs)
+            chunk.api.BASE_URL = self.api.BASE_URL
+            chunks.append(chunk)
+        await gather(chunks, limit=self.api.chunk_workers)
+        self.api._load(self.api.stitch([chunk.data for chunk in chunks]))
+
+    hourly = _accessor("hourly")
+    yearly_pv_production = _accessor("yearly_pv_production")
+    simulate = _accessor("simulate")
+    series = _accessor("series")
+    aggregate = _accessor("aggregate")
+    to_frame = _accessor("to_frame")
+
+
+class AsyncMonthly(AsyncAPI):
+    API = Monthly
+
+    yearly_values = _accessor("yearly_values")
+    monthly_average = _accessor("monthly_average")
+    to_frame = _accessor("to_frame")
+
+
+class AsyncTMY(AsyncAPI):
+    API = TMY
+
+    months_selected = _accessor("months_selected")
+    hourly = _accessor("hourly")
+    yearly_irradiation = _accessor("yearly_irradiation")
+    series = _accessor("series")
+    aggregate = _accessor("aggregate")
+    to_frame = _accessor("to_frame")
+
+
+async def gather(apis, limit: int = 10, return_exceptions: bool = False):
+    """
+    Fetch many async endpoints concurrently, with at most `limit` requests in flight.
+
+    :param apis: Iterable of AsyncDaily, AsyncHourly, AsyncMonthly or AsyncTMY objects.
+    :param limit: Maximum number of concurrent requests.
+    :param return_exceptions: Return errors in place of the data instead of raising the first one.
+    :return: list of the fetched data, in input order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def fetch(api):
+        async with semaphore:
+            await api.fetch_data()
+        return api.data
+
+    return await asyncio.gather(*(fetch(api) for api in apis), return_exceptions=return_exceptions)
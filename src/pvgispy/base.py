@@ -1,17 +1,105 @@
+import functools
 import json
-import requests
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+
+from . import coverage, csvformat, frame, spatial, storage
+from .cache import ResponseCache, request_key
+from .exceptions import APIError
+from .flight import SingleFlight
+from .metrics import NULL_RECORD, Metrics, timed, track
+from .series import TimeSeries, as_series, json_default
+from .stream import SeriesStream, read_series
+from .transport import Transport
+
+
+def memoized(method):
+    """
+    Decorator keeping the result of an analysis method until the data or the parameters change.
+    Calls with unhashable or callable arguments, e.g. custom group labels or functions, are not memoized.
+    Callables would be keyed by identity, so a new lambda per call would add an entry every time.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if any(callable(value) for value in (*args, *kwargs.values())):
+            return method(self, *args, **kwargs)
+        try:
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            result = self._memo.get(key, wrapper)
+        except TypeError:
+            return method(self, *args, **kwargs)
+
+        if result is wrapper:
+            result = method(self, *args, **kwargs)
+            # Memoize after the call, it may have fetched and thereby reset the memo.
+            self._memo[key] = result
+        # Callers get their own copy of the results, which are flat dicts (of lists) of numbers.
+        if isinstance(result, dict):
+            return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+        return list(result) if isinstance(result, list) else result
+
+    return wrapper
 
 
 class BaseAPI:
     BASE_URL = "https://re.jrc.ec.europa.eu/api/v5_3/"
     BASE_URL_V2 = "https://re.jrc.ec.europa.eu/api/v5_2/"
     BASE_URL_V1 = "https://re.jrc.ec.europa.eu/api/v5_1/"
+    # Radiation databases the endpoint accepts, None for all. Used to route requests, see coverage.
+    RADDATABASES = None
+    # Key of the hourly series in "outputs" for endpoints that support streaming.
+    SERIES_KEY = None
+    CHUNK_SIZE = 64 * 1024
+    stream = False
+
+    # Shared response cache, set e.g. BaseAPI.cache = ResponseCache() to enable it globally.
+    cache: ResponseCache = None
+    # Pooled HTTP transport shared by all endpoint instances of this process.
+    transport: Transport = Transport()
+    # Shared nearest-neighbour index of fetched sites, e.g. BaseAPI.site_index = SiteIndex(tolerance=1).
+    site_index: spatial.SiteIndex = None
+    # Shared instrumentation, e.g. BaseAPI.metrics = Metrics() to record timings of every request.
+    metrics: Metrics = None
+    # Coalesces concurrent identical requests of all endpoint instances, None sends every request itself.
+    single_flight: SingleFlight = SingleFlight()
+    # Executor running prefetch requests, created with PREFETCH_WORKERS threads on first use.
+    prefetch_executor: Executor = None
+    PREFETCH_WORKERS = 16
+    _prefetch_lock = threading.Lock()
 
-    def __init__(self, lat: float, lon: float,  **kwargs):
+    def __init__(self, lat: float, lon: float, cache: ResponseCache = None, transport: Transport = None,
+                 snap=False, site_index: spatial.SiteIndex = None, metrics: Metrics = None, route: bool = False,
+                 single_flight: SingleFlight = None, prefetch=False, **kwargs):
         """
         Constructor to initialize any common parameters for API calls.
+
+        :param cache: (Optional) ResponseCache used instead of the class-wide BaseAPI.cache.
+        :param transport: (Optional) Transport used instead of the class-wide BaseAPI.transport.
+        :param snap: (Optional) Snap lat and lon to the center of the radiation database grid cell, so nearby
+                     coordinates share one request. True uses the resolution of raddatabase, a float sets it in degrees.
+        :param site_index: (Optional) SiteIndex used instead of the class-wide BaseAPI.site_index.
+        :param metrics: (Optional) Metrics used instead of the class-wide BaseAPI.metrics.
+        :param route: (Optional) Choose raddatabase and API version from the local coverage index before sending,
+                      instead of sending a request that fails because the database doesn't cover the site or years.
+                      A given raddatabase is kept if it covers the site, else the next covering one is used.
+                      Raises a PVGISError if no database covers the site. See coverage.DATABASES.
+        :param single_flight: (Optional) SingleFlight used instead of the class-wide BaseAPI.single_flight.
+        :param prefetch: (Optional) Start fetching in the background right away, see prefetch. True uses the
+                         class-wide BaseAPI.prefetch_executor, an Executor runs the request there.
         """
         if -90 <= lat <= 90 and -180 <= lon <= 180:
+            self.route = route
+            self.database = None
+            if route:
+                startyear = kwargs.get("startyear", getattr(self, "startyear", None))
+                endyear = kwargs.get("endyear", getattr(self, "endyear", None))
+                self.database = coverage.route(lat, lon, kwargs.get("raddatabase"), startyear, endyear,
+                                               names=self.RADDATABASES)
+                kwargs["raddatabase"] = self.database.name
+                self.BASE_URL = self.version_url(self.database.version)
+            if snap:
+                resolution = None if snap is True else snap
+                lat, lon = spatial.snap(lat, lon, kwargs.get("raddatabase", "PVGIS-SARAH3"), resolution)
             self.lat = lat
             self.lon = lon
         else:
@@ -19,6 +107,24 @@ class BaseAPI:
 
         self._params = kwargs
         self.data = None
+        self._series = None
+        self._memo = {}
+        self._future = None
+        # Incremented whenever the parameters change, see set_params.
+        self.version = 0
+
+        if cache is not None:
+            self.cache = cache
+        if transport is not None:
+            self.transport = transport
+        if site_index is not None:
+            self.site_index = site_index
+        if metrics is not None:
+            self.metrics = metrics
+        if single_flight is not None:
+            self.single_flight = single_flight
+        if prefetch:
+            self.prefetch(None if prefetch is True else prefetch)
 
     @property
     def params(self):
@@ -28,6 +134,121 @@ class BaseAPI:
     def params(self, value):
         self._params = value
 
+    def set_params(self, **kwargs):
+        """
+        Update or set parameters, e.g. set_params(angle=30, raddatabase="PVGIS-ERA5").
+
+        Takes the arguments of the constructor and validates them the same way. If the request changes,
+        the fetched data and memoized results are dropped and the next access fetches again.
+        """
+        self._settle()
+        updated = type(self)(**dict(self._init_kwargs(), **kwargs))
+        changed = updated._init_kwargs() != self._init_kwargs()
+        if self.route and not updated.route:
+            # Drop the URL of the routed API version.
+            vars(self).pop("BASE_URL", None)
+        for key, value in vars(updated).items():
+            if key not in ("data", "_series", "_memo", "_future", "version"):
+                setattr(self, key, value)
+        if changed:
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop fetched data and memoized results, e.g. after the parameters changed.
+        """
+        self._settle()
+        self.data = None
+        self._series = None
+        self._memo = {}
+        self.version += 1
+
+    def prefetch(self, executor: Executor = None):
+        """
+        Start fetch_data in the background and return at once, e.g. to build many sites while their requests run.
+        Accessors wait for the request if it hasn't finished yet. Does nothing if the data is loaded or pending,
+        a failed prefetch is started again.
+
+        :param executor: Executor to run the request, by default the class-wide BaseAPI.prefetch_executor.
+        :return: self
+        """
+        if self._failed():
+            self._future = None
+        if self.data is None and self._future is None:
+            if executor is None:
+                executor = self._default_executor()
+            self._future = executor.submit(self.fetch_data)
+        return self
+
+    @classmethod
+    def _default_executor(cls) -> Executor:
+        with BaseAPI._prefetch_lock:
+            if cls.prefetch_executor is None:
+                BaseAPI.prefetch_executor = ThreadPoolExecutor(cls.PREFETCH_WORKERS,
+                                                               thread_name_prefix="pvgispy-prefetch")
+            return cls.prefetch_executor
+
+    def ready(self) -> bool:
+        """
+        Returns if the data is available without waiting, i.e. loaded or its prefetch finished (also with an error).
+        """
+        future = self._future
+        return future.done() if future is not None else self.data is not None
+
+    def result(self, timeout: float = None) -> dict:
+        """
+        Returns the data, waiting for a running prefetch or fetching it now if there is none.
+
+        :param timeout: Seconds to wait for a prefetch, None waits as long as needed.
+        :raises concurrent.futures.TimeoutError: if the prefetch didn't finish in time. It keeps running.
+        :raises: the error of a failed prefetch. The next call fetches again.
+        """
+        future = self._future
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                if future.done():
+                    self._future = None
+                raise
+            self._future = None
+        if self.data is None:
+            self.fetch_data()
+        return self.data
+
+    def _ensure_data(self):
+        """
+        Make the data available to an accessor.
+        """
+        if self.data is None or self._future is not None:
+            self.result()
+
+    def _failed(self) -> bool:
+        """
+        Returns if the prefetch finished with an error.
+        """
+        future = self._future
+        return future is not None and future.done() and (future.cancelled() or future.exception() is not None)
+
+    def _settle(self):
+        """
+        Wait for a running prefetch, so it can't load data after the parameters changed.
+        The prefetch is dropped, also if it failed, so its error isn't raised for the new parameters.
+        """
+        future = self._future
+        if future is not None:
+            wait([future])
+            self._future = None
+
+    def version_url(self, version: str) -> str:
+        """
+        Returns the base URL of an API version, "v5_3", "v5_2" or "v5_1".
+        """
+        urls = {"v5_3": type(self).BASE_URL, "v5_2": self.BASE_URL_V2, "v5_1": self.BASE_URL_V1}
+        if version not in urls:
+            raise ValueError(f"Invalid API version '{version}'. Choose from 'v5_3', 'v5_2' or 'v5_1'.")
+        return urls[version]
+
     def _get_endpoint(self):
         """
         Returns the endpoint URL for the specific API. 
@@ -37,10 +258,134 @@ class BaseAPI:
 
     def fetch_data(self):
         """
-        Fetch data from the API.
+        Fetch data from the API, or from the response cache or site index if configured.
+        """
+        endpoint = self._get_endpoint()
+        params = self.params
+
+        with track(self.metrics, endpoint) as record:
+            data = self._fetch(endpoint, params, record)
+            with record.phase("load"):
+                self._load(data)
+
+    def _fetch(self, endpoint, params, record=NULL_RECORD):
+        """
+        Returns the data of a request, from the cache or site index if possible, else from the API.
+        """
+        data = self._lookup(endpoint, params, record)
+        if data is not None:
+            return data
+        if self.single_flight is None:
+            return self._download(endpoint, params, record)
+
+        # Concurrent callers of the same request wait for the first one and share its data.
+        data, shared = self.single_flight.do(self._flight_key(endpoint, params),
+                                             lambda: self._download(endpoint, params, record))
+        if shared:
+            record.source = "shared"
+        return data
+
+    def _flight_key(self, endpoint, params):
+        """
+        Returns the single-flight key of a request. Streaming decodes the series to a TimeSeries instead of
+        rows, so only objects decoding the response the same way share it.
         """
-        response = requests.get(self._get_endpoint(), params=self.params)
-        self.data = self._handle_response(response)
+        return request_key(endpoint, params), bool(self.stream and self.SERIES_KEY is not None)
+
+    def _download(self, endpoint, params, record=NULL_RECORD):
+        response = self.transport.get(endpoint, params=params, stream=self.stream)
+        data = self._receive(response, record)
+        self._store(endpoint, params, data)
+        return data
+
+    def _receive(self, response, record=NULL_RECORD):
+        """
+        Decode a response, recording its timings and size.
+        """
+        with record.phase("download" if self.stream and self.SERIES_KEY is not None else "decode"):
+            data = self._handle_response(response)
+        record.response(response)
+        return data
+
+    def _lookup(self, endpoint, params, record=NULL_RECORD):
+        """
+        Returns locally available data for a request, from the cache, derived from local data (see _derive)
+        or from a nearby site, else None.
+        """
+        if self.cache is not None:
+            data = self.cache.get(endpoint, params)
+            record.cache = "miss" if data is None else "hit"
+            if data is not None:
+                record.source = "cache"
+                return data
+
+        data = self._derive(params)
+        if data is not None:
+            record.source = "derived"
+            return data
+
+        if self.site_index is not None:
+            match = self.site_index.nearest(endpoint, params)
+            if match is not None:
+                record.source = "site_index"
+                return match[1]
+        return None
+
+    def _derive(self, params):
+        """
+        Returns the data of a request computed from data held locally, else None.
+        Overridden by endpoints whose results can be derived from an Hourly series.
+        """
+        return None
+
+    def _store(self, endpoint, params, data):
+        """
+        Keep fetched data in the cache and site index, if configured.
+        """
+        if self.cache is not None:
+            self.cache.set(endpoint, params, data)
+        if self.site_index is not None:
+            self.site_index.add(endpoint, params, data)
+
+    def _load(self, data):
+        """
+        Take over a decoded API response. Subclasses extend this to read back inputs.
+        """
+        self.data = data
+        self._series = None
+        self._memo = {}
+
+    def series(self) -> TimeSeries:
+        """
+        Returns the hourly series as TimeSeries. Timestamps are parsed once and reused by all aggregations.
+        """
+        if self.SERIES_KEY is None:
+            raise NotImplementedError(f"{type(self).__name__} has no hourly series.")
+        self._ensure_data()
+        if self._series is None:
+            self._series = as_series(self.data["outputs"][self.SERIES_KEY])
+        return self._series
+
+    def to_frame(self):
+        """
+        Returns the hourly series as pandas DataFrame with a UTC DatetimeIndex, without copying the columns.
+        pandas is imported on first use.
+        """
+        return frame.series_frame(self.series(), tz="UTC")
+
+    @timed
+    @memoized
+    def aggregate(self, variable: str, by="year", how: str = "sum", q: float = None) -> dict:
+        """
+        Aggregate one variable of the hourly series, e.g. aggregate("P", by="month", how="mean").
+
+        :param variable: Output variable, e.g. "P", "G(i)", "T2m".
+        :param by: "year", "month", "day", "hour" (of day), "month_of_year", or custom labels, see TimeSeries.group_keys.
+        :param how: "sum", "mean", "max", "min", "count" or "percentile".
+        :param q: Percentile in [0, 100], required for how="percentile".
+        :return: dict = {group: value}
+        """
+        return self.series().aggregate(variable, by, how, q)
 
     def _handle_response(self, response):
         """
@@ -51,24 +396,95 @@ class BaseAPI:
             # Handle error
             self._handle_error(response)
 
-        # Always use json, only let user decide for export
+        if self.SERIES_KEY is not None and self.params.get("outputformat") in ("csv", "basic"):
+            try:
+                return csvformat.parse(response.content, self.SERIES_KEY)
+            finally:
+                response.close()
+
+        if self.stream and self.SERIES_KEY is not None:
+            try:
+                return read_series(response.iter_content(self.CHUNK_SIZE), self.SERIES_KEY)
+            finally:
+                response.close()
+
         return response.json()
-        # if self._params["outputformat"] == "csv":
-        #     return response.text
-        # elif self._params["outputformat"] == "json":
-        #     return response.json()
-        # elif self._params["outputformat"] == "basic":
-        #     return response.json()
-        # else:
-        #     raise Exception(f"Invalid Outputformat.")
+
+    def _stream_series(self) -> SeriesStream:
+        """
+        Open a streaming request and return an iterator over the rows of the hourly series.
+        """
+        params = dict(self.params, outputformat="json")
+        response = self.transport.get(self._get_endpoint(), params=params, stream=True)
+        if response.status_code != 200:
+            self._handle_error(response)
+        return SeriesStream(response.iter_content(self.CHUNK_SIZE), self.SERIES_KEY, close=response.close)
 
     def _handle_error(self, response):
         """
         Handle errors from the API response.
         This can be extended to raise custom exceptions based on the error type.
         """
-        raise Exception(f"API Error {response.status_code}: {response.text}")
+        raise APIError(response.status_code, response.text)
+
+    def _init_kwargs(self):
+        """
+        Returns the constructor arguments of this object, used to rebuild it from an export or in set_params.
+        Subclasses add all of their own arguments.
+        """
+        kwargs = dict(self._params, lat=self.lat, lon=self.lon)
+        if self.route:
+            kwargs["route"] = True
+        return kwargs
+
+    def export(self, filename, format: str = None, compress: bool = True):
+        """
+        Write the fetched data to a file.
+
+        :param format: "json" (raw API output), or the binary columnar formats "npz", "parquet" (requires pyarrow)
+                       and "arrow". Guessed from the file extension if None.
+        :param compress: Compress binary formats. Uncompressed npz and arrow files are memory-mapped on load.
+        """
+        self._ensure_data()
+
+        format = format or storage.guess_format(filename)
+        if format == "json":
+            with open(filename, "w") as file:
+                json.dump(self.data, file, default=json_default)
+        else:
+            storage.save(self, filename, format, compress)
+
+    def load_data(self, filename, mmap: bool = True):
+        """
+        Load data written by export instead of fetching it.
+        """
+        if storage.guess_format(filename) == "json":
+            with open(filename) as file:
+                self._load(json.load(file))
+        else:
+            self._load(storage.read(filename, mmap)[1])
+
+    @classmethod
+    def from_file(cls, filename, mmap: bool = True, **kwargs):
+        """
+        Rebuild an endpoint object from a binary export, it behaves like a fetched one.
+
+        :param mmap: Memory-map the arrays instead of reading them, where the format allows it.
+        :param kwargs: Override constructor arguments, e.g. cache or transport.
+        """
+        metadata, data = storage.read(filename, mmap)
+
+        endpoint = cls
+        if cls.__name__ != metadata["class"]:
+            subclasses = list(cls.__subclasses__())
+            while subclasses and endpoint is cls:
+                subclass = subclasses.pop()
+                if subclass.__name__ == metadata["class"]:
+                    endpoint = subclass
+                subclasses.extend(subclass.__subclasses__())
+            if endpoint is cls:
+                raise ValueError(f"'{filename}' contains {metadata['class']} data, not {cls.__name__}.")
 
-    def export(self, filename):
-        file = open(filename, "w")
-        json.dump(self.data, file)
+        api = endpoint(**dict(metadata["init"], **kwargs))
+        api._load(data)
+        return api
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from .base import BaseAPI
+from .cache import request_key
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of one item of a batch. Exactly one of data and error is set.
+    """
+    api: Optional[BaseAPI]
+    data: Optional[dict]
+    error: Optional[Exception]
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def fetch_many(items, endpoint: type = None, max_workers: int = 8):
+    """
+    Fetch many requests on a thread pool. Identical requests are only sent once.
+
+    :param items: Iterable of endpoint objects (e.g. Hourly(...)) or dicts of constructor arguments.
+    :param endpoint: Endpoint class (Daily, Hourly, Monthly, TMY) used to build objects from dicts.
+    :param max_workers: Number of threads, i.e. the maximum number of requests in flight.
+    :return: list of BatchResult in input order. Errors are reported per item and don't abort the batch.
+             Fetched data is also loaded into every endpoint object.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    groups = {}
+
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, BaseAPI):
+                api = item
+            elif endpoint is None:
+                raise TypeError("fetch_many needs an endpoint class to build requests from dicts.")
+            else:
+                api = endpoint(**item)
+            key = request_key(api._get_endpoint(), api.params)
+        except Exception as error:
+            results[index] = BatchResult(item if isinstance(item, BaseAPI) else None, None, error)
+            continue
+        groups.setdefault(key, []).append((index, api))
+
+    def fetch(group):
+        first = group[0][1]
+        first.fetch_data()
+        return first.data
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(group, executor.submit(fetch, group)) for group in groups.values()]
+        for group, future in futures:
+            try:
+                data = future.result()
+            except Exception as error:
+                for index, api in group:
+                    results[index] = BatchResult(api, None, error)
+                continue
+
+            for index, api in group:
+                if api.data is not data:
+                    api._load(data)
+                results[index] = BatchResult(api, data, None)
+
+    return results
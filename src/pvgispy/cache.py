@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .series import json_default
+
+
+def normalize_params(params: dict) -> dict:
+    """
+    Normalize API parameters so that equivalent requests map to the same key.
+
+    None values are dropped, booleans become 0/1 and integral floats become ints
+    (lat=51 and lat=51.0 describe the same request).
+    """
+    normalized = {}
+    for key in sorted(params):
+        value = params[key]
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        normalized[key] = value
+    return normalized
+
+
+def request_key(endpoint: str, params: dict) -> str:
+    """
+    Returns a stable hash for an endpoint URL plus its parameters.
+    """
+    payload = json.dumps([endpoint, normalize_params(params)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    SUFFIX = ".json.gz"
+
+    def __init__(self, directory: str = None, ttl: float = None, max_size: int = None):
+        """
+        Persistent on-disk cache for decoded API responses.
+
+        Entries are stored as gzip compressed json, one file per (endpoint, params) pair.
+
+        :param directory: Cache directory. Defaults to $XDG_CACHE_HOME/pvgispy or ~/.cache/pvgispy.
+        :param ttl: Time to live of an entry in seconds. None keeps entries forever.
+        :param max_size: Maximum total size of the cache in bytes. The least recently used
+                         entries are evicted once the limit is exceeded. None disables eviction.
+        """
+        if directory is None:
+            base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+            directory = os.path.join(base, "pvgispy")
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                yield os.path.join(self.directory, name)
+
+    def get(self, endpoint: str, params: dict):
+        """
+        Returns the cached response or None on a miss or expired entry.
+        """
+        path = self._path(request_key(endpoint, params))
+        try:
+            stat = os.stat(path)
+            if self.ttl is not None and time.time() - stat.st_mtime > self.ttl:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Access time drives LRU eviction, modification time drives the TTL.
+        try:
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, endpoint: str, params: dict, data):
+        """
+        Store a decoded response and evict old entries if the cache grew too large.
+        """
+        path = self._path(request_key(endpoint, params))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as file:
+                file.write(json.dumps(data, default=json_default).encode("utf-8"))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        if self.max_size is not None:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove expired entries, then least recently used ones until max_size is met.
+        """
+        now = time.time()
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if self.ttl is not None and now - stat.st_mtime > self.ttl:
+                self._remove(path)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        if self.max_size is None:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Remove all entries and reset the counters.
+        """
+        for path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current size of the cache.
+
+        :return: dict = {"hits": int, "misses": int, "entries": int, "size": bytes}
+        """
+        sizes = [os.path.getsize(path) for path in self._entries()]
+        return {"hits": self.hits, "misses": self.misses, "entries": len(sizes), "size": sum(sizes)}
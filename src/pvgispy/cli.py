@@ -0,0 +1,252 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import storage
+from .cache import ResponseCache
+from .daily import Daily
+from .governor import RateGovernor
+from .hourly import Hourly
+from .monthly import Monthly
+from .series import json_default
+from .tmy import TMY
+from .transport import Transport
+
+ENDPOINTS = {"hourly": Hourly, "tmy": TMY, "daily": Daily, "monthly": Monthly}
+SINK_FORMATS = ("jsonl", "npz", "parquet", "arrow")
+
+
+def _truncate_partial(filename: str):
+    """
+    Drop a last line cut off by a crash, so the next appended line starts on its own.
+    """
+    if os.path.exists(filename):
+        with open(filename, "rb+") as file:
+            content = file.read()
+            if content and not content.endswith(b"\n"):
+                file.truncate(content.rfind(b"\n") + 1)
+
+
+def _value(text: str):
+    """
+    Parse a value of a csv cell or a --param option: numbers, true/false and null as in json, else the string.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def read_sites(filename: str):
+    """
+    Lazily read a sites file, one request per csv row or jsonl line.
+
+    The columns (keys) are constructor arguments of the endpoint, at least lat and lon. An optional "id"
+    names the site in the output and the checkpoint, by default it is the row number starting at 0.
+    Empty csv cells are left out.
+
+    :return: iterator of (id, kwargs)
+    """
+    with open(filename, newline="") as file:
+        if filename.lower().endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in file if line.strip())
+        else:
+            rows = ({key: _value(value) for key, value in row.items() if value not in ("", None)}
+                    for row in csv.DictReader(file))
+        for number, row in enumerate(rows):
+            site = str(row.pop("id", number))
+            yield site, row
+
+
+class Checkpoint:
+    def __init__(self, filename: str):
+        """
+        Append-only file with the ids of completed sites, one per line.
+        An id is only written after its result is in the sink, so a rerun skips exactly the finished sites.
+        An id cut off by a crash is dropped on reopen.
+        """
+        self.filename = filename
+        self.done = set()
+        _truncate_partial(filename)
+        if os.path.exists(filename):
+            with open(filename) as file:
+                self.done = {line[:-1] for line in file}
+        self._file = open(filename, "a")
+
+    def __contains__(self, site):
+        return site in self.done
+
+    def add(self, site: str):
+        self.done.add(site)
+        self._file.write(site + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink:
+    def __init__(self, filename: str):
+        """
+        Appends one line {"id", "params", "data"} per site. A line cut off by a crash is dropped on reopen.
+        Every line is synced to disk before its site is checkpointed, sites already in the file are skipped by run,
+        so a crash between writing and checkpointing doesn't duplicate a site.
+        """
+        _truncate_partial(filename)
+        self.sites = set()
+        if os.path.exists(filename):
+            decoder = json.JSONDecoder()
+            with open(filename) as file:
+                for line in file:
+                    # Only the leading id is decoded, not the data of the site.
+                    if line.startswith('{"id": '):
+                        self.sites.add(decoder.raw_decode(line, len('{"id": '))[0])
+        self._file = open(filename, "a")
+
+    def __contains__(self, site):
+        return site in self.sites
+
+    def write(self, site: str, api):
+        record = {"id": site, "params": api._init_kwargs(), "data": api.data}
+        self._file.write(json.dumps(record, default=json_default) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.sites.add(site)
+
+    def close(self):
+        self._file.close()
+
+
+class FileSink:
+    def __init__(self, directory: str, format: str = "npz", compress: bool = True):
+        """
+        Writes every site to its own columnar file <directory>/<id>.<format>, readable with Endpoint.from_file.
+        Files are written under a temporary name and renamed when complete, existing files are skipped by run.
+        """
+        self.directory = directory
+        self.format = format
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+
+    def __contains__(self, site):
+        return os.path.exists(self.path(site))
+
+    def path(self, site: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", site) + "." + self.format)
+
+    def write(self, site: str, api):
+        path = self.path(site)
+        partial = path + ".partial"
+        storage.save(api, partial, self.format, self.compress)
+        os.replace(partial, path)
+
+    def close(self):
+        pass
+
+
+def run(sites, endpoint: type, sink, checkpoint: Checkpoint, defaults: dict = None, max_workers: int = 8,
+        log=None) -> dict:
+    """
+    Fetch many sites concurrently and stream every result to the sink as it completes.
+
+    At most 2 * max_workers requests are queued at a time and results are dropped once written,
+    so memory stays flat however long the sites file is.
+
+    :param sites: Iterable of (id, kwargs), e.g. read_sites(filename).
+    :param endpoint: Endpoint class, e.g. Hourly.
+    :param sink: JsonlSink or FileSink.
+    :param checkpoint: Sites in the checkpoint are skipped, completed ones are added. Sites found in the sink
+                       but not in the checkpoint, i.e. written right before a crash, are added and skipped.
+    :param defaults: Constructor arguments of all sites, overridden by the ones of a site.
+    :param log: Callable receiving a message per failed site.
+    :return: dict = {"done", "skipped", "failed"} counts.
+    """
+    counts = {"done": 0, "skipped": 0, "failed": 0}
+
+    def fetch(kwargs):
+        api = endpoint(**dict(defaults or {}, **kwargs))
+        api.fetch_data()
+        return api
+
+    def collect(futures):
+        for future in futures:
+            site = pending.pop(future)
+            try:
+                sink.write(site, future.result())
+            except Exception as error:
+                counts["failed"] += 1
+                if log is not None:
+                    log(f"{site}: {type(error).__name__}: {error}")
+                continue
+            checkpoint.add(site)
+            counts["done"] += 1
+
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for site, kwargs in sites:
+            if site in checkpoint:
+                counts["skipped"] += 1
+                continue
+            if site in sink:
+                checkpoint.add(site)
+                counts["skipped"] += 1
+                continue
+            if len(pending) >= 2 * max_workers:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            pending[executor.submit(fetch, kwargs)] = site
+        collect(wait(pending).done)
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="pvgispy", description="Fetch PVGIS data for many sites. "
+                                     "Rerunning the same command resumes an interrupted job.")
+    parser.add_argument("sites", help="csv or jsonl file with lat, lon, optional id and further endpoint arguments")
+    parser.add_argument("output", help="jsonl file, or a directory for columnar files")
+    parser.add_argument("-e", "--endpoint", choices=sorted(ENDPOINTS), default="hourly")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="endpoint argument for all sites, e.g. -p startyear=2020 -p pvcalculation=true")
+    parser.add_argument("-f", "--format", choices=SINK_FORMATS,
+                        help="output format, by default jsonl for *.jsonl outputs else npz")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="requests in flight")
+    parser.add_argument("--checkpoint", help="checkpoint file, by default <output>.done")
+    parser.add_argument("--cache", nargs="?", const="", help="cache responses on disk, optionally in this directory")
+    parser.add_argument("--retries", type=int, default=3, help="retries per request")
+    parser.add_argument("--rate", type=float, help="maximum requests per second, adapted to 429 and 5xx responses")
+    parser.add_argument("--rate-file", help="share the --rate between all jobs of this host using this state file")
+    args = parser.parse_args(argv)
+
+    defaults = {}
+    for option in args.param:
+        key, separator, value = option.partition("=")
+        if not separator:
+            parser.error(f"Invalid --param '{option}', expected KEY=VALUE.")
+        defaults[key] = _value(value)
+    governor = None
+    if args.rate is not None or args.rate_file is not None:
+        governor = RateGovernor(rate=args.rate or 30, max_concurrency=args.workers, path=args.rate_file)
+    defaults["transport"] = Transport(retries=args.retries, pool_size=args.workers, governor=governor)
+    if args.cache is not None:
+        defaults["cache"] = ResponseCache(args.cache or None)
+
+    format = args.format or ("jsonl" if args.output.lower().endswith(".jsonl") else "npz")
+    sink = JsonlSink(args.output) if format == "jsonl" else FileSink(args.output, format)
+    checkpoint = Checkpoint(args.checkpoint or args.output.rstrip("/\\") + ".done")
+    try:
+        counts = run(read_sites(args.sites), ENDPOINTS[args.endpoint], sink, checkpoint, defaults, args.workers,
+                     log=lambda message: print(message, file=sys.stderr))
+    finally:
+        sink.close()
+        checkpoint.close()
+        defaults["transport"].close()
+
+    print(f"{counts['done']} done, {counts['skipped']} skipped, {counts['failed']} failed", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
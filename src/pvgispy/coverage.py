@@ -0,0 +1,167 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .exceptions import PVGISError
+
+API_VERSIONS = ("v5_3", "v5_2", "v5_1")
+
+
+def _disk(center_lon: float, radius: float = 65, vertices: int = 24) -> tuple:
+    """
+    Polygon (lat, lon) approximating the usable footprint of a geostationary satellite.
+    """
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    return tuple((float(radius * np.sin(a)), float(center_lon + radius * np.cos(a))) for a in angles)
+
+
+def _box(lat_min, lat_max, lon_min, lon_max) -> tuple:
+    return (lat_min, lon_min), (lat_max, lon_min), (lat_max, lon_max), (lat_min, lon_max)
+
+
+# Meteosat prime service (0°) and Indian Ocean service (45.5°E), the source of the SARAH databases.
+METEOSAT = (_disk(0), _disk(45.5))
+AMERICAS = (_box(-20, 60, -180, -20),)
+GLOBAL = (_box(-90, 90, -180, 180),)
+COSMO_REA6 = (_box(27, 72, -25, 45),)
+
+
+class Database(NamedTuple):
+    """
+    A radiation database as offered by one API version.
+    """
+    name: str
+    version: str
+    # Polygons of (lat, lon) vertices the database covers.
+    polygons: tuple
+    # First and last year of the hourly data.
+    years: tuple
+
+    def covers(self, lat, lon, startyear: int = None, endyear: int = None):
+        """
+        Returns if the database covers the location(s) and years. lat and lon can be arrays.
+        """
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        inside = np.zeros(np.broadcast(lat, lon).shape, dtype=bool)
+        if (startyear is None or startyear >= self.years[0]) and (endyear is None or endyear <= self.years[1]):
+            for polygon in self.polygons:
+                inside |= _inside(lat, lon, polygon)
+        return inside if inside.ndim else bool(inside)
+
+
+def _inside(lat, lon, polygon):
+    """
+    Vectorized ray casting point-in-polygon test. Points on the boundary count as inside for boxes.
+    """
+    vertices = np.asarray(polygon, dtype=np.float64)
+    lats, lons = vertices[:, 0], vertices[:, 1]
+    if len(vertices) == 4 and lats[0] == lats[3] and lons[0] == lons[1]:
+        return (lat >= lats[0]) & (lat <= lats[1]) & (lon >= lons[0]) & (lon <= lons[2])
+
+    inside = np.zeros(np.broadcast(lat, lon).shape, dtype=bool)
+    for (lat1, lon1), (lat2, lon2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        crosses = (lat1 > lat) != (lat2 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lon_cross = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+        inside ^= crosses & (lon < lon_cross)
+    return inside
+
+
+# Approximate coverage of the PVGIS radiation databases, in order of preference.
+# Based on the PVGIS documentation, adjust or extend it if the service changes.
+DATABASES = [
+    Database("PVGIS-SARAH3", "v5_3", METEOSAT, (2005, 2023)),
+    Database("PVGIS-NSRDB", "v5_3", AMERICAS, (2005, 2020)),
+    Database("PVGIS-ERA5", "v5_3", GLOBAL, (2005, 2023)),
+    Database("PVGIS-SARAH2", "v5_2", METEOSAT, (2005, 2020)),
+    Database("PVGIS-NSRDB", "v5_2", AMERICAS, (2005, 2015)),
+    Database("PVGIS-ERA5", "v5_2", GLOBAL, (2005, 2020)),
+    Database("PVGIS-SARAH", "v5_1", METEOSAT, (2005, 2016)),
+    Database("PVGIS-NSRDB", "v5_1", AMERICAS, (2005, 2015)),
+    Database("PVGIS-ERA5", "v5_1", GLOBAL, (2005, 2016)),
+    Database("PVGIS-COSMO", "v5_1", COSMO_REA6, (2005, 2015)),
+    Database("PVGIS-CMSAF", "v5_1", METEOSAT[:1], (2007, 2016)),
+]
+
+
+def candidates(lat: float, lon: float, startyear: int = None, endyear: int = None, names=None,
+               versions=API_VERSIONS) -> list:
+    """
+    Returns the databases covering a site and year range, in order of preference.
+
+    :param names: Only consider these database names, e.g. the ones an endpoint supports.
+    :param versions: Only consider these API versions.
+    """
+    return [database for database in DATABASES
+            if (names is None or database.name in names) and database.version in versions
+            and database.covers(lat, lon, startyear, endyear)]
+
+
+def route(lat: float, lon: float, raddatabase: str = None, startyear: int = None, endyear: int = None,
+          names=None, fallback: bool = True) -> Database:
+    """
+    Choose the radiation database and API version for a request before sending it.
+
+    :param raddatabase: Preferred database. It is used with the newest API version offering it for the site,
+                        else the fallback chain is used.
+    :param names: Databases the endpoint supports, None for all.
+    :param fallback: Fall back to the next covering database (in order of DATABASES) if raddatabase doesn't
+                     cover the site. If False a PVGISError is raised instead.
+    :raises PVGISError: if no database covers the site and years.
+    """
+    covering = candidates(lat, lon, startyear, endyear, names)
+    if raddatabase is not None:
+        preferred = [database for database in covering if database.name == raddatabase]
+        if preferred:
+            return preferred[0]
+        if not fallback:
+            raise PVGISError(f"{raddatabase} doesn't cover lat={lat}, lon={lon} for the requested years.")
+    if not covering:
+        raise PVGISError(f"No radiation database covers lat={lat}, lon={lon} for the requested years.")
+    return covering[0]
+
+
+def route_many(lats, lons, startyear: int = None, endyear: int = None, names=None) -> np.ndarray:
+    """
+    Vectorized route for many sites.
+
+    :return: array of the index in DATABASES of the chosen database per site, -1 where nothing covers the site.
+    """
+    lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    chosen = np.full(np.broadcast(lats, lons).shape, -1, dtype=np.int64)
+    for index, database in enumerate(DATABASES):
+        if names is not None and database.name not in names:
+            continue
+        open_sites = chosen == -1
+        if not open_sites.any():
+            break
+        chosen[open_sites & database.covers(lats, lons, startyear, endyear)] = index
+    return chosen
+
+
+def compare(endpoint: type, lat: float, lon: float, databases: Optional[list] = None, max_workers: int = 4,
+            **kwargs) -> dict:
+    """
+    Fetch one site from several radiation databases concurrently, e.g. to compare them.
+
+    :param endpoint: Endpoint class, e.g. Hourly or Daily.
+    :param databases: Database objects, by default every database covering the site with the newest version of each.
+    :param kwargs: Further constructor arguments of the endpoint.
+    :return: dict = {database name: BatchResult}
+    """
+    from .batch import fetch_many
+
+    if databases is None:
+        databases = []
+        for database in candidates(lat, lon, kwargs.get("startyear"), kwargs.get("endyear"),
+                                   endpoint.RADDATABASES):
+            if database.name not in [known.name for known in databases]:
+                databases.append(database)
+
+    apis = []
+    for database in databases:
+        api = endpoint(lat=lat, lon=lon, **dict(kwargs, raddatabase=database.name))
+        api.BASE_URL = api.version_url(database.version)
+        apis.append(api)
+    results = fetch_many(apis, max_workers=max_workers)
+    return {database.name: result for database, result in zip(databases, results)}
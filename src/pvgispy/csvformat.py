@@ -0,0 +1,115 @@
+import io
+import re
+
+import numpy as np
+
+from .exceptions import PVGISError
+from .series import TimeSeries, parse_numeric_times
+
+# Header lines of the csv output and where they go in the "inputs" of the json output.
+LOCATION = {"Latitude (decimal degrees)": "latitude", "Longitude (decimal degrees)": "longitude",
+            "Elevation (m)": "elevation"}
+METEO_DATA = {"Radiation database": "radiation_db", "Meteo database": "meteo_db"}
+MOUNTING = {"Slope": "slope", "Azimuth": "azimuth"}
+
+# Start of the table header and the first line after the table that doesn't start with a digit.
+TABLE = re.compile(rb"^time[^,\n]*,", re.MULTILINE)
+TABLE_END = re.compile(rb"\n(?![0-9])")
+NUMBER = re.compile(r"-?\d+(\.\d+)?")
+
+
+def parse(body: bytes, series_key: str) -> dict:
+    """
+    Parse a csv response (outputformat "csv", or "basic" if it has column names) of seriescalc or tmy
+    into the structure of the json output.
+
+    The hourly table is read by numpy's C parser straight into a TimeSeries. Location, databases and mounting
+    are recovered from the header lines, the year range of an hourly series ("meteo_data" year_min and year_max)
+    from the timestamps.
+    Variable descriptions below the table go to "meta".
+
+    :param series_key: Key of the hourly series in "outputs", "hourly" or "tmy_hourly".
+    """
+    body = body.replace(b"\r\n", b"\n")
+    match = TABLE.search(body)
+    if match is None:
+        raise PVGISError("The csv response has no table with column names.")
+
+    header_end = body.find(b"\n", match.start())
+    header_end = len(body) if header_end < 0 else header_end
+    names = body[match.start():header_end].decode("utf-8").strip().split(",")
+    end = TABLE_END.search(body, header_end + 1)
+    end = len(body) if end is None else end.start()
+
+    # Without the colon timestamps are plain numbers (YYYYMMDDHHMM), so the whole table is numeric.
+    table = body[header_end + 1:end].replace(b":", b"")
+    if table.strip():
+        values = np.loadtxt(io.BytesIO(table), delimiter=",", dtype=np.float64, ndmin=2)
+    else:
+        values = np.empty((0, len(names)))
+    if values.shape[1] != len(names):
+        raise PVGISError(f"The csv table has {values.shape[1]} columns but {len(names)} column names.")
+
+    time = parse_numeric_times(values[:, 0])
+    series = TimeSeries(time, {name: values[:, index] for index, name in enumerate(names[1:], 1)}, names[0])
+
+    inputs, months_selected = _parse_header(body[:match.start()].decode("utf-8", errors="replace"))
+    if len(time) and series_key == "hourly":
+        years = time[[0, -1]].astype("datetime64[Y]").astype(np.int64) + 1970
+        inputs["meteo_data"].update(year_min=years[0].item(), year_max=years[1].item())
+
+    outputs = {series_key: series}
+    if months_selected:
+        outputs["months_selected"] = months_selected
+    variables = _parse_legend(body[end:].decode("utf-8", errors="replace"), names)
+    return {"inputs": inputs, "outputs": outputs, "meta": {"outputs": {series_key: {"variables": variables}}}}
+
+
+def _parse_header(text: str):
+    """
+    Returns the "inputs" and the selected months (tmy) described by the lines above the table.
+    """
+    inputs = {"location": {}, "meteo_data": {}}
+    mounting = {}
+    months_selected = []
+
+    for line in text.split("\n"):
+        if re.fullmatch(r"\s*\d+\s*,\s*\d+\s*", line):
+            month, year = line.split(",")
+            months_selected.append({"month": int(month), "year": int(year)})
+            continue
+        key, separator, value = line.partition(":")
+        if not separator:
+            continue
+        key, value = key.strip(), value.strip()
+        if key in LOCATION:
+            inputs["location"][LOCATION[key]] = _number(value)
+        elif key in METEO_DATA:
+            inputs["meteo_data"][METEO_DATA[key]] = value
+        elif key in MOUNTING:
+            mounting[MOUNTING[key]] = {"value": _number(value)}
+
+    if mounting:
+        inputs["mounting_system"] = {"fixed": mounting}
+    return inputs, months_selected
+
+
+def _parse_legend(text: str, names: list) -> dict:
+    """
+    Returns {variable: {"description", "units"}} from legend lines like "P: PV system power (W)".
+    """
+    variables = {}
+    for line in text.split("\n"):
+        key, separator, value = line.partition(":")
+        if separator and key.strip() in names:
+            description, _, units = value.strip().rpartition(" (")
+            if description and units.endswith(")"):
+                variables[key.strip()] = {"description": description, "units": units[:-1]}
+            else:
+                variables[key.strip()] = {"description": value.strip()}
+    return variables
+
+
+def _number(value: str):
+    match = NUMBER.search(value)
+    return float(match.group()) if match else value
@@ -1,10 +1,28 @@
-from .base import BaseAPI
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import derive, frame
+from .base import BaseAPI, memoized
+from .cache import request_key
+from .metrics import NULL_RECORD, timed, track
 
 
 class Daily(BaseAPI):
     ENDPOINT = "DRcalc"
+    # Number of month=0 responses kept in memory for share_months, least recently used are dropped first.
+    SHARED_SITES = 256
+
+    # Hourly object to derive the daily profile from instead of sending a request, see _derive.
+    hourly_source = None
 
-    def __init__(self, lat: float, lon: float, month: int, preload: bool = False, **kwargs):
+    _shared = OrderedDict()
+    _shared_lock = threading.Lock()
+    _fetch_locks = {}
+
+    def __init__(self, lat: float, lon: float, month: int, preload: bool = False, share_months: bool = False,
+                 hourly=None, **kwargs):
         """
         Daily radiation for one day in a specific month.
         Calculated in a TMY.
@@ -14,6 +32,11 @@ class Daily(BaseAPI):
         :param lon: Longitude in decimal degrees (west is negative).
         :param month: The number of the month, starting at 1 for January. A value of 0 indicates data for all months.
 
+        :param share_months: (Default: False) Fetch all months with one month=0 request and keep it in memory,
+                             so Daily objects for other months of the same site and parameters don't send a request.
+        :param hourly: (Optional) Hourly object of the same site, plane, raddatabase and usehorizon, fetched with
+                       components=1. The profile is then averaged from its series (over its years) instead of
+                       requesting DRcalc. If it isn't fetched or doesn't match, the API is used. See from_hourly.
 
         Optional parameters:
         :param usehorizon: (Optional) Calculate considering shadows from a high horizon. Default is 1 for "yes".
@@ -37,10 +60,13 @@ class Daily(BaseAPI):
         :var time: [xx:00] Time in hours. Starting at 00:00.
         """
         self.month = month
+        self.share_months = share_months
+        if hourly is not None:
+            self.hourly_source = hourly
         super().__init__(lat, lon, **kwargs)
 
         if preload:
-            self.fetch_data()
+            self.result()
 
     def _get_endpoint(self):
         """
@@ -48,11 +74,134 @@ class Daily(BaseAPI):
         """
         return self.BASE_URL + self.ENDPOINT
 
-    def set_params(self, **kwargs):
+    def _init_kwargs(self):
+        return dict(super()._init_kwargs(), month=self.month, share_months=self.share_months)
+
+    @classmethod
+    def from_hourly(cls, hourly, month: int, **kwargs):
+        """
+        Daily object computed from a fetched Hourly series (components=1) with the same site and plane,
+        so no DRcalc request is sent.
+
+        :param kwargs: Further arguments of Daily, e.g. showtemperatures=1.
+        """
+        params = hourly.params
+        plane = {key: params[key] for key in derive.PLANE_PARAMS if key in params}
+        return cls(hourly.lat, hourly.lon, month, hourly=hourly, **dict(plane, **kwargs))
+
+    @classmethod
+    def for_months(cls, lat: float, lon: float, months=range(1, 13), **kwargs) -> list:
+        """
+        Daily objects for several months of one site, loaded from a single month=0 request.
+
+        :param months: Month numbers, by default all twelve.
+        :param kwargs: Further arguments of Daily, the same for every month.
+        :return: list of Daily in the order of months.
+        """
+        dailies = [cls(lat, lon, month, share_months=True, **kwargs) for month in months]
+        for daily in dailies:
+            daily.fetch_data()
+        return dailies
+
+    def fetch_data(self):
+        """
+        Fetch data from the API. With share_months the month is taken from a shared month=0 response.
+        """
+        if not self.share_months:
+            return super().fetch_data()
+
+        endpoint = self._get_endpoint()
+        with track(self.metrics, endpoint) as record:
+            data = self._fetch_all_months(endpoint, record)
+            with record.phase("load"):
+                self._load(data if self.month == 0 else self.month_view(data, self.month))
+
+    def _fetch_all_months(self, endpoint, record):
+        """
+        Returns the month=0 response for the parameters of this object, fetching it only once per process.
+        """
+        params = dict(self.params, month=0)
+        key = request_key(endpoint, params)
+        with Daily._shared_lock:
+            lock = Daily._fetch_locks.setdefault(key, threading.Lock())
+
+        # Objects of the same site wait for the first request instead of sending their own.
+        try:
+            with lock:
+                data = self.shared_response(key)
+                if data is not None:
+                    record.source = "shared"
+                    return data
+                data = self._fetch(endpoint, params, record)
+                self.share_response(key, data)
+        finally:
+            with Daily._shared_lock:
+                Daily._fetch_locks.pop(key, None)
+        return data
+
+    def _derive(self, params):
         """
-        Update or set parameters.
+        Returns the daily profile averaged from the hourly_source series, or None if it can't be derived.
         """
-        self.params.update(kwargs)
+        if any(params.get(key, 0) for key in ("localtime", "clearsky", "glob_2axis", "clearsky_2axis")):
+            return None
+        series = derive.local_series(self.hourly_source, self.lat, self.lon, params)
+        temperatures = bool(params.get("showtemperatures", 0))
+        if series is None or "Gb(i)" not in series or "Gd(i)" not in series or (temperatures and "T2m" not in series):
+            return None
+        rows = derive.daily_profile(series, params["month"], temperatures)
+        return derive.response(self.hourly_source, "daily_profile", rows)
+
+    @classmethod
+    def shared_response(cls, key):
+        """
+        Returns a shared month=0 response by its request_key, or None.
+        """
+        with Daily._shared_lock:
+            data = Daily._shared.get(key)
+            if data is not None:
+                Daily._shared.move_to_end(key)
+            return data
+
+    @classmethod
+    def share_response(cls, key, data):
+        """
+        Keep a month=0 response for other Daily objects, dropping the least recently used above SHARED_SITES.
+        """
+        with Daily._shared_lock:
+            Daily._shared[key] = data
+            Daily._shared.move_to_end(key)
+            while len(Daily._shared) > cls.SHARED_SITES:
+                Daily._shared.popitem(last=False)
+
+    @staticmethod
+    def month_view(data: dict, month: int) -> dict:
+        """
+        Returns the response for one month out of a month=0 response, shaped like the response of that month.
+        """
+        rows = [{key: value for key, value in row.items() if key != "month"}
+                for row in data["outputs"]["daily_profile"] if row.get("month") == month]
+        return dict(data, outputs=dict(data["outputs"], daily_profile=rows))
+
+    def all_months(self) -> dict:
+        """
+        Daily profiles of all twelve months, from one month=0 request shared with the other Daily objects.
+
+        :return: dict = {month: list of dicts of API return "daily_profile"}
+        """
+        if self.month == 0:
+            self._ensure_data()
+            data = self.data
+        else:
+            data = self._fetch_all_months(self._get_endpoint(), NULL_RECORD)
+        return self.split_months(data)
+
+    @classmethod
+    def split_months(cls, data: dict) -> dict:
+        """
+        Returns the daily profiles of a month=0 response by month, {month: list of dicts}.
+        """
+        return {month: cls.month_view(data, month)["outputs"]["daily_profile"] for month in range(1, 13)}
 
     @property
     def params(self):
@@ -80,6 +229,8 @@ class Daily(BaseAPI):
         # Remove any parameters set to None
         return {k: v for k, v in parameters.items() if v is not None}
 
+    @timed
+    @memoized
     def total_irradiance(self, irradiance_type: str = "global"):
         """
         Returns the total irradiance during one day.
@@ -88,8 +239,7 @@ class Daily(BaseAPI):
                                 'global' is the sum of 'direct' and 'diffuse'.
         :return: irradiance [W/m2] on a fixed plane.
         """
-        if self.data is None:
-            self.fetch_data()
+        self._ensure_data()
 
         total_irradiance = 0
         for hour in self.data["outputs"]["daily_profile"]:
@@ -105,12 +255,13 @@ class Daily(BaseAPI):
 
         return total_irradiance
 
+    @timed
+    @memoized
     def irradiance(self, as_list: bool = False):
         """
         Returns the total irradiance during one day. All types.
         """
-        if self.data is None:
-            self.fetch_data()
+        self._ensure_data()
 
         if as_list:
             irradiance = {"G(i)": [], "Gb(i)": [], "Gd(i)": []}
@@ -129,3 +280,18 @@ class Daily(BaseAPI):
                 irradiance["Gd(i)"] += hour.get("Gd(i)", 0)
 
         return irradiance
+
+    def to_frame(self):
+        """
+        Returns the daily profile as pandas DataFrame indexed by the time of day
+        (local time if localtime=1, else UTC), and by month as well for month=0.
+        """
+        self._ensure_data()
+
+        pd = frame.import_pandas()
+        rows = self.data["outputs"]["daily_profile"]
+        minutes = np.array([int(row["time"][:2]) * 60 + int(row["time"][3:5]) for row in rows], dtype=np.int64)
+        index = pd.TimedeltaIndex(minutes.astype("timedelta64[m]").astype("timedelta64[s]"), name="time")
+        if rows and "month" in rows[0]:
+            index = pd.MultiIndex.from_arrays([[row["month"] for row in rows], index], names=["month", "time"])
+        return frame.records_frame(rows, index, exclude=("month", "time"))
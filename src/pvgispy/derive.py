@@ -0,0 +1,120 @@
+import numpy as np
+
+from .series import TimeSeries
+
+# Hourly params describing the site and plane, which must agree with the derived request.
+PLANE_PARAMS = {"usehorizon": 1, "raddatabase": "PVGIS-SARAH3", "angle": 0, "aspect": 0}
+# Hourly params changing the plane in ways DRcalc and MRcalc don't offer.
+TRACKING_PARAMS = ("trackingtype", "optimalinclination", "optimalangles")
+
+
+def local_series(hourly, lat: float, lon: float, params: dict, keys=PLANE_PARAMS):
+    """
+    Returns the fetched hourly series of an Hourly object if it describes the same site and plane, else None.
+    A running prefetch is waited for, an Hourly that was never fetched or whose prefetch failed counts as missing.
+
+    :param params: Request parameters to compare, only the given keys are checked.
+    :param keys: dict = {param: API default}
+    """
+    if hourly is None or (hourly.data is None and hourly._future is None):
+        return None
+    if (hourly.lat, hourly.lon) != (lat, lon):
+        return None
+    hourly_params = hourly.params
+    if any(hourly_params.get(key) not in (None, 0, False) for key in TRACKING_PARAMS):
+        return None
+    if any(hourly_params.get(key, default) != params.get(key, default) for key, default in keys.items()):
+        return None
+    try:
+        hourly.result()
+    except Exception:
+        return None
+    return hourly.series()
+
+
+def daily_profile(series: TimeSeries, month: int, temperatures: bool = False) -> list:
+    """
+    Average daily profile per month from an hourly series, shaped like the "daily_profile" of DRcalc.
+
+    Every hour of the day is averaged over all days of the month in all years of the series. Rows are labelled
+    by the hour like DRcalc ("12:00"), not by the minute offset of the series ("12:10").
+    Requires the components Gb(i), Gd(i) (and Gr(i)) of an Hourly fetched with components=1.
+
+    :param month: Month number, 0 for all months (rows then have a "month" key like the API output).
+    :param temperatures: Add the average T2m, like showtemperatures=1.
+    :return: list of dicts with "time" ("HH:00" in UTC), "G(i)", "Gb(i)", "Gd(i)" and optionally "T2m".
+    """
+    if "Gb(i)" not in series or "Gd(i)" not in series:
+        raise ValueError("A daily profile needs the components Gb(i) and Gd(i), fetch Hourly with components=1.")
+    columns = {"G(i)": series["Gb(i)"] + series["Gd(i)"] + series.get("Gr(i)", 0),
+               "Gb(i)": series["Gb(i)"], "Gd(i)": series["Gd(i)"]}
+    if temperatures:
+        columns["T2m"] = series["T2m"]
+
+    months = series.group_keys("month_of_year")
+    selected = slice(None) if month == 0 else months == month
+    keys = months[selected] * 24 + series.group_keys("hour")[selected]
+    labels, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(labels))
+    means = {name: np.round(np.bincount(inverse, weights=values[selected], minlength=len(labels)) / counts, 2)
+             for name, values in columns.items()}
+
+    rows = []
+    for index, label in enumerate(labels.tolist()):
+        row = {"month": label // 24} if month == 0 else {}
+        row["time"] = f"{label % 24:02d}:00"
+        row.update((name, values[index].item()) for name, values in means.items())
+        rows.append(row)
+    return rows
+
+
+def monthly(series: TimeSeries, startyear: int = None, endyear: int = None) -> list:
+    """
+    Monthly irradiation and temperature from an hourly series, shaped like the "monthly" output of MRcalc.
+    The series must be on the horizontal plane (angle=0), its irradiance is returned as "H(h)_m" like MRcalc does.
+
+    :param startyear: First year, by default the first of the series.
+    :param endyear: Last year, by default the last of the series.
+    :return: list of dicts with "year", "month", "H(h)_m" [kWh/m2] and "T2m" [°C].
+    """
+    if "G(i)" in series:
+        irradiance = series["G(i)"]
+    elif "Gb(i)" in series and "Gd(i)" in series:
+        irradiance = series["Gb(i)"] + series["Gd(i)"] + series.get("Gr(i)", 0)
+    else:
+        raise ValueError("The hourly series has no irradiance G(i).")
+
+    years = series.years()
+    selected = np.ones(len(years), dtype=bool)
+    if startyear is not None:
+        selected &= years >= startyear
+    if endyear is not None:
+        selected &= years <= endyear
+    keys = series.time.astype("datetime64[M]").astype(np.int64)[selected]
+    labels, inverse = np.unique(keys, return_inverse=True)
+
+    def sums(values):
+        return np.bincount(inverse, weights=values[selected], minlength=len(labels))
+
+    # Hourly mean irradiance [W/m2] times one hour is Wh/m2.
+    irradiation = np.round(sums(irradiance) / 1000, 2)
+    temperature = None
+    if "T2m" in series:
+        temperature = np.round(sums(series["T2m"]) / np.bincount(inverse, minlength=len(labels)), 1)
+
+    rows = []
+    for index, label in enumerate(labels.tolist()):
+        row = {"year": label // 12 + 1970, "month": label % 12 + 1, "H(h)_m": irradiation[index].item()}
+        if temperature is not None:
+            row["T2m"] = temperature[index].item()
+        rows.append(row)
+    return rows
+
+
+def response(hourly, key: str, rows: list) -> dict:
+    """
+    Wrap derived rows like an API response, with the inputs of the hourly request.
+    """
+    inputs = hourly.data.get("inputs", {})
+    inputs = {name: value for name, value in inputs.items() if name in ("location", "meteo_data", "mounting_system")}
+    return {"inputs": inputs, "outputs": {key: rows}, "meta": {"derived_from": "seriescalc"}}
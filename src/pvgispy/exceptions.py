@@ -0,0 +1,17 @@
+class PVGISError(Exception):
+    """
+    Base class for errors raised by pvgispy.
+    """
+
+
+class APIError(PVGISError):
+    def __init__(self, status_code: int, text: str):
+        """
+        The PVGIS API answered with a non-200 status code.
+
+        :param status_code: HTTP status code of the response.
+        :param text: Body of the response, usually the error message of the API.
+        """
+        super().__init__(f"API Error {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
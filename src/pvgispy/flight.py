@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesces concurrent identical requests of this process.
+
+        The first caller of a key runs the request, callers arriving while it is in flight wait for it
+        and get the same result or exception. Nothing is kept once the request finished, so this is no cache.
+        Threads are coalesced with threads, coroutines with coroutines of the same event loop.
+        """
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+
+    def do(self, key, function):
+        """
+        Run function() unless a call with the same key is in flight, then wait for that one.
+
+        :return: (result, shared) where shared tells if the result came from another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, function):
+        """
+        Async version of do, function() returns an awaitable.
+        Cancelling a caller, the first one included, doesn't cancel the request the others wait for.
+
+        :return: (result, shared)
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get((loop, key))
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = loop.create_task(function())
+        self._tasks[(loop, key)] = task
+        task.add_done_callback(lambda _: self._tasks.pop((loop, key), None))
+        return await asyncio.shield(task), False
+
+    def in_flight(self) -> int:
+        """
+        Returns the number of requests currently in flight.
+        """
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from .series import TimeSeries
+
+
+def import_pandas():
+    """
+    Import pandas on first use, so that importing pvgispy doesn't pay for it.
+    """
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("DataFrame conversion requires pandas. Install it with 'pip install pvgispy[pandas]'.")
+    return pandas
+
+
+def series_frame(series: TimeSeries, tz: str = "UTC"):
+    """
+    DataFrame over the arrays of a TimeSeries with a DatetimeIndex. The columns are not copied.
+
+    :param tz: Time zone of the timestamps, None for naive local times.
+    """
+    pd = import_pandas()
+    index = pd.DatetimeIndex(series.time.astype("datetime64[s]"), name="time")
+    if tz is not None:
+        index = index.tz_localize(tz)
+    return pd.DataFrame(series.columns, index=index, copy=False)
+
+
+def records_frame(rows: list, index, exclude=()):
+    """
+    DataFrame over a short list of API rows, e.g. a daily profile or monthly values.
+
+    :param index: pandas Index for the rows.
+    :param exclude: Keys that are represented by the index.
+    """
+    pd = import_pandas()
+    keys = [key for key in (rows[0] if rows else {}) if key not in exclude]
+    columns = {key: np.fromiter((row.get(key, 0) for row in rows), dtype=np.float64, count=len(rows))
+               for key in keys}
+    return pd.DataFrame(columns, index=index, copy=False)
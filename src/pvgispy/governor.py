@@ -0,0 +1,226 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from typing import NamedTuple
+
+from .transport import parse_retry_after
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class TokenBucket:
+    # tokens, time of the last refill, current rate, time until which all requests wait
+    STATE = struct.Struct("<4d")
+
+    def __init__(self, rate: float, burst: float = None, path: str = None):
+        """
+        Token bucket whose state is kept in memory, or in a file to share it between local processes.
+
+        The rate itself is part of the shared state, so a slowdown decided by one process applies to all.
+
+        :param rate: Initial refill rate in tokens per second.
+        :param burst: Capacity of the bucket, by default one second worth of tokens.
+        :param path: State file shared by all processes using it, locked with flock. None keeps the state in memory.
+        """
+        if path is not None and fcntl is None:
+            raise RuntimeError("Sharing a rate limit between processes requires fcntl, which isn't available here.")
+        self.burst = float(burst or max(1.0, rate))
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = (self.burst, time.time(), float(rate), 0.0)
+        # Rate seen by the last update of this process, refreshed by every take.
+        self.last_rate = float(rate)
+
+    def _read(self, file) -> tuple:
+        file.seek(0)
+        content = file.read(self.STATE.size)
+        return self.STATE.unpack(content) if len(content) == self.STATE.size else self._state
+
+    def update(self, change):
+        """
+        Apply change(tokens, updated, rate, blocked) -> (tokens, updated, rate, blocked, result) atomically
+        across threads and processes and return the result.
+        """
+        with self._lock:
+            if self.path is None:
+                *self._state, result = change(*self._state)
+                self.last_rate = self._state[2]
+                return result
+
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, "r+b") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                try:
+                    *state, result = change(*self._read(file))
+                    file.seek(0)
+                    file.write(self.STATE.pack(*state))
+                    file.flush()
+                finally:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+            self.last_rate = state[2]
+            return result
+
+    def take(self) -> float:
+        """
+        Take one token if available.
+
+        :return: 0 if a token was taken, else the seconds to wait before trying again.
+        """
+        def change(tokens, updated, rate, blocked):
+            now = time.time()
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * rate)
+            if now < blocked:
+                return tokens, now, rate, blocked, blocked - now
+            if tokens >= 1:
+                return tokens - 1, now, rate, blocked, 0.0
+            return tokens, now, rate, blocked, (1 - tokens) / rate
+        return self.update(change)
+
+
+class Ticket(NamedTuple):
+    """
+    A granted request slot, returned by RateGovernor.acquire.
+    """
+    started: float
+
+
+class RateGovernor:
+    # Statuses showing the service is overloaded, connection errors count as well.
+    CONGESTION_STATUS = (429, 500, 502, 503, 504)
+    # Seconds between checks of a coroutine waiting for a free slot.
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, rate: float = 30, min_rate: float = 0.5, max_concurrency: int = 16, min_concurrency: int = 1,
+                 burst: float = None, decrease: float = 0.5, increase: float = 1.0, path: str = None):
+        """
+        Process-wide governor of the request rate and concurrency, used by Transport for every attempt.
+
+        A token bucket caps the request rate. With path set the bucket lives in a lock file, so all local processes
+        using the same path share one allowance, e.g. the per-IP limit of PVGIS (30 requests per second).
+        Rate and concurrency adapt AIMD-style: a 429, 5xx or connection error multiplies both by decrease
+        (once per round trip, not per failed request), every healthy response raises the concurrency by
+        increase / concurrency and the rate by increase / rate requests per second, up to the configured maxima.
+
+        :param rate: Maximum requests per second, the starting rate.
+        :param min_rate: Lowest rate backing off can reach.
+        :param max_concurrency: Maximum requests in flight in this process, the starting limit.
+        :param min_concurrency: Lowest concurrency backing off can reach.
+        :param burst: Requests that may be sent at once after an idle period, by default one second worth.
+        :param decrease: Factor applied on congestion.
+        :param increase: Additive increase per round trip of healthy responses.
+        :param path: State file to share the rate between processes, e.g. "/tmp/pvgispy.rate". None for this process only.
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("Invalid decrease. Please, enter a float between 0 and 1.")
+        if not 0 < min_rate <= rate or not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("Invalid limits. Minima must be positive and at most the maxima.")
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease = decrease
+        self.increase = increase
+        self.bucket = TokenBucket(rate, burst, path)
+
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self._decreased = 0.0
+        self._condition = threading.Condition()
+
+    def _try_acquire(self):
+        """
+        Returns a Ticket, or the seconds to wait before trying again.
+        """
+        with self._condition:
+            if self.in_flight >= int(self.concurrency):
+                return None
+            delay = self.bucket.take()
+            if delay:
+                return delay
+            self.in_flight += 1
+            return Ticket(time.time())
+
+    def acquire(self) -> Ticket:
+        """
+        Block until a request may be sent. Pass the ticket to release once the response arrived.
+        """
+        while True:
+            with self._condition:
+                while self.in_flight >= int(self.concurrency):
+                    self._condition.wait()
+            result = self._try_acquire()
+            if isinstance(result, Ticket):
+                return result
+            if result:
+                time.sleep(result)
+
+    async def acquire_async(self) -> Ticket:
+        """
+        Async version of acquire, waits without blocking the event loop.
+        """
+        while True:
+            result = self._try_acquire()
+            if isinstance(result, Ticket):
+                return result
+            await asyncio.sleep(result or self.POLL_INTERVAL)
+
+    def release(self, ticket: Ticket, status: int = None, retry_after: str = None):
+        """
+        Free the slot of a finished request and adapt the limits to its outcome.
+
+        :param status: HTTP status of the response, None for a connection error or timeout.
+        :param retry_after: Retry-After header of the response. All requests sharing the bucket wait that long.
+        """
+        # +1 to increase, -1 to decrease, 0 to keep the rate
+        direction = 1
+        with self._condition:
+            self.in_flight -= 1
+            if status is None or status in self.CONGESTION_STATUS:
+                direction = 0
+                # Requests sent before the last decrease saw the old limits, don't punish them twice.
+                if ticket.started >= self._decreased:
+                    direction = -1
+                    self._decreased = time.time()
+                    self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease)
+            else:
+                self.concurrency = min(self.max_concurrency, self.concurrency + self.increase / self.concurrency)
+            self._condition.notify_all()
+
+        delay = parse_retry_after(retry_after) if retry_after else None
+        if direction > 0 and self.bucket.last_rate >= self.max_rate:
+            # Already at the maximum as of the last acquire, spare the shared state file a write.
+            direction = 0
+        if direction or delay:
+            self.bucket.update(lambda *state: self._adapt(direction, delay, *state))
+
+    def cancel(self, ticket: Ticket):
+        """
+        Free the slot of a request that failed for a reason unrelated to the service, without adapting the limits.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _adapt(self, direction, delay, tokens, updated, rate, blocked):
+        if direction < 0:
+            rate = max(self.min_rate, rate * self.decrease)
+        elif direction > 0:
+            rate = min(self.max_rate, rate + self.increase / rate)
+        if delay:
+            blocked = max(blocked, time.time() + delay)
+        return tokens, updated, rate, blocked, None
+
+    @property
+    def rate(self) -> float:
+        """
+        Current request rate in requests per second, shared between the processes of a bucket.
+        """
+        return self.bucket.update(lambda *state: (*state, state[2]))
+
+    def state(self) -> dict:
+        return {"rate": self.rate, "concurrency": int(self.concurrency), "in_flight": self.in_flight}
@@ -1,12 +1,20 @@
-from .base import BaseAPI
+from concurrent.futures import ThreadPoolExecutor
+
+from . import pvmodel
+from .base import BaseAPI, memoized
+from .metrics import timed
+from .series import TimeSeries, as_series
 
 
 class Hourly(BaseAPI):
     ENDPOINT = "seriescalc"
+    SERIES_KEY = "hourly"
 
     def __init__(self, lat, lon, pvcalculation: bool, angle: float = 0, aspect: float = 0, peakpower: float = None,
                  loss: float = None,
-                 startyear: int = None, endyear: int = None, pvtech: str = "crystSi", **kwargs):
+                 startyear: int = None, endyear: int = None, pvtech: str = "crystSi", columnar: bool = False,
+                 stream: bool = False, compact: bool = False, chunk_years: int = None, chunk_workers: int = 4,
+                 **kwargs):
         """
         Hourly averages data.
 
@@ -20,6 +28,18 @@ class Hourly(BaseAPI):
         :param angle: (Default: 0) Inclination angle from horizontal plane. Not relevant for 2-axis tracking.
         :param aspect: (Default: 0) Orientation (azimuth) angle of the (fixed) plane.
                        0=south, 90=west, -90=east. Not relevant for tracking planes.
+        :param columnar: (Default: False) Store the hourly series as TimeSeries of numpy arrays
+                         instead of a list of dicts. Uses far less memory and vectorizes the aggregations.
+        :param stream: (Default: False) Parse the response incrementally while it is downloaded, straight into
+                       a TimeSeries. Keeps peak memory bounded for long year ranges. Implies columnar.
+        :param compact: (Default: False) Request the csv output, which is less than half the size of the json,
+                        and parse it straight into a TimeSeries. Inputs are recovered from the csv header.
+                        Implies columnar, replaces stream.
+        :param chunk_years: (Optional) Split the year range into requests of at most this many years, fetched
+                            concurrently and joined into one series. Every chunk is cached on its own, so with a
+                            cache extending the range only fetches the missing years. Chunks are aligned to
+                            multiples of chunk_years, e.g. 1 caches every year separately.
+        :param chunk_workers: (Default: 4) Number of chunks fetched at the same time.
 
         Describes the various output variables from the API call:
 
@@ -31,6 +51,13 @@ class Hourly(BaseAPI):
         - `WS10m`: 10-m total wind speed (units: m/s).
         """
         self.pvcalculation = pvcalculation
+        self.columnar = columnar or stream or compact
+        self.stream = stream and not compact
+        self.compact = compact
+        if chunk_years is not None and chunk_years < 1:
+            raise ValueError("Invalid chunk_years. Please, enter an integer of at least 1.")
+        self.chunk_years = chunk_years
+        self.chunk_workers = chunk_workers
 
         if endyear < startyear:
             raise ValueError("Incorrect time period. The calculation period for this app should be at least 1 years.")
@@ -72,11 +99,14 @@ class Hourly(BaseAPI):
         """
         return self.BASE_URL + self.ENDPOINT
 
-    def set_params(self, **kwargs):
-        """
-        Update or set parameters.
-        """
-        self.params.update(kwargs)
+    def _init_kwargs(self):
+        kwargs = dict(super()._init_kwargs(), pvcalculation=self.pvcalculation, angle=self.angle, aspect=self.aspect,
+                      startyear=self.startyear, endyear=self.endyear, columnar=self.columnar, stream=self.stream,
+                      compact=self.compact,
+                      chunk_years=self.chunk_years, chunk_workers=self.chunk_workers)
+        if self.pvcalculation:
+            kwargs.update(peakpower=self.peakpower, loss=self.loss, pvtech=self.pvtech)
+        return kwargs
 
     @property
     def params(self):
@@ -101,47 +131,135 @@ class Hourly(BaseAPI):
             "optimalinclination": self._params.get("optimalinclination", None),
             "optimalangles": self._params.get("optimalangles", None),
             "components": self._params.get("components", None),
-            "outputformat": self._params.get("outputformat", "json"),
+            "outputformat": "csv" if self.compact else self._params.get("outputformat", "json"),
             "browser": self._params.get("browser", 0)
         }
 
         # Remove any parameters set to None
         return {k: v for k, v in parameters.items() if v is not None}
 
+    def year_ranges(self):
+        """
+        Returns the (startyear, endyear) ranges that are requested separately, a single one without chunk_years.
+        """
+        if not self.chunk_years:
+            return [(self.startyear, self.endyear)]
+
+        ranges = []
+        start = self.startyear
+        while start <= self.endyear:
+            end = min(start - start % self.chunk_years + self.chunk_years - 1, self.endyear)
+            ranges.append((start, end))
+            start = end + 1
+        return ranges
+
+    def _chunk_kwargs(self, startyear, endyear):
+        """
+        Constructor arguments of the request for one chunk of the year range.
+        """
+        return dict(self._init_kwargs(), startyear=startyear, endyear=endyear, chunk_years=None, cache=self.cache,
+                    transport=self.transport, site_index=self.site_index, metrics=self.metrics)
+
     def fetch_data(self):
         """
-        Fetch data and change start and endyear if set to None before.
+        Fetch data from the API. With chunk_years the year range is fetched as concurrent requests.
+        """
+        ranges = self.year_ranges()
+        if len(ranges) == 1:
+            return super().fetch_data()
+
+        chunks = []
+        for years in ranges:
+            chunk = type(self)(**self._chunk_kwargs(*years))
+            chunk.BASE_URL = self.BASE_URL
+            chunks.append(chunk)
+        with ThreadPoolExecutor(max_workers=self.chunk_workers) as executor:
+            list(executor.map(lambda chunk: chunk.fetch_data(), chunks))
+        self._load(self.stitch([chunk.data for chunk in chunks]))
+
+    def stitch(self, parts: list) -> dict:
+        """
+        Join the responses of consecutive chunks into one response over their whole year range.
+        "inputs" and "meta" are taken from the first chunk, with the year range of all of them.
+        """
+        first, last = parts[0], parts[-1]
+        series = [part["outputs"]["hourly"] for part in parts]
+        if self.columnar:
+            hourly = TimeSeries.concat([as_series(rows) for rows in series])
+        else:
+            hourly = [row for rows in series for row in rows]
+
+        meteo_data = dict(first["inputs"]["meteo_data"], year_max=last["inputs"]["meteo_data"]["year_max"])
+        inputs = dict(first["inputs"], meteo_data=meteo_data)
+        return dict(first, inputs=inputs, outputs=dict(first["outputs"], hourly=hourly))
+
+    def _load(self, data):
+        """
+        Take over the data and change start and endyear if set to None before.
         """
-        super().fetch_data()
+        if self.columnar and not isinstance(data["outputs"]["hourly"], TimeSeries):
+            outputs = dict(data["outputs"], hourly=TimeSeries.from_records(data["outputs"]["hourly"]))
+            data = dict(data, outputs=outputs)
+
+        super()._load(data)
 
         self.startyear = self.data["inputs"]["meteo_data"]["year_min"]
         self.endyear = self.data["inputs"]["meteo_data"]["year_max"]
 
     def hourly(self):
-        if self.data is None:
-            self.fetch_data()
+        """
+        Hourly data over the selected years.
+
+        :return: list of dicts of API return "hourly", or a TimeSeries if columnar is set.
+        """
+        self._ensure_data()
 
         hourly = self.data["outputs"]["hourly"]
 
         return hourly
 
+    def iter_hourly(self):
+        """
+        Stream the hourly rows from the API without storing them.
+
+        Rows are yielded while the response is downloaded. "inputs" and, once exhausted, "meta"
+        are available in the `document` attribute of the returned iterator.
+
+        :return: SeriesStream yielding dicts shaped like the rows of hourly().
+        """
+        return self._stream_series()
+
+    @timed
+    @memoized
     def yearly_pv_production(self):
         """
         Calculates the yearly pv power production in W for each year in data.
 
         :return: dict = {year: power}
         """
-        if self.data is None:
-            self.fetch_data()
-
-        hourly = self.data["outputs"]["hourly"]
+        series = self.series()
 
         p = {}
         for year in range(self.startyear, self.endyear+1):
             p[year] = 0
 
-        for hour in hourly:
-            year = int(hour["time"][:4])
-            p[year] += hour.get("P", 0)
+        if "P" in series:
+            p.update(series.aggregate("P", by="year"))
 
         return p
+
+    @timed
+    def simulate(self, peakpower, loss, pvtech="crystSi"):
+        """
+        Computes the hourly pv power locally for one or many systems, without another API call.
+
+        Fetch with pvcalculation=False (or True) once, then evaluate any number of variants.
+        See pvmodel.simulate for the broadcasting rules.
+
+        :param peakpower: Nominal power of the PV system(s), in kW.
+        :param loss: Sum of system losses, in percent.
+        :param pvtech: PV technology or list of technologies. {"crystSi", "CIS", "CdTe", "Unknown"}
+        :return: array of P in W, shape (configurations, hours) or (hours,) for a single system.
+        """
+        mountingplace = self._params.get("mountingplace", "free")
+        return pvmodel.simulate(self.series(), peakpower, loss, pvtech, mountingplace)
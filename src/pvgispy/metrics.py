@@ -0,0 +1,279 @@
+import contextlib
+import functools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Metrics:
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = 10000):
+        """
+        Collects timings, sizes, retries and cache statistics of requests and analysis methods.
+
+        Enable it for every endpoint with BaseAPI.metrics = Metrics(), or per object with the metrics argument.
+        Thread-safe, so one object can be shared by a whole batch.
+
+        Request phases (seconds):
+        - `wait`: Until the response headers arrived, i.e. DNS, connect, TLS and server compute.
+        - `download`: Reading the body. Includes decoding for streamed responses.
+        - `backoff`: Sleeping between retries.
+        - `decode`: Parsing the json body.
+        - `load`: Taking over the data, e.g. the conversion to columns.
+        - `total`: The whole fetch_data call.
+
+        Analysis methods such as yearly_pv_production or total_irradiance are recorded under their name.
+
+        :param window: Number of most recent samples per phase kept for the percentiles.
+        """
+        self.window = window
+        self.callbacks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Drop all collected values.
+        """
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.bytes = 0
+            self.sources = {"network": 0, "cache": 0, "site_index": 0, "shared": 0, "derived": 0}
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.status = {}
+            self._totals = {}
+            self._counts = {}
+            self._samples = {}
+
+    def subscribe(self, callback):
+        """
+        Call callback(record) for every recorded request or method call, e.g. to forward it to a metrics backend.
+        Records are dicts, see Record.as_dict. Method calls have kind "operation", a name and seconds.
+        """
+        self.callbacks.append(callback)
+        return callback
+
+    def observe(self, name: str, seconds: float):
+        """
+        Record the duration of an analysis method.
+        """
+        with self._lock:
+            self._add(name, seconds)
+        self._notify({"kind": "operation", "name": name, "seconds": seconds})
+
+    def add(self, record: "Record"):
+        """
+        Record a finished request.
+        """
+        with self._lock:
+            self.requests += 1
+            self.errors += record.error is not None
+            self.retries += record.retries
+            self.bytes += record.bytes
+            if record.source is not None:
+                self.sources[record.source] += 1
+            self.cache_hits += record.cache == "hit"
+            self.cache_misses += record.cache == "miss"
+            if record.status is not None:
+                self.status[record.status] = self.status.get(record.status, 0) + 1
+            for phase, seconds in record.phases.items():
+                self._add(phase, seconds)
+        self._notify(record.as_dict())
+
+    def _add(self, name, seconds):
+        if name not in self._samples:
+            self._samples[name] = deque(maxlen=self.window)
+            self._totals[name] = 0.0
+            self._counts[name] = 0
+        self._samples[name].append(seconds)
+        self._totals[name] += seconds
+        self._counts[name] += 1
+
+    def _notify(self, record):
+        for callback in self.callbacks:
+            callback(record)
+
+    def summary(self) -> dict:
+        """
+        Returns the aggregated values, e.g. after a batch run.
+
+        :return: dict with request counters and for each phase or method its count, total, mean,
+                 max and the percentiles p50, p95 and p99 over the most recent samples.
+        """
+        with self._lock:
+            timings = {}
+            for name, samples in self._samples.items():
+                values = np.fromiter(samples, dtype=np.float64, count=len(samples))
+                timing = {"count": self._counts[name], "total": self._totals[name],
+                          "mean": self._totals[name] / self._counts[name], "max": values.max().item()}
+                for q, value in zip(self.PERCENTILES, np.percentile(values, self.PERCENTILES)):
+                    timing[f"p{q}"] = value.item()
+                timings[name] = timing
+
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "bytes": self.bytes,
+                "sources": dict(self.sources),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "status": dict(self.status),
+                "timings": timings,
+            }
+
+    def flatten(self, prefix: str = "pvgis", separator: str = ".") -> dict:
+        """
+        Returns the summary as flat {name: number} dict, ready to be pushed as gauges to statsd, Prometheus & co.
+        E.g. {"pvgis.requests": 10, "pvgis.timings.wait.p95": 0.8, ...}
+        """
+        flat = {}
+
+        def walk(name, value):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    walk(f"{name}{separator}{key}", item)
+            else:
+                flat[name] = value
+
+        walk(prefix, self.summary())
+        return flat
+
+
+class Record:
+    def __init__(self, endpoint: str):
+        """
+        Measurements of one fetch_data call.
+        """
+        self.endpoint = endpoint.rstrip("/").rsplit("/", 1)[-1]
+        self.source = None
+        self.cache = None
+        self.status = None
+        self.retries = 0
+        self.bytes = 0
+        self.error = None
+        self.phases = {}
+        self.started = time.time()
+        self._start = time.perf_counter()
+
+    def phase(self, name: str):
+        return _Phase(self, name)
+
+    def response(self, response):
+        """
+        Take over status, retries, size and transport timings of a response.
+        Timings add to phases measured already, e.g. the download of a body parsed while streaming.
+        """
+        self.source = "network"
+        self.status = response.status_code
+        self.retries = getattr(response, "retries", 0)
+        for name, seconds in getattr(response, "timings", {}).items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.bytes = transferred_bytes(response)
+
+    def as_dict(self) -> dict:
+        return {"kind": "request", "endpoint": self.endpoint, "source": self.source, "cache": self.cache,
+                "status": self.status, "retries": self.retries, "bytes": self.bytes, "error": self.error,
+                "started": self.started, "phases": dict(self.phases)}
+
+
+class _Phase:
+    def __init__(self, record, name):
+        self.record = record
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        phases = self.record.phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class _NullRecord:
+    """
+    Stand-in for Record if no metrics are configured, so fetching pays nothing for instrumentation.
+    """
+    def __setattr__(self, name, value):
+        pass
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def response(self, response):
+        pass
+
+
+class _NullPhase:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+NULL_RECORD = _NullRecord()
+
+
+@contextlib.contextmanager
+def track(metrics: Metrics, endpoint: str):
+    """
+    Context manager measuring one fetch_data call into metrics. Yields NULL_RECORD if metrics is None.
+    """
+    if metrics is None:
+        yield NULL_RECORD
+        return
+
+    record = Record(endpoint)
+    try:
+        yield record
+    except Exception as error:
+        record.error = type(error).__name__
+        record.status = getattr(error, "status_code", record.status)
+        raise
+    finally:
+        record.phases["total"] = time.perf_counter() - record._start
+        metrics.add(record)
+
+
+def transferred_bytes(response) -> int:
+    """
+    Returns the number of body bytes received on the wire, i.e. before decompression.
+    """
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    headers = getattr(response, "headers", None) or {}
+    if "Content-Length" in headers:
+        return int(headers["Content-Length"])
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, bytes) else 0
+
+
+def timed(method):
+    """
+    Decorator recording the duration of an analysis method in the metrics of its endpoint object.
+    Data is fetched before the clock starts, so only the computation is measured.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.metrics is None:
+            return method(self, *args, **kwargs)
+        self._ensure_data()
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.metrics.observe(method.__name__, time.perf_counter() - start)
+
+    return wrapper
@@ -1,10 +1,16 @@
-from .base import BaseAPI
+import numpy as np
+
+from . import derive, frame
+from .base import BaseAPI, memoized
+from .metrics import timed
 
 
 class Monthly(BaseAPI):
     ENDPOINT = "MRcalc"
+    # Hourly object to derive the monthly values from instead of sending a request, see _derive.
+    hourly_source = None
 
-    def __init__(self, lat, lon, **kwargs):
+    def __init__(self, lat, lon, hourly=None, **kwargs):
         """
         Typical meteorological year.
 
@@ -23,20 +29,37 @@ class Monthly(BaseAPI):
         - `T2m`: 2-m air temperature (units: degree Celsius).
         - `WD10m`: 10-m wind direction (0 = N, 90 = E) (units: degree).
         - `WS10m`: 10-m total wind speed (units: m/s).
+
+        :param hourly: (Optional) Hourly object of the same site, raddatabase and usehorizon on the horizontal plane
+                       (angle=0), covering startyear to endyear. The monthly irradiation H(h)_m and T2m are then
+                       summed from its series instead of requesting MRcalc. If it isn't fetched or doesn't match,
+                       or startyear and endyear aren't both given (MRcalc then returns all years of the database),
+                       the API is used. See from_hourly.
         """
+        if hourly is not None:
+            self.hourly_source = hourly
         super().__init__(lat, lon, **kwargs)
 
-    def _get_endpoint(self):
+    @classmethod
+    def from_hourly(cls, hourly, **kwargs):
         """
-        Returns the endpoint URL for the Daily Radiation API call.
+        Monthly object computed from a fetched horizontal (angle=0) Hourly series of the same site,
+        so no MRcalc request is sent.
+
+        :param kwargs: Further arguments of Monthly, e.g. startyear and endyear within the years of hourly.
+                       By default the years of hourly.
         """
-        return self.BASE_URL + self.ENDPOINT
+        params = hourly.params
+        site = {key: params[key] for key in ("usehorizon", "raddatabase") if key in params}
+        years = {"startyear": hourly.startyear, "endyear": hourly.endyear}
+        site.update((key, value) for key, value in years.items() if value is not None)
+        return cls(hourly.lat, hourly.lon, hourly=hourly, **dict(site, **kwargs))
 
-    def set_params(self, **kwargs):
+    def _get_endpoint(self):
         """
-        Update or set parameters.
+        Returns the endpoint URL for the Daily Radiation API call.
         """
-        self.params.update(kwargs)
+        return self.BASE_URL + self.ENDPOINT
 
     @property
     def params(self):
@@ -47,6 +70,7 @@ class Monthly(BaseAPI):
             "lat": self.lat,
             "lon": self.lon,
             "usehorizon": self._params.get("usehorizon", 1),
+            "raddatabase": self._params.get("raddatabase", None),
             "startyear": self._params.get("startyear", None),
             "endyear": self._params.get("endyear", None),
             "outputformat": self._params.get("outputformat", "json"),
@@ -54,4 +78,83 @@ class Monthly(BaseAPI):
         }
 
         # Remove any parameters set to None
-        return {k: v for k, v in parameters.items() if v is not None}
\ No newline at end of file
+        return {k: v for k, v in parameters.items() if v is not None}
+
+    def _derive(self, params):
+        """
+        Returns the monthly values summed from the hourly_source series, or None if they can't be derived.
+        """
+        hourly = self.hourly_source
+        params = dict(self._params, **params)
+        startyear, endyear = params.get("startyear"), params.get("endyear")
+        # Without a year range MRcalc returns all years of the database, more than the series covers.
+        if startyear is None or endyear is None:
+            return None
+        # MRcalc returns the horizontal irradiation, so only a horizontal series (angle 0) matches.
+        series = derive.local_series(hourly, self.lat, self.lon, params,
+                                     keys={key: derive.PLANE_PARAMS[key] for key in ("usehorizon", "raddatabase",
+                                                                                     "angle")})
+        if series is None:
+            return None
+        if startyear < hourly.startyear or endyear > hourly.endyear:
+            return None
+        rows = derive.monthly(series, startyear, endyear)
+        return derive.response(hourly, "monthly", rows)
+
+    def _values(self, variable: str = None):
+        """
+        Returns the monthly rows and the variable to analyse, by default the first irradiation value.
+        """
+        self._ensure_data()
+        rows = self.data["outputs"]["monthly"]
+        keys = [key for key in (rows[0] if rows else {}) if key not in ("year", "month")]
+        if variable is None:
+            variable = next((key for key in keys if key.startswith("H")), keys[0] if keys else None)
+        if variable not in keys:
+            raise ValueError(f"Invalid variable '{variable}'. Available: {', '.join(keys)}.")
+        return rows, variable
+
+    @timed
+    @memoized
+    def yearly_values(self, variable: str = None, how: str = "sum") -> dict:
+        """
+        Returns a monthly variable reduced per year, e.g. the yearly irradiation in kWh/m2.
+
+        :param variable: Key of the monthly output, e.g. "H(h)_m" or "T2m". By default the irradiation.
+        :param how: "sum" or "mean", e.g. "mean" for temperatures.
+        :return: dict = {year: value}
+        """
+        rows, variable = self._values(variable)
+        return self._reduce(rows, "year", variable, how)
+
+    @timed
+    @memoized
+    def monthly_average(self, variable: str = None) -> dict:
+        """
+        Returns the average of a monthly variable over the years for each month of the year.
+
+        :return: dict = {month (1-12): value}
+        """
+        rows, variable = self._values(variable)
+        return self._reduce(rows, "month", variable, "mean")
+
+    @staticmethod
+    def _reduce(rows, by: str, variable: str, how: str) -> dict:
+        if how not in ("sum", "mean"):
+            raise ValueError("Invalid aggregation. Choose from sum, mean.")
+        labels, inverse = np.unique([row[by] for row in rows], return_inverse=True)
+        values = np.bincount(inverse, weights=[row[variable] for row in rows], minlength=len(labels))
+        if how == "mean":
+            values = values / np.bincount(inverse, minlength=len(labels))
+        return {label: value for label, value in zip(labels.tolist(), values.tolist())}
+
+    def to_frame(self):
+        """
+        Returns the monthly values as pandas DataFrame indexed by the first day of each month.
+        """
+        self._ensure_data()
+
+        pd = frame.import_pandas()
+        rows = self.data["outputs"]["monthly"]
+        index = pd.DatetimeIndex([f"{row['year']:04d}-{row['month']:02d}-01" for row in rows], name="time")
+        return frame.records_frame(rows, index, exclude=("year", "month"))
@@ -0,0 +1,245 @@
+import os
+import sys
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import pvmodel
+from .series import TimeSeries, as_series
+
+
+class Portfolio:
+    def __init__(self, sites, variables=None, max_workers: int = None):
+        """
+        Hourly series of many sites in shared memory, for analytics on a process pool.
+
+        Every variable is one 2-D float64 array of shape (sites, hours) in a shared memory block, `arrays` holds
+        views of them until close.
+        Worker processes attach to the blocks once and each computes a range of sites,
+        so the series are never pickled and all cores are used.
+
+        :param sites: Fetched Hourly or TMY objects, or their series (TimeSeries or list of rows).
+                      All sites need the same number of hours, e.g. the same year range. Groupings use the
+                      timestamps of the first site, for TMY the hours of the year line up across sites.
+        :param variables: Variables to place in shared memory, by default those all sites have.
+        :param max_workers: Number of processes, by default the number of CPUs.
+        """
+        series = [as_series(site.series() if hasattr(site, "series") else site) for site in sites]
+        if not series:
+            raise ValueError("A portfolio needs at least one site.")
+        hours = len(series[0])
+        if any(len(site) != hours for site in series):
+            raise ValueError("All sites of a portfolio need the same number of hours.")
+        if variables is None:
+            variables = [key for key in series[0].keys() if all(key in site for site in series)]
+
+        self.time = series[0].time
+        self.sites = len(series)
+        self.max_workers = max_workers or os.cpu_count()
+        self.arrays = {}
+        self._blocks = {}
+        self._pool = None
+        self._finalizer = weakref.finalize(self, _release, self._blocks)
+
+        for variable in variables:
+            array = self._allocate(variable)
+            for index, site in enumerate(series):
+                array[index] = site[variable]
+
+    def __len__(self):
+        return self.sites
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory.
+        Arrays taken from `arrays` are views of the shared memory, copy them to use them afterwards.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        # Drop the views before the blocks are unmapped, reading them afterwards would crash.
+        self.arrays.clear()
+        self._finalizer()
+
+    def _allocate(self, variable: str) -> np.ndarray:
+        """
+        Create a shared (sites, hours) array for a variable.
+        """
+        if variable in self.arrays:
+            return self.arrays[variable]
+        if self._pool is not None:
+            # Running workers only know the blocks they attached to at start.
+            self._pool.shutdown()
+            self._pool = None
+        shape = (self.sites, len(self.time))
+        block = shared_memory.SharedMemory(create=True, size=max(8, int(np.prod(shape)) * 8))
+        self._blocks[variable] = block
+        self.arrays[variable] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        return self.arrays[variable]
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            layout = {variable: (block.name, self.arrays[variable].shape) for variable, block in self._blocks.items()}
+            self._pool = ProcessPoolExecutor(self.max_workers, initializer=_attach, initargs=(layout, self.time))
+        return self._pool
+
+    def _map(self, function, *args) -> list:
+        """
+        Run function(start, stop, *args) for ranges of sites on the pool, returns the results in site order.
+        """
+        sites = len(self)
+        tasks = min(sites, self.max_workers * 4)
+        bounds = np.linspace(0, sites, tasks + 1).astype(int)
+        futures = [self.pool.submit(function, start, stop, *args) for start, stop in zip(bounds[:-1], bounds[1:])]
+        return [future.result() for future in futures]
+
+    def aggregate(self, variable: str, by="year", how: str = "sum", q: float = None) -> dict:
+        """
+        Group-by reduction of one variable for all sites, see TimeSeries.aggregate.
+
+        :param by: "year", "month", "day", "hour", "month_of_year" or an array with one label per hour.
+        :return: dict = {group: array with the value of every site}
+        """
+        if variable not in self.arrays:
+            raise ValueError(f"Invalid variable '{variable}'. Available: {', '.join(self.arrays)}.")
+        if how not in TimeSeries.AGGREGATIONS:
+            raise ValueError(f"Invalid aggregation. Choose from {', '.join(TimeSeries.AGGREGATIONS)}.")
+        if how == "percentile" and q is None:
+            raise ValueError("how='percentile' requires q.")
+
+        labels = np.unique(TimeSeries(self.time, {}).group_keys(by))
+        values = np.concatenate(self._map(_aggregate, variable, by, how, q), axis=0)
+        return {TimeSeries._label(label): values[:, index] for index, label in enumerate(labels)}
+
+    def yearly_energy(self, variable: str = "P") -> dict:
+        """
+        Returns the energy per year of every site in Wh, e.g. of the PV power P.
+
+        :return: dict = {year: array}
+        """
+        return self.aggregate(variable, "year", "sum")
+
+    def specific_yield(self, peakpower, variable: str = "P") -> dict:
+        """
+        Returns the yearly specific yield of every site in kWh/kWp.
+
+        :param peakpower: Nominal power in kW, one value or one per site.
+        :return: dict = {year: array}
+        """
+        peakpower = np.broadcast_to(np.asarray(peakpower, dtype=np.float64), (len(self),))
+        return {year: energy / 1000 / peakpower for year, energy in self.yearly_energy(variable).items()}
+
+    def capacity_factor(self, peakpower, variable: str = "P") -> np.ndarray:
+        """
+        Returns the capacity factor of every site over the whole period, mean power / nominal power.
+
+        :param peakpower: Nominal power in kW, one value or one per site.
+        """
+        mean = np.concatenate(self._map(_mean, variable))
+        return mean / (np.asarray(peakpower, dtype=np.float64) * 1000)
+
+    def monthly_profile(self, variable: str = "P", how: str = "mean") -> dict:
+        """
+        Returns the profile over the months of the year of every site.
+
+        :return: dict = {month (1-12): array}
+        """
+        return self.aggregate(variable, "month_of_year", how)
+
+    def simulate(self, peakpower, loss, pvtech: str = "crystSi", mountingplace: str = "free",
+                 name: str = "P") -> np.ndarray:
+        """
+        Compute the hourly PV power of every site on the pool, see pvmodel.simulate.
+        The result is stored as shared variable `name` and can be aggregated like the fetched ones.
+
+        :param peakpower: Nominal power in kW, one value or one per site.
+        :param loss: System losses in percent, one value or one per site.
+        :param pvtech: PV technology of all sites.
+        :return: array of shape (sites, hours) with P in W, a copy that stays valid after close.
+        """
+        for key in ("G(i)", "T2m", "WS10m"):
+            if key not in self.arrays:
+                raise ValueError(f"The portfolio has no '{key}', build it from Hourly series.")
+        peakpower = np.broadcast_to(np.asarray(peakpower, dtype=np.float64), (len(self),))
+        loss = np.broadcast_to(np.asarray(loss, dtype=np.float64), (len(self),))
+        if np.any((loss < 0) | (loss >= 100)):
+            raise ValueError("Invalid loss value. Please, enter a float between 0 and 100.")
+
+        self._allocate(name)
+        self._map(_simulate, name, peakpower, loss, pvtech, mountingplace)
+        return self.arrays[name].copy()
+
+
+def _release(blocks: dict):
+    for block in blocks.values():
+        block.close()
+        block.unlink()
+    blocks.clear()
+
+
+# Arrays and group indices of a worker process, set up once by _attach.
+_worker = {}
+
+
+def _attach(layout: dict, time: np.ndarray):
+    options = {"track": False} if sys.version_info >= (3, 13) else {}
+    for variable, (name, shape) in layout.items():
+        block = shared_memory.SharedMemory(name=name, **options)
+        _worker.setdefault("blocks", []).append(block)
+        _worker[variable] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    _worker["series"] = TimeSeries(time, {})
+    _worker["groups"] = {}
+
+
+def _groups(by):
+    """
+    Returns (inverse, starts, order) of a grouping, cached per worker for the built-in groupings.
+    """
+    key = by if isinstance(by, str) else None
+    if key in _worker["groups"]:
+        return _worker["groups"][key]
+
+    labels, inverse = np.unique(_worker["series"].group_keys(by), return_inverse=True)
+    order = None if np.all(inverse[1:] >= inverse[:-1]) else np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse if order is None else inverse[order], np.arange(len(labels)))
+    if key is not None:
+        _worker["groups"][key] = (inverse, starts, order)
+    return inverse, starts, order
+
+
+def _aggregate(start, stop, variable, by, how, q):
+    inverse, starts, order = _groups(by)
+    block = _worker[variable][start:stop]
+    ordered = block if order is None else block[:, order]
+    counts = np.diff(np.append(starts, len(inverse)))
+
+    if how == "count":
+        return np.broadcast_to(counts, (len(block), len(counts))).astype(np.float64)
+    if how in ("sum", "mean"):
+        result = np.add.reduceat(ordered, starts, axis=1)
+        return result / counts if how == "mean" else result
+    if how == "max":
+        return np.maximum.reduceat(ordered, starts, axis=1)
+    if how == "min":
+        return np.minimum.reduceat(ordered, starts, axis=1)
+    return np.stack([np.percentile(group, q, axis=1) for group in np.split(ordered, starts[1:], axis=1)], axis=1)
+
+
+def _mean(start, stop, variable):
+    return _worker[variable][start:stop].mean(axis=1)
+
+
+def _simulate(start, stop, name, peakpower, loss, pvtech, mountingplace):
+    efficiency = pvmodel.relative_efficiency(_worker["G(i)"][start:stop], _worker["T2m"][start:stop],
+                                             _worker["WS10m"][start:stop], pvtech, mountingplace)
+    scale = peakpower[start:stop] * (1 - loss[start:stop] / 100)
+    _worker[name][start:stop] = scale[:, None] * _worker["G(i)"][start:stop] * efficiency
@@ -0,0 +1,111 @@
+import numpy as np
+
+from .series import as_series
+
+# Coefficients k1..k6 of the PV module efficiency model by Huld et al. (2011), as used by PVGIS.
+EFFICIENCY_COEFFICIENTS = {
+    "crystSi": (-0.017237, -0.040465, -0.004702, 0.000149, 0.000170, 0.000005),
+    "CIS": (-0.005554, -0.038724, -0.003723, -0.000905, -0.001256, 0.000001),
+    "CdTe": (-0.046689, -0.072844, -0.002262, 0.000276, 0.000159, -0.0000006),
+}
+
+# PVGIS assumes a fixed 8% loss due to temperature and low irradiance for unknown technologies.
+UNKNOWN_EFFICIENCY = 0.92
+
+# Module temperature model T_mod = T2m + G / (U0 + U1 * WS10m), by mounting place.
+TEMPERATURE_COEFFICIENTS = {
+    "free": (26.9, 6.2),
+    "building": (20.0, 0.0),
+}
+
+
+def relative_efficiency(irradiance, temperature, wind_speed, pvtech: str = "crystSi",
+                        mountingplace: str = "free") -> np.ndarray:
+    """
+    Relative efficiency of a PV module compared to standard test conditions.
+
+    :param irradiance: In-plane irradiance G(i) [W/m2].
+    :param temperature: Air temperature T2m [°C].
+    :param wind_speed: Wind speed WS10m [m/s].
+    :param pvtech: PV technology. {"crystSi", "CIS", "CdTe", "Unknown"}
+    :param mountingplace: "free" for free-standing or "building" for building-integrated modules.
+    :return: array of the relative efficiency, 0 where there is no irradiance.
+    """
+    irradiance = np.asarray(irradiance, dtype=np.float64)
+    if pvtech == "Unknown":
+        return np.where(irradiance > 0, UNKNOWN_EFFICIENCY, 0.0)
+    if pvtech not in EFFICIENCY_COEFFICIENTS:
+        raise ValueError("Invalid PV Technology. Valid technologies are 'crystSi', 'CIS', 'CdTe', 'Unknown'")
+    if mountingplace not in TEMPERATURE_COEFFICIENTS:
+        raise ValueError("Invalid mounting place. Valid mounting places are 'free', 'building'")
+
+    k1, k2, k3, k4, k5, k6 = EFFICIENCY_COEFFICIENTS[pvtech]
+    u0, u1 = TEMPERATURE_COEFFICIENTS[mountingplace]
+
+    g = irradiance / 1000
+    module_temperature = np.asarray(temperature) + irradiance / (u0 + u1 * np.asarray(wind_speed))
+    t = module_temperature - 25
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_g = np.log(g)
+        efficiency = (1 + k1 * log_g + k2 * log_g ** 2 + t * (k3 + k4 * log_g + k5 * log_g ** 2) + k6 * t ** 2)
+    return np.where(g > 0, np.maximum(efficiency, 0), 0.0)
+
+
+def simulate(rows, peakpower, loss, pvtech="crystSi", mountingplace: str = "free") -> np.ndarray:
+    """
+    Compute the hourly PV power P locally for one or many system configurations.
+
+    Uses G(i), T2m and WS10m of an Hourly series fetched with pvcalculation=False, so one download
+    serves any number of system variants. Arguments are broadcast against each other, e.g.
+    peakpower=[1, 2, 5], loss=14 describes three systems. The irradiance dependent part is computed
+    once per technology, all configurations are evaluated in one vectorized pass.
+
+    :param rows: Hourly rows or TimeSeries, e.g. Hourly(...).hourly().
+    :param peakpower: Nominal power of the PV system(s), in kW.
+    :param loss: Sum of system losses, in percent.
+    :param pvtech: PV technology or list of technologies. {"crystSi", "CIS", "CdTe", "Unknown"}
+    :param mountingplace: "free" or "building".
+    :return: array of shape (configurations, hours) with P in W, or (hours,) for a single configuration.
+    """
+    series = as_series(rows)
+    for key in ("G(i)", "T2m", "WS10m"):
+        if key not in series:
+            raise ValueError(f"The hourly series has no '{key}', fetch it with pvcalculation=False or True.")
+
+    single = np.ndim(peakpower) == 0 and np.ndim(loss) == 0 and isinstance(pvtech, str)
+    peakpower, loss, pvtech = np.broadcast_arrays(np.atleast_1d(peakpower).astype(np.float64),
+                                                  np.atleast_1d(loss).astype(np.float64),
+                                                  np.atleast_1d(np.asarray(pvtech, dtype=object)))
+    if np.any((loss < 0) | (loss >= 100)):
+        raise ValueError("Invalid loss value. Please, enter a float between 0 and 100.")
+
+    power = np.empty((len(peakpower), len(series)))
+    for tech in set(pvtech):
+        selected = pvtech == tech
+        efficiency = relative_efficiency(series["G(i)"], series["T2m"], series["WS10m"], tech, mountingplace)
+        # P [W] = Pnom [kW] * 1000 * G/1000 * efficiency * (1 - loss)
+        base = series["G(i)"] * efficiency
+        power[selected] = (peakpower[selected] * (1 - loss[selected] / 100))[:, None] * base
+
+    return power[0] if single else power
+
+
+def compare(rows, power) -> dict:
+    """
+    Compare a locally simulated power series with the P returned by PVGIS.
+
+    :param rows: Hourly rows or TimeSeries fetched with pvcalculation=True.
+    :param power: Simulated power of the same system, see simulate().
+    :return: dict = {"energy_ratio": simulated / PVGIS energy, "mbe": mean bias [W], "rmse": [W]}
+    """
+    series = as_series(rows)
+    if "P" not in series:
+        raise ValueError("The hourly series has no 'P', fetch it with pvcalculation=True.")
+    reference = series["P"]
+    difference = np.asarray(power) - reference
+    return {
+        "energy_ratio": (np.sum(power) / np.sum(reference)).item(),
+        "mbe": difference.mean().item(),
+        "rmse": np.sqrt(np.mean(difference ** 2)).item(),
+    }
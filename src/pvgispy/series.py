@@ -0,0 +1,227 @@
+import numpy as np
+
+
+def json_default(value):
+    """
+    json.dump fallback writing columnar series back as rows, like the API returned them.
+    """
+    if isinstance(value, TimeSeries):
+        return value.to_records()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def as_series(rows):
+    """
+    Returns rows as TimeSeries, converting a list of API rows if needed.
+    """
+    if isinstance(rows, TimeSeries):
+        return rows
+    return TimeSeries.from_records(rows)
+
+
+def parse_times(times) -> np.ndarray:
+    """
+    Parse PVGIS timestamps ("YYYYMMDD:HHMM") into a datetime64[m] array without a Python loop per row.
+    """
+    times = list(times)
+    if not times:
+        return np.empty(0, dtype="datetime64[m]")
+
+    raw = np.frombuffer("".join(times).encode("ascii"), dtype=np.uint8)
+    if raw.size != 13 * len(times):
+        raise ValueError("Invalid time format. Expected 'YYYYMMDD:HHMM'.")
+    digits = raw.reshape(len(times), 13).astype(np.int64) - ord("0")
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    minutes = (digits[:, 9] * 10 + digits[:, 10]) * 60 + digits[:, 11] * 10 + digits[:, 12]
+    return _compose_times(year, month, day, minutes)
+
+
+def parse_numeric_times(values: np.ndarray) -> np.ndarray:
+    """
+    Convert PVGIS timestamps read as numbers (YYYYMMDDHHMM, i.e. without the colon) into a datetime64[m] array.
+    """
+    values = np.asarray(values).astype(np.int64)
+    minutes = (values // 100 % 100) * 60 + values % 100
+    return _compose_times(values // 100000000, values // 1000000 % 100, values // 10000 % 100, minutes)
+
+
+def _compose_times(year, month, day, minutes):
+    months = (year - 1970) * 12 + month - 1
+    dates = months.astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+    return dates.astype("datetime64[m]") + minutes
+
+
+class TimeSeries:
+    GROUPINGS = ("year", "month", "day", "hour", "month_of_year")
+    AGGREGATIONS = ("sum", "mean", "max", "min", "count", "percentile")
+
+    def __init__(self, time: np.ndarray, columns: dict, time_key: str = "time"):
+        """
+        Columnar (struct of arrays) storage of an hourly PVGIS series.
+
+        Each variable is a contiguous float64 array, timestamps are a datetime64[m] array.
+        Iterating or indexing with an integer yields rows shaped like the API output,
+        so a TimeSeries can be used in place of the list of dicts.
+
+        :param time: Timestamps as datetime64 array.
+        :param columns: dict = {variable: array}, all arrays with the same length as time.
+        :param time_key: Name of the time field in the API rows, "time" or "time(UTC)".
+        """
+        self.time = np.asarray(time, dtype="datetime64[m]")
+        self.columns = {key: np.ascontiguousarray(value, dtype=np.float64) for key, value in columns.items()}
+        self.time_key = time_key
+
+    @classmethod
+    def from_records(cls, rows: list, time_key: str = None):
+        """
+        Build a TimeSeries from the list of dicts returned by the API.
+        """
+        if time_key is None:
+            time_key = "time(UTC)" if rows and "time(UTC)" in rows[0] else "time"
+        keys = [key for key in (rows[0] if rows else {}) if key != time_key]
+
+        time = parse_times(row[time_key] for row in rows)
+        columns = {key: np.fromiter((row.get(key, 0) for row in rows), dtype=np.float64, count=len(rows))
+                   for key in keys}
+        return cls(time, columns, time_key)
+
+    @classmethod
+    def concat(cls, parts: list):
+        """
+        Join consecutive series with the same variables, e.g. the years of a chunked request.
+        """
+        keys = parts[0].keys()
+        if any(part.keys() != keys for part in parts):
+            raise ValueError("Can't join series with different variables.")
+        time = np.concatenate([part.time for part in parts])
+        columns = {key: np.concatenate([part[key] for part in parts]) for key in keys}
+        return cls(time, columns, parts[0].time_key)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.columns[item]
+        if isinstance(item, slice):
+            return TimeSeries(self.time[item], {k: v[item] for k, v in self.columns.items()}, self.time_key)
+        return self._row(item)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._row(index)
+
+    def _row(self, index):
+        row = {self.time_key: self.time[index].item().strftime("%Y%m%d:%H%M")}
+        for key, values in self.columns.items():
+            row[key] = values[index].item()
+        return row
+
+    def keys(self):
+        return list(self.columns)
+
+    def get(self, key, default=None):
+        return self.columns.get(key, default)
+
+    def years(self) -> np.ndarray:
+        """
+        Returns the year of every timestamp as int64 array.
+        """
+        return self.time.astype("datetime64[Y]").astype(np.int64) + 1970
+
+    def group_keys(self, by) -> np.ndarray:
+        """
+        Returns the group of every timestamp.
+
+        :param by: "year", "month" (calendar month), "day" (calendar day), "hour" (hour of day, 0-23),
+                   "month_of_year" (1-12), an array of labels with one entry per row, or a callable
+                   mapping the datetime64 time array to such an array.
+        """
+        if callable(by):
+            keys = np.asarray(by(self.time))
+        elif isinstance(by, str):
+            if by == "year":
+                keys = self.years()
+            elif by == "month":
+                keys = self.time.astype("datetime64[M]")
+            elif by == "day":
+                keys = self.time.astype("datetime64[D]")
+            elif by == "hour":
+                keys = (self.time - self.time.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.int64)
+            elif by == "month_of_year":
+                keys = self.time.astype("datetime64[M]").astype(np.int64) % 12 + 1
+            else:
+                raise ValueError(f"Invalid grouping. Choose from {', '.join(self.GROUPINGS)} or pass labels.")
+        else:
+            keys = np.asarray(by)
+
+        if keys.shape != self.time.shape:
+            raise ValueError("Custom groups need exactly one label per row.")
+        return keys
+
+    def aggregate(self, variable: str, by="year", how: str = "sum", q: float = None) -> dict:
+        """
+        Vectorized group-by reduction of one variable.
+
+        :param variable: Column to aggregate, e.g. "P" or "G(i)".
+        :param by: Grouping, see group_keys.
+        :param how: "sum", "mean", "max", "min", "count" or "percentile".
+        :param q: Percentile in [0, 100], required for how="percentile".
+        :return: dict = {group: value}, sorted by group. Calendar months and days are labelled
+                 as "YYYY-MM" and "YYYY-MM-DD".
+        """
+        if variable not in self.columns:
+            raise ValueError(f"Invalid variable '{variable}'. Available: {', '.join(self.keys())}.")
+        if how not in self.AGGREGATIONS:
+            raise ValueError(f"Invalid aggregation. Choose from {', '.join(self.AGGREGATIONS)}.")
+        if how == "percentile" and q is None:
+            raise ValueError("how='percentile' requires q.")
+
+        labels, inverse = np.unique(self.group_keys(by), return_inverse=True)
+        values = self.columns[variable]
+
+        if how in ("sum", "mean", "count"):
+            counts = np.bincount(inverse, minlength=len(labels))
+            if how == "count":
+                result = counts
+            else:
+                result = np.bincount(inverse, weights=values, minlength=len(labels))
+                if how == "mean":
+                    result = result / counts
+        else:
+            order = np.argsort(inverse, kind="stable")
+            starts = np.searchsorted(inverse[order], np.arange(len(labels)))
+            ordered = values[order]
+            if how == "max":
+                result = np.maximum.reduceat(ordered, starts) if len(ordered) else ordered
+            elif how == "min":
+                result = np.minimum.reduceat(ordered, starts) if len(ordered) else ordered
+            else:
+                result = [np.percentile(group, q) for group in np.split(ordered, starts[1:])]
+
+        return {self._label(label): value.item() for label, value in zip(labels, np.asarray(result))}
+
+    @staticmethod
+    def _label(label):
+        if isinstance(label, np.datetime64):
+            return str(label)
+        return label.item() if isinstance(label, np.generic) else label
+
+    def to_records(self):
+        """
+        Returns the series as list of dicts, as returned by the API.
+        """
+        return list(self)
+
+    @property
+    def nbytes(self):
+        return self.time.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    def __repr__(self):
+        return f"TimeSeries({len(self)} rows, columns={self.keys()})"
@@ -0,0 +1,128 @@
+import math
+import threading
+from collections import OrderedDict
+
+from .cache import request_key
+
+# Approximate grid resolution of the radiation databases in degrees.
+GRID_RESOLUTION = {
+    "PVGIS-SARAH3": 0.05,
+    "PVGIS-SARAH2": 0.05,
+    "PVGIS-SARAH": 0.05,
+    "PVGIS-CMSAF": 0.05,
+    "PVGIS-NSRDB": 0.04,
+    "PVGIS-COSMO": 0.055,
+    "PVGIS-ERA5": 0.25,
+}
+DEFAULT_RESOLUTION = 0.05
+EARTH_RADIUS = 6371.0
+
+
+def snap(lat: float, lon: float, raddatabase: str = "PVGIS-SARAH3", resolution: float = None):
+    """
+    Snap coordinates to the center of their radiation database grid cell.
+
+    Coordinates within one cell share the same radiation data, so snapped requests can share cache entries.
+    Note that PVGIS computes the horizon from a finer elevation model, so with usehorizon=1 shading
+    may differ slightly from the unsnapped location.
+
+    :param raddatabase: Radiation database whose grid resolution is used.
+    :param resolution: (Optional) Grid resolution in degrees, overrides the one of raddatabase.
+    :return: (lat, lon) of the cell center.
+    """
+    if resolution is None:
+        resolution = GRID_RESOLUTION.get(raddatabase, DEFAULT_RESOLUTION)
+
+    def center(value, limit):
+        value = (math.floor(value / resolution) + 0.5) * resolution
+        return round(max(-limit, min(limit, value)), 6)
+
+    return center(lat, 90), center(lon, 180)
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great circle distance in km.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(1.0, a)))
+
+
+class SiteIndex:
+    def __init__(self, tolerance: float = 1.0, max_sites: int = 1024):
+        """
+        In-memory spatial index over fetched responses.
+
+        A request can be answered by an already fetched site within `tolerance` km, if all parameters
+        except lat and lon are equal. Sites are bucketed in a lat/lon grid with a cell size of about
+        the tolerance, so lookups only scan neighbouring buckets.
+
+        :param tolerance: Maximum distance to a fetched site in km.
+        :param max_sites: Number of responses kept, the least recently used are dropped first. None keeps all.
+        """
+        self.tolerance = tolerance
+        self.max_sites = max_sites
+        self.hits = 0
+        self.misses = 0
+        self._step = tolerance / 111.2
+        # {(group, row, column): {(lat, lon): data}}
+        self._buckets = {}
+        # Bucket keys of all sites in least recently used order, {(group, lat, lon): bucket key}.
+        self._sites = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _group(endpoint, params):
+        return request_key(endpoint, {k: v for k, v in params.items() if k not in ("lat", "lon")})
+
+    def _bucket(self, lat, lon):
+        return math.floor(lat / self._step), math.floor(lon / self._step)
+
+    def add(self, endpoint: str, params: dict, data):
+        """
+        Register the response of a request, replacing an earlier one of the same site and parameters.
+        """
+        lat, lon = params["lat"], params["lon"]
+        group = self._group(endpoint, params)
+        key = (group,) + self._bucket(lat, lon)
+        with self._lock:
+            self._buckets.setdefault(key, {})[(lat, lon)] = data
+            self._sites[(group, lat, lon)] = key
+            self._sites.move_to_end((group, lat, lon))
+            while self.max_sites is not None and len(self._sites) > self.max_sites:
+                (_, old_lat, old_lon), old_key = self._sites.popitem(last=False)
+                bucket = self._buckets[old_key]
+                del bucket[(old_lat, old_lon)]
+                if not bucket:
+                    del self._buckets[old_key]
+
+    def nearest(self, endpoint: str, params: dict):
+        """
+        Returns (distance, data) of the nearest fetched site within the tolerance, else None.
+        """
+        lat, lon = params["lat"], params["lon"]
+        group = self._group(endpoint, params)
+        row, column = self._bucket(lat, lon)
+        # Longitude degrees get shorter towards the poles, so more buckets need to be checked.
+        span = math.ceil(1 / max(math.cos(math.radians(lat)), 0.01))
+
+        best = None
+        with self._lock:
+            for i in range(row - 1, row + 2):
+                for j in range(column - span, column + span + 1):
+                    for (site_lat, site_lon), data in self._buckets.get((group, i, j), {}).items():
+                        d = distance(lat, lon, site_lat, site_lon)
+                        if d <= self.tolerance and (best is None or d < best[0]):
+                            best = (d, data, site_lat, site_lon)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._sites.move_to_end((group, best[2], best[3]))
+        return best[:2]
+
+    def __len__(self):
+        return len(self._sites)
@@ -0,0 +1,154 @@
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from .series import TimeSeries, as_series
+
+FORMATS = {".json": "json", ".npz": "npz", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+METADATA_KEY = "pvgispy"
+
+
+def guess_format(filename: str) -> str:
+    """
+    Returns the export format for a file name, json if the extension is unknown.
+    """
+    return FORMATS.get(os.path.splitext(filename)[1].lower(), "json")
+
+
+def _split(api):
+    """
+    Split the data of an endpoint into the hourly series and a json document with everything else.
+    """
+    data = api.data
+    series = None
+    document = data
+    if api.SERIES_KEY is not None and api.SERIES_KEY in data.get("outputs", {}):
+        series = as_series(data["outputs"][api.SERIES_KEY])
+        document = dict(data, outputs=dict(data["outputs"], **{api.SERIES_KEY: None}))
+
+    metadata = {
+        "class": type(api).__name__,
+        "init": api._init_kwargs(),
+        "document": document,
+        "series_key": api.SERIES_KEY if series is not None else None,
+        "time_key": series.time_key if series is not None else None,
+        "columns": series.keys() if series is not None else [],
+    }
+    return series, metadata
+
+
+def _join(metadata, time, columns):
+    """
+    Rebuild the data of an endpoint from stored metadata and arrays.
+    """
+    document = metadata["document"]
+    if metadata["series_key"] is None:
+        return document
+    series = TimeSeries(time.view("datetime64[m]"), dict(zip(metadata["columns"], columns)), metadata["time_key"])
+    document["outputs"][metadata["series_key"]] = series
+    return document
+
+
+def save(api, filename: str, format: str = None, compress: bool = True):
+    """
+    Write the data of a fetched endpoint in a binary columnar format.
+
+    :param format: "npz", "parquet" or "arrow". Guessed from the file extension if None.
+    :param compress: Compress the arrays. Uncompressed npz and arrow files can be memory-mapped on load.
+    """
+    format = format or guess_format(filename)
+    series, metadata = _split(api)
+    time = series.time.view(np.int64) if series is not None else np.empty(0, dtype=np.int64)
+    columns = [series[key] for key in metadata["columns"]] if series is not None else []
+
+    if format == "npz":
+        arrays = {f"c{index}": values for index, values in enumerate(columns)}
+        arrays["time"] = time
+        arrays["metadata"] = np.frombuffer(json.dumps(metadata).encode("utf-8"), dtype=np.uint8)
+        with open(filename, "wb") as file:
+            (np.savez_compressed if compress else np.savez)(file, **arrays)
+    elif format in ("parquet", "arrow"):
+        pa = _import_pyarrow()
+        table = pa.table({"time": time, **{f"c{index}": values for index, values in enumerate(columns)}})
+        table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata)})
+        if format == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, filename, compression="zstd" if compress else "none")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression="zstd" if compress else None)
+            with pa.OSFile(filename, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError(f"Invalid format '{format}'. Choose from 'npz', 'parquet' or 'arrow'.")
+
+
+def read(filename: str, mmap: bool = True):
+    """
+    Read a file written by save.
+
+    :param mmap: Memory-map the arrays instead of reading them, where the format allows it.
+    :return: (metadata, data)
+    """
+    format = guess_format(filename)
+    if format == "npz":
+        arrays = (_mmap_npz(filename) if mmap else None) or dict(np.load(filename))
+        metadata = json.loads(bytes(arrays.pop("metadata")).decode("utf-8"))
+        columns = [arrays[f"c{index}"] for index in range(len(metadata["columns"]))]
+        time = np.asarray(arrays["time"])
+    elif format in ("parquet", "arrow"):
+        pa = _import_pyarrow()
+        if format == "parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(filename, memory_map=mmap)
+        else:
+            source = pa.memory_map(filename) if mmap else pa.OSFile(filename)
+            table = pa.ipc.open_file(source).read_all()
+        metadata = json.loads(table.schema.metadata[METADATA_KEY.encode()].decode("utf-8"))
+        columns = [table.column(f"c{index}").to_numpy() for index in range(len(metadata["columns"]))]
+        time = table.column("time").to_numpy()
+    else:
+        raise ValueError(f"'{filename}' is not a npz, parquet or arrow file.")
+
+    return metadata, _join(metadata, time, columns)
+
+
+def _mmap_npz(filename: str):
+    """
+    Memory-map the members of an uncompressed npz archive. Returns None if the archive is compressed.
+    """
+    arrays = {}
+    with zipfile.ZipFile(filename) as archive, open(filename, "rb") as file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            # The member data starts after its local file header.
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", file.read(4))
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            offset = file.tell()
+
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if shape == (0,) or 0 in shape:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(filename, dtype=dtype, mode="r", offset=offset, shape=shape,
+                                         order="F" if fortran_order else "C")
+    return arrays
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet and Arrow export require pyarrow. Install it with 'pip install pvgispy[arrow]'.")
+    return pa
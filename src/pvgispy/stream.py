@@ -0,0 +1,205 @@
+import codecs
+import json
+
+import numpy as np
+
+from .series import TimeSeries, parse_times
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    def __init__(self, chunks):
+        """
+        Pull based reader over an iterable of byte chunks, decoding one JSON value at a time.
+        """
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self):
+        while not self.eof:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self.decoder.decode(b"", final=True)
+            else:
+                text = self.decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                raise ValueError("Unexpected end of JSON stream.")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON stream, expected '{char}' at '{self.buffer[self.pos:self.pos + 20]}'.")
+        self.pos += 1
+
+    def value(self):
+        while True:
+            first = self.peek()
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.buffer) and first in "-0123456789" and self._more():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """
+        Iterate over the keys of an object, leaving the reader in front of each value.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def items(self):
+        """
+        Iterate over the elements of an array.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+class SeriesStream:
+    def __init__(self, chunks, series_key: str, close=None):
+        """
+        Incremental parser for a PVGIS json response.
+
+        Iterating yields the rows of outputs[series_key] one by one while the response is downloaded.
+        Everything else is collected in `document`; "inputs" is available as soon as the first
+        row arrives, "meta" once the stream is exhausted. outputs[series_key] is left as None.
+
+        :param chunks: Iterable of bytes, e.g. response.iter_content(65536).
+        :param series_key: Key of the hourly series in "outputs", "hourly" or "tmy_hourly".
+        :param close: (Optional) Callable invoked once iteration ends, e.g. response.close.
+        """
+        self.series_key = series_key
+        self.document = {}
+        self._reader = _Reader(chunks)
+        self._close = close
+
+    def __iter__(self):
+        reader = self._reader
+        try:
+            for key in reader.members():
+                if key != "outputs":
+                    self.document[key] = reader.value()
+                    continue
+
+                outputs = self.document["outputs"] = {}
+                for name in reader.members():
+                    if name == self.series_key and reader.peek() == "[":
+                        outputs[name] = None
+                        yield from reader.items()
+                    else:
+                        outputs[name] = reader.value()
+        finally:
+            if self._close is not None:
+                self._close()
+
+
+class SeriesBuilder:
+    def __init__(self, block_size: int = 8784):
+        """
+        Fills preallocated numpy blocks row by row and assembles a TimeSeries.
+
+        Timestamps are parsed per block, so at most one block of rows is held as Python objects.
+        """
+        self.block_size = block_size
+        self.time_key = None
+        self.keys = None
+        self._times = []
+        self._blocks = []
+        self._columns = None
+        self._block_times = []
+        self._fill = 0
+
+    def append(self, row: dict):
+        if self.keys is None:
+            self.time_key = "time(UTC)" if "time(UTC)" in row else "time"
+            self.keys = [key for key in row if key != self.time_key]
+        if self._columns is None:
+            self._columns = np.empty((len(self.keys), self.block_size))
+
+        self._block_times.append(row[self.time_key])
+        for index, key in enumerate(self.keys):
+            self._columns[index, self._fill] = row.get(key, 0)
+        self._fill += 1
+
+        if self._fill == self.block_size:
+            self._flush()
+
+    def _flush(self):
+        if self._columns is None:
+            return
+        self._times.append(parse_times(self._block_times))
+        self._blocks.append(self._columns[:, :self._fill])
+        self._columns = None
+        self._block_times = []
+        self._fill = 0
+
+    def build(self) -> TimeSeries:
+        self._flush()
+        keys = self.keys or []
+        if not self._blocks:
+            return TimeSeries(np.empty(0, dtype="datetime64[m]"), {key: np.empty(0) for key in keys},
+                              self.time_key or "time")
+        values = np.concatenate(self._blocks, axis=1)
+        time = np.concatenate(self._times)
+        self._blocks, self._times = [], []
+        return TimeSeries(time, {key: values[index] for index, key in enumerate(keys)}, self.time_key)
+
+
+def read_series(chunks, series_key: str) -> dict:
+    """
+    Parse a streamed PVGIS json response into a document whose series is a TimeSeries.
+
+    Peak memory stays close to the size of the final arrays, independent of the year range.
+    """
+    stream = SeriesStream(chunks, series_key)
+    builder = SeriesBuilder()
+    for row in stream:
+        builder.append(row)
+
+    document = stream.document
+    if series_key in document.get("outputs", {}):
+        document["outputs"][series_key] = builder.build()
+    return document
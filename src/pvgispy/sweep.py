@@ -0,0 +1,169 @@
+import numpy as np
+
+from . import pvmodel
+from .hourly import Hourly
+
+SOLAR_CONSTANT = 1367.0
+
+
+def solar_position(time: np.ndarray, lat: float, lon: float):
+    """
+    Approximate solar position (NOAA / Spencer series) for UTC timestamps.
+
+    :param time: datetime64 array of UTC timestamps.
+    :return: (elevation, azimuth) in radians. Azimuth is measured from south, west positive,
+             matching the aspect convention of the API.
+    """
+    time = np.asarray(time, dtype="datetime64[m]")
+    day = (time.astype("datetime64[D]") - time.astype("datetime64[Y]")).astype(np.float64)
+    hour = (time - time.astype("datetime64[D]")).astype(np.float64) / 60
+
+    gamma = 2 * np.pi / 365 * (day + (hour - 12) / 24)
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                                 - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    declination = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma) - 0.006758 * np.cos(2 * gamma)
+                   + 0.000907 * np.sin(2 * gamma) - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+
+    solar_time = hour * 60 + equation_of_time + 4 * lon
+    hour_angle = np.radians(solar_time / 4 - 180)
+    phi = np.radians(lat)
+
+    sin_elevation = np.sin(phi) * np.sin(declination) + np.cos(phi) * np.cos(declination) * np.cos(hour_angle)
+    elevation = np.arcsin(np.clip(sin_elevation, -1, 1))
+    azimuth = np.arctan2(np.sin(hour_angle), np.cos(hour_angle) * np.sin(phi) - np.tan(declination) * np.cos(phi))
+    return elevation, azimuth
+
+
+def extraterrestrial_irradiance(time: np.ndarray) -> np.ndarray:
+    """
+    Extraterrestrial irradiance on a plane normal to the sun rays [W/m2].
+    """
+    time = np.asarray(time, dtype="datetime64[m]")
+    day = (time.astype("datetime64[D]") - time.astype("datetime64[Y]")).astype(np.float64) + 1
+    return SOLAR_CONSTANT * (1 + 0.033 * np.cos(2 * np.pi * day / 365))
+
+
+class OrientationSweep:
+    def __init__(self, hourly: Hourly, albedo: float = 0.2):
+        """
+        Evaluates many plane orientations from one download of the irradiance components.
+
+        The Hourly request must be for a horizontal plane (angle=0) with components=1, so that Gb(i) and Gd(i)
+        are the horizontal beam and diffuse irradiance. They are transposed to every angle and aspect
+        with the Hay-Davies sky model. PVGIS itself uses the Muneer model, so results differ slightly
+        from a direct API call for the same orientation.
+
+        :param hourly: Hourly object for the site, see OrientationSweep.for_site.
+        :param albedo: Ground reflectance used for the reflected component.
+        """
+        if hourly.angle != 0 or not hourly._params.get("components"):
+            raise ValueError("OrientationSweep needs an Hourly request with angle=0 and components=1.")
+        self.hourly = hourly
+        self.albedo = albedo
+        self._geometry = None
+
+    @classmethod
+    def for_site(cls, lat: float, lon: float, startyear: int, endyear: int, albedo: float = 0.2, **kwargs):
+        """
+        Create the sweep for a site, the data is fetched on first use.
+        Additional kwargs are passed to Hourly, e.g. raddatabase or cache.
+        """
+        hourly = Hourly(lat, lon, pvcalculation=False, angle=0, aspect=0, startyear=startyear, endyear=endyear,
+                        columnar=True, components=1, **kwargs)
+        return cls(hourly, albedo)
+
+    def _load(self):
+        if self._geometry is None:
+            series = self.hourly.series()
+            elevation, azimuth = solar_position(series.time, self.hourly.lat, self.hourly.lon)
+            if "H_sun" in series:
+                elevation = np.radians(series["H_sun"])
+
+            # Clipping avoids exploding beam normal irradiance at sunrise and sunset.
+            sin_elevation = np.maximum(np.sin(elevation), 0.01)
+            beam = series["Gb(i)"]
+            diffuse = series["Gd(i)"]
+            normal = beam / sin_elevation
+            self._geometry = {
+                "series": series,
+                "sin_elevation": sin_elevation,
+                "cos_elevation": np.cos(elevation),
+                "azimuth": azimuth,
+                "normal": normal,
+                "diffuse": diffuse,
+                "global": beam + diffuse,
+                "anisotropy": np.clip(normal / extraterrestrial_irradiance(series.time), 0, 1),
+            }
+        return self._geometry
+
+    def plane_irradiance(self, angles, aspects) -> np.ndarray:
+        """
+        In-plane global irradiance G(i) for every combination of angles and aspects.
+
+        :param angles: Inclination angles from the horizontal plane, in degrees.
+        :param aspects: Orientation angles, 0=south, 90=west, -90=east, in degrees.
+        :return: array of shape (len(angles), len(aspects), hours) in W/m2.
+        """
+        angles = np.radians(np.atleast_1d(np.asarray(angles, dtype=np.float64)))
+        aspects = np.radians(np.atleast_1d(np.asarray(aspects, dtype=np.float64)))
+        geometry = self._load()
+
+        tilt = angles[:, None, None]
+        cos_incidence = (np.cos(tilt) * geometry["sin_elevation"]
+                         + np.sin(tilt) * geometry["cos_elevation"]
+                         * np.cos(geometry["azimuth"] - aspects[None, :, None]))
+        cos_incidence = np.maximum(cos_incidence, 0)
+
+        beam = geometry["normal"] * cos_incidence
+        ratio = cos_incidence / geometry["sin_elevation"]
+        anisotropy = geometry["anisotropy"]
+        diffuse = geometry["diffuse"] * (anisotropy * ratio + (1 - anisotropy) * (1 + np.cos(tilt)) / 2)
+        reflected = self.albedo * geometry["global"] * (1 - np.cos(tilt)) / 2
+        return beam + diffuse + reflected
+
+    def irradiation(self, angles, aspects) -> np.ndarray:
+        """
+        Total in-plane irradiation over the fetched period for every angle and aspect.
+
+        Evaluated one angle at a time, so memory stays at len(aspects) x hours.
+
+        :return: array of shape (len(angles), len(aspects)) in Wh/m2.
+        """
+        return np.stack([self.plane_irradiance([angle], aspects)[0].sum(axis=-1)
+                         for angle in np.atleast_1d(angles)])
+
+    def energy(self, angles, aspects, peakpower: float = 1, loss: float = 14, pvtech: str = "crystSi",
+               mountingplace: str = "free") -> np.ndarray:
+        """
+        Total PV energy over the fetched period for every angle and aspect, see pvmodel.simulate.
+
+        :return: array of shape (len(angles), len(aspects)) in Wh.
+        """
+        series = self._load()["series"]
+        if pvtech != "Unknown" and "T2m" not in series:
+            raise ValueError("The hourly series has no 'T2m', fetch it with components=1.")
+
+        totals = []
+        for angle in np.atleast_1d(angles):
+            irradiance = self.plane_irradiance([angle], aspects)[0]
+            efficiency = pvmodel.relative_efficiency(irradiance, series.get("T2m", 0), series.get("WS10m", 0),
+                                                     pvtech, mountingplace)
+            totals.append((irradiance * efficiency).sum(axis=-1) * peakpower * (1 - loss / 100))
+        return np.stack(totals)
+
+    def optimum(self, angles=range(0, 91, 5), aspects=range(-180, 181, 10), pv: bool = True, **kwargs) -> dict:
+        """
+        Grid search for the orientation with the highest PV energy.
+
+        :param pv: If False the in-plane irradiation is maximized instead of the PV energy.
+        :param kwargs: System parameters passed to energy(), e.g. pvtech.
+        :return: dict = {"angle": float, "aspect": float, "value": float}
+        """
+        angles = np.asarray(list(angles), dtype=np.float64)
+        aspects = np.asarray(list(aspects), dtype=np.float64)
+        if pv:
+            values = self.energy(angles, aspects, **kwargs)
+        else:
+            values = self.irradiation(angles, aspects)
+        i, j = np.unravel_index(np.argmax(values), values.shape)
+        return {"angle": angles[i].item(), "aspect": aspects[j].item(), "value": values[i, j].item()}
@@ -1,10 +1,15 @@
-from .base import BaseAPI
+from .base import BaseAPI, memoized
+from .metrics import timed
+from .series import TimeSeries
 
 
 class TMY(BaseAPI):
     ENDPOINT = "tmy"
+    SERIES_KEY = "tmy_hourly"
+    RADDATABASES = ("PVGIS-SARAH3", "PVGIS-ERA5")
+    IRRADIANCE_TYPES = {"global": "G(h)", "direct": "Gb(n)", "diffuse": "Gd(h)"}
 
-    def __init__(self, lat, lon, **kwargs):
+    def __init__(self, lat, lon, columnar: bool = False, stream: bool = False, compact: bool = False, **kwargs):
         """
         Typical meteorological year.
 
@@ -16,7 +21,14 @@ class TMY(BaseAPI):
         :param startyear: First year of the TMY. Availability depends on the temporal coverage of the radiation DB chosen. The default value is the first year of the DB chosen.
         :param endyear: Final year of the TMY. Availability depends on the temporal coverage of the radiation DB chosen. The default value is the last year of the DB chosen. The period defined by startyear, endyear should be >= 10 years.
         :param raddatabase: The Database used to calculate the tmy. either PVGIS-ERA5 or PVGIS-SARAH3, default is PVGIS-SARAH3.
-        
+        :param columnar: (Default: False) Store the hourly series as TimeSeries of numpy arrays
+                         instead of a list of dicts. Uses far less memory and vectorizes the aggregations.
+        :param stream: (Default: False) Parse the response incrementally while it is downloaded, straight into
+                       a TimeSeries. Implies columnar.
+        :param compact: (Default: False) Request the csv output, which is less than half the size of the json,
+                        and parse it straight into a TimeSeries. months_selected() then only has month and year.
+                        Implies columnar, replaces stream.
+
         Describes the various output variables from the API call:
 
         - `G(h)`: Global irradiance on the horizontal plane (units: W/m2).
@@ -29,6 +41,9 @@ class TMY(BaseAPI):
         - `WD10m`: 10-m wind direction (0 = N, 90 = E) (units: degree).
         - `WS10m`: 10-m total wind speed (units: m/s).
         """
+        self.columnar = columnar or stream or compact
+        self.stream = stream and not compact
+        self.compact = compact
         super().__init__(lat, lon, **kwargs)
 
     def _get_endpoint(self):
@@ -37,11 +52,8 @@ class TMY(BaseAPI):
         """
         return self.BASE_URL + self.ENDPOINT
 
-    def set_params(self, **kwargs):
-        """
-        Update or set parameters.
-        """
-        self.params.update(kwargs)
+    def _init_kwargs(self):
+        return dict(super()._init_kwargs(), columnar=self.columnar, stream=self.stream, compact=self.compact)
 
     @property
     def params(self):
@@ -54,7 +66,7 @@ class TMY(BaseAPI):
             "usehorizon": self._params.get("usehorizon", 1),
             "startyear": self._params.get("startyear", None),
             "endyear": self._params.get("endyear", None),
-            "outputformat": self._params.get("outputformat", "json"),
+            "outputformat": "csv" if self.compact else self._params.get("outputformat", "json"),
             "browser": self._params.get("browser", 0),
             "raddatabase": self._params.get("raddatabase", "PVGIS-SARAH3")
         }
@@ -62,9 +74,18 @@ class TMY(BaseAPI):
         # Remove any parameters set to None
         return {k: v for k, v in parameters.items() if v is not None}
 
+    def _load(self, data):
+        """
+        Take over the data, converting the hourly series to columns if columnar is set.
+        """
+        if self.columnar and not isinstance(data["outputs"]["tmy_hourly"], TimeSeries):
+            outputs = dict(data["outputs"], tmy_hourly=TimeSeries.from_records(data["outputs"]["tmy_hourly"]))
+            data = dict(data, outputs=outputs)
+
+        super()._load(data)
+
     def months_selected(self):
-        if self.data is None:
-            self.fetch_data()
+        self._ensure_data()
 
         return self.data["outputs"]["months_selected"]
 
@@ -72,7 +93,7 @@ class TMY(BaseAPI):
         """
         Hourly data over a tmy.
 
-        :return: dict of API return "tmy_hourly"
+        :return: list of dicts of API return "tmy_hourly", or a TimeSeries if columnar is set.
         Keys:
         - `G(h)`: Global irradiance on the horizontal plane (units: W/m2).
         - `Gb(n)`: Beam/direct irradiance on a plane always normal to sun rays (units: W/m2).
@@ -85,10 +106,19 @@ class TMY(BaseAPI):
         - `WS10m`: 10-m total wind speed (units: m/s).
         - `time(UTC)`: timestamp
         """
-        if self.data is None:
-            self.fetch_data()
+        self._ensure_data()
         return self.data["outputs"]["tmy_hourly"]
 
+    def iter_hourly(self):
+        """
+        Stream the hourly rows of the tmy from the API without storing them.
+
+        :return: SeriesStream yielding dicts shaped like the rows of hourly().
+        """
+        return self._stream_series()
+
+    @timed
+    @memoized
     def yearly_irradiation(self, irradiance_type: str = "global"):
         """
         Returns the total yearly irradiance.
@@ -98,19 +128,11 @@ class TMY(BaseAPI):
         :return: irradiance [W/m2] on the horizontal plane (global / diffuse) or always normal to sun rays (direct).
         """
 
-        if self.data is None:
-            self.fetch_data()
-
-        total_irradiance = 0
-        for hour in self.data["outputs"]["tmy_hourly"]:
-            # Make sure that param global=1, else the api doesnt return irradiance.
-            if irradiance_type == "global":
-                total_irradiance += hour.get("G(h)", 0)
-            elif irradiance_type == "direct":
-                total_irradiance += hour.get("Gb(n)", 0)
-            elif irradiance_type == "diffuse":
-                total_irradiance += hour.get("Gd(h)", 0)
-            else:
-                raise ValueError("Invalid irradiance_type. Choose from 'global', 'direct', or 'diffuse'.")
-
-        return total_irradiance
+        self._ensure_data()
+
+        if irradiance_type not in self.IRRADIANCE_TYPES:
+            raise ValueError("Invalid irradiance_type. Choose from 'global', 'direct', or 'diffuse'.")
+        key = self.IRRADIANCE_TYPES[irradiance_type]
+
+        series = self.series()
+        return series[key].sum().item() if key in series else 0
@@ -0,0 +1,164 @@
+import email.utils
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport:
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    # Process-wide RateGovernor of all transports, e.g. Transport.governor = RateGovernor(rate=30).
+    governor = None
+
+    def __init__(self, timeout=(5, 120), retries: int = 3, backoff: float = 0.5, max_backoff: float = 30,
+                 pool_size: int = 10, headers: dict = None, governor=None):
+        """
+        HTTP transport shared by the endpoint classes.
+
+        Keeps one pooled keep-alive requests.Session per process and retries transient
+        failures (connection errors, 429 and 5xx) with exponential backoff and full jitter,
+        honoring the Retry-After header of the API.
+
+        :param timeout: Connect and read timeout in seconds, either a float or a (connect, read) tuple.
+        :param retries: Number of retries after the first attempt.
+        :param backoff: Base delay in seconds, doubled with every retry.
+        :param max_backoff: Upper bound for a single delay in seconds, also for delays asked by Retry-After.
+        :param pool_size: Number of keep-alive connections kept per host.
+        :param headers: Extra headers sent with every request.
+        :param governor: (Optional) RateGovernor used instead of the class-wide Transport.governor.
+                         Every attempt waits for it and reports its outcome to it.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        self.headers.update(headers or {})
+        if governor is not None:
+            self.governor = governor
+
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Returns the pooled session of the current process. Sessions are not shared across forks.
+        """
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(self.headers)
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def get(self, url: str, params: dict = None, stream: bool = False) -> requests.Response:
+        """
+        Send a GET request, retrying transient failures.
+        With stream=True the body is not downloaded before it is read from the response.
+
+        The response of the last attempt is returned even if its status is an error,
+        so the caller can handle it. Connection errors of the last attempt are raised.
+        The number of retries and the timings of the request are set as attributes
+        `retries` and `timings` of the response, see Transport.timings.
+        """
+        attempt = 0
+        backoff = 0.0
+        while True:
+            ticket = self.governor.acquire() if self.governor is not None else None
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                self._report(ticket, None)
+                if attempt >= self.retries:
+                    raise
+                response = None
+            except BaseException:
+                if ticket is not None:
+                    self.governor.cancel(ticket)
+                raise
+            else:
+                self._report(ticket, response)
+
+            if response is not None and (response.status_code not in self.RETRY_STATUS or attempt >= self.retries):
+                response.retries = attempt
+                response.timings = self.timings(start, response.elapsed.total_seconds(), backoff)
+                return response
+
+            delay = self._delay(attempt, response)
+            if response is not None:
+                # Give the connection back to the pool, a streamed body would hold it until collected.
+                response.close()
+            time.sleep(delay)
+            backoff += delay
+            attempt += 1
+
+    def _report(self, ticket, response):
+        """
+        Release the governor slot of an attempt, response None for a connection error.
+        """
+        if ticket is not None:
+            if response is None:
+                self.governor.release(ticket)
+            else:
+                self.governor.release(ticket, response.status_code, response.headers.get("Retry-After"))
+
+    @staticmethod
+    def timings(start: float, wait: float, backoff: float) -> dict:
+        """
+        Split the duration of the last attempt into waiting for the headers and reading the body.
+
+        :param start: time.perf_counter() at the start of the last attempt.
+        :param wait: Seconds until the response headers arrived, i.e. DNS, connect, TLS and server compute.
+        :param backoff: Seconds slept between attempts.
+        """
+        return {"wait": wait, "download": max(0.0, time.perf_counter() - start - wait), "backoff": backoff}
+
+    def _delay(self, attempt: int, response: requests.Response = None) -> float:
+        """
+        Returns the delay before the next attempt, preferring the Retry-After header, at most max_backoff.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def close(self):
+        """
+        Close the pooled connections of the current process.
+        """
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+
+
+def parse_retry_after(value: str):
+    """
+    Parse a Retry-After header given either in seconds or as HTTP date.
+
+    :return: delay in seconds or None if the value can't be parsed.
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
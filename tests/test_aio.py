@@ -0,0 +1,59 @@
+"""Offline tests for the asyncio client."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from src.pvgispy.aio import AsyncDaily, AsyncResponse, AsyncTMY, gather
+
+TMY_RESPONSE = {"inputs": {}, "outputs": {"months_selected": [{"month": 1, "year": 2010}],
+                                          "tmy_hourly": [{"time(UTC)": "20100101:0000", "G(h)": 2.0}]}}
+
+
+class FakeTransport:
+    def __init__(self, body):
+        self.body = body
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def get(self, url, params=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return mock.Mock(status_code=200, **{"json.return_value": self.body})
+
+
+class TestAsync(unittest.TestCase):
+    def test_accessors(self):
+        transport = FakeTransport(TMY_RESPONSE)
+        tmy = AsyncTMY(lat=51, lon=9, transport=transport)
+
+        self.assertEqual(asyncio.run(tmy.yearly_irradiation()), 2.0)
+        self.assertEqual(asyncio.run(tmy.months_selected()), [{"month": 1, "year": 2010}])
+        self.assertEqual(transport.calls, 1)
+        self.assertEqual(tmy.params["lat"], 51)
+
+    def test_gather_limit(self):
+        transport = FakeTransport({"outputs": {"daily_profile": [{"G(i)": 1.0}]}})
+        dailies = [AsyncDaily(lat=51, lon=9, month=month, transport=transport) for month in range(1, 13)]
+
+        data = asyncio.run(gather(dailies, limit=3))
+        self.assertEqual(len(data), 12)
+        self.assertEqual(transport.max_in_flight, 3)
+        self.assertEqual(dailies[0].data, data[0])
+
+    def test_preload_rejected(self):
+        with self.assertRaises(ValueError):
+            AsyncDaily(lat=51, lon=9, month=1, preload=True, transport=FakeTransport({}))
+
+    def test_response(self):
+        response = AsyncResponse(200, {}, b'{"a": 1}')
+        self.assertEqual(response.json(), {"a": 1})
+        self.assertEqual(response.text, '{"a": 1}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Offline tests for the batch fetcher."""
+
+import threading
+import unittest
+from unittest import mock
+
+from src.pvgispy import APIError, Daily, fetch_many
+
+
+class FakeTransport:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, stream=False):
+        with self.lock:
+            self.calls.append(params)
+        if params["lat"] == 0:
+            return mock.Mock(status_code=400, text="outside coverage")
+        return mock.Mock(status_code=200, **{"json.return_value": {"outputs": {"daily_profile": [
+            {"G(i)": float(params["lat"])}]}}})
+
+
+class TestFetchMany(unittest.TestCase):
+    def test_dedup_order_and_errors(self):
+        transport = FakeTransport()
+        items = [{"lat": 51, "lon": 9, "month": 1, "transport": transport},
+                 {"lat": 52, "lon": 9, "month": 1, "transport": transport},
+                 {"lat": 51.0, "lon": 9, "month": 1, "transport": transport},
+                 {"lat": 0, "lon": 9, "month": 1, "transport": transport},
+                 {"lat": 100, "lon": 9, "month": 1, "transport": transport}]
+
+        results = fetch_many(items, endpoint=Daily, max_workers=4)
+
+        self.assertEqual(len(transport.calls), 3)
+        self.assertEqual([r.ok for r in results], [True, True, True, False, False])
+        self.assertEqual(results[1].api.total_irradiance(), 52.0)
+        self.assertEqual(results[2].data, results[0].data)
+        self.assertIsInstance(results[3].error, APIError)
+        self.assertIsInstance(results[4].error, ValueError)
+
+    def test_objects_and_missing_endpoint(self):
+        transport = FakeTransport()
+        daily = Daily(lat=51, lon=9, month=1, transport=transport)
+
+        results = fetch_many([daily, {"lat": 51, "lon": 9}])
+        self.assertIs(results[0].api, daily)
+        self.assertEqual(daily.total_irradiance(), 51.0)
+        self.assertIsInstance(results[1].error, TypeError)
+        self.assertIsNone(results[1].api)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Offline tests for the response cache."""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from src.pvgispy import Daily, ResponseCache
+
+
+DAILY_RESPONSE = {"inputs": {}, "outputs": {"daily_profile": [{"time": "00:00", "G(i)": 1.5}]}}
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_roundtrip_and_counters(self):
+        cache = ResponseCache(self.tmp.name)
+        self.assertIsNone(cache.get("url", {"lat": 51, "lon": 9}))
+
+        cache.set("url", {"lat": 51, "lon": 9}, DAILY_RESPONSE)
+        self.assertEqual(cache.get("url", {"lon": 9.0, "lat": 51.0, "x": None}), DAILY_RESPONSE)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_ttl(self):
+        cache = ResponseCache(self.tmp.name, ttl=10)
+        cache.set("url", {"lat": 51}, DAILY_RESPONSE)
+        path = os.path.join(self.tmp.name, os.listdir(self.tmp.name)[0])
+        os.utime(path, (time.time() - 20, time.time() - 20))
+        self.assertIsNone(cache.get("url", {"lat": 51}))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.tmp.name)
+        for lat in range(3):
+            cache.set("url", {"lat": lat}, {"payload": "x" * 1000})
+        size = cache.stats()["size"]
+
+        # Touch lat=0 so that lat=1 becomes the least recently used entry.
+        for path in os.listdir(self.tmp.name):
+            os.utime(os.path.join(self.tmp.name, path), (time.time() - 100, time.time()))
+        cache.get("url", {"lat": 0})
+
+        cache.max_size = size - 1
+        cache.evict()
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertIsNotNone(cache.get("url", {"lat": 0}))
+
+    def test_fetch_uses_cache(self):
+        cache = ResponseCache(self.tmp.name)
+        transport = mock.Mock()
+        transport.get.return_value = mock.Mock(status_code=200, **{"json.return_value": DAILY_RESPONSE})
+
+        Daily(lat=51, lon=9, month=1, cache=cache, transport=transport).fetch_data()
+        daily = Daily(lat=51, lon=9, month=1, cache=cache, transport=transport)
+        self.assertEqual(daily.total_irradiance(), 1.5)
+
+        self.assertEqual(transport.get.call_count, 1)
+        self.assertEqual(daily._params, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests for year-range chunking of Hourly, against the local mock PVGIS server."""
+
+import asyncio
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Hourly, ResponseCache, Transport
+from src.pvgispy.aio import AsyncHourly, AsyncTransport
+
+
+class TestChunking(unittest.TestCase):
+    def setUp(self):
+        self.server = MockPVGIS()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.transport = Transport()
+        self.addCleanup(self.transport.close)
+
+    def hourly(self, startyear, endyear, **kwargs):
+        hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=startyear,
+                        endyear=endyear, transport=self.transport, **kwargs)
+        hourly.BASE_URL = self.server.url
+        return hourly
+
+    def test_year_ranges(self):
+        self.assertEqual(self.hourly(2018, 2020).year_ranges(), [(2018, 2020)])
+        self.assertEqual(self.hourly(2018, 2020, chunk_years=1).year_ranges(), [(2018, 2018), (2019, 2019),
+                                                                               (2020, 2020)])
+        self.assertEqual(self.hourly(2017, 2021, chunk_years=2).year_ranges(), [(2017, 2017), (2018, 2019),
+                                                                               (2020, 2021)])
+        with self.assertRaises(ValueError):
+            self.hourly(2018, 2020, chunk_years=0)
+
+    def test_stitch(self):
+        for columnar in (False, True):
+            hourly = self.hourly(2019, 2021, chunk_years=1, columnar=columnar)
+            rows = hourly.hourly()
+            self.assertEqual(len(rows), 8760 + 8784 + 8760)
+            self.assertEqual((hourly.startyear, hourly.endyear), (2019, 2021))
+            self.assertEqual(sorted(hourly.yearly_pv_production()), [2019, 2020, 2021])
+            times = hourly.series().time
+            self.assertTrue(np.all(np.diff(times) == np.timedelta64(60, "m")))
+            self.assertEqual(hourly.data["inputs"]["meteo_data"]["year_min"], 2019)
+
+    def test_incremental_cache(self):
+        cache = ResponseCache(tempfile.mkdtemp())
+        self.hourly(2019, 2021, chunk_years=1, cache=cache).fetch_data()
+        requests = self.server.requests
+        self.assertEqual(requests, 3)
+
+        extended = self.hourly(2018, 2021, chunk_years=1, cache=cache, stream=True)
+        self.assertEqual(len(extended.hourly()), 3 * 8760 + 8784)
+        self.assertEqual(self.server.requests, requests + 1)
+
+    def test_async(self):
+        async def run():
+            transport = AsyncTransport()
+            hourly = AsyncHourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2019,
+                                 endyear=2021, chunk_years=1, transport=transport)
+            hourly.api.BASE_URL = self.server.url
+            try:
+                return await hourly.yearly_pv_production()
+            finally:
+                await transport.aclose()
+
+        self.assertEqual(sorted(asyncio.run(run())), [2019, 2020, 2021])
+        self.assertEqual(self.server.requests, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for the resumable bulk job command."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Hourly, cli
+from src.pvgispy.base import BaseAPI
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.server = MockPVGIS()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        patcher = mock.patch.multiple(BaseAPI, BASE_URL=self.server.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.sites = os.path.join(self.directory, "sites.csv")
+        with open(self.sites, "w") as file:
+            file.write("id,lat,lon,peakpower\n")
+            file.writelines(f"site{index},{45 + index},9,{index + 1}\n" for index in range(5))
+
+    def run_main(self, *argv):
+        with mock.patch("sys.stderr"):
+            return cli.main([self.sites, *argv])
+
+    def test_read_sites(self):
+        self.assertEqual(next(cli.read_sites(self.sites)), ("site0", {"lat": 45, "lon": 9, "peakpower": 1}))
+        jsonl = os.path.join(self.directory, "sites.jsonl")
+        with open(jsonl, "w") as file:
+            file.write('{"lat": 45, "lon": 9, "angle": 30}\n\n{"lat": 46, "lon": 9}\n')
+        self.assertEqual(list(cli.read_sites(jsonl)), [("0", {"lat": 45, "lon": 9, "angle": 30}),
+                                                       ("1", {"lat": 46, "lon": 9})])
+
+    def test_jsonl_resume(self):
+        output = os.path.join(self.directory, "out.jsonl")
+        options = ["-p", "pvcalculation=true", "-p", "loss=14", "-p", "startyear=2020", "-p", "endyear=2020",
+                   "-w", "2"]
+        self.assertEqual(self.run_main(output, *options), 0)
+        with open(output) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(sorted(record["id"] for record in records), [f"site{index}" for index in range(5)])
+        self.assertEqual(len(records[0]["data"]["outputs"]["hourly"]), 8784)
+        self.assertEqual(self.server.requests, 5)
+
+        # a crash after writing a partial line and before completing site4, site3 was written but not checkpointed
+        with open(output, "rb+") as file:
+            lines = file.read().split(b"\n")
+            file.seek(0)
+            file.truncate()
+            kept = [line for line in lines if line and json.loads(line)["id"] != "site4"]
+            file.write(b"\n".join(kept) + b"\n" + b'{"id": "site4", "da')
+        with open(output + ".done") as file:
+            done = [line for line in file if line not in ("site3\n", "site4\n")]
+        with open(output + ".done", "w") as file:
+            file.writelines(done)
+            file.write("sit")
+
+        self.assertEqual(self.run_main(output, *options), 0)
+        self.assertEqual(self.server.requests, 6)
+        with open(output) as file:
+            self.assertEqual(sorted(json.loads(line)["id"] for line in file), [f"site{index}" for index in range(5)])
+        with open(output + ".done") as file:
+            self.assertEqual(sorted(file.read().split("\n")), ["", *(f"site{index}" for index in range(5))])
+        self.assertEqual(self.run_main(output, *options), 0)
+        self.assertEqual(self.server.requests, 6)
+
+    def test_files_and_failures(self):
+        with open(self.sites, "a") as file:
+            file.write("broken,145,9,1\n")
+        output = os.path.join(self.directory, "out")
+        options = ["-f", "npz", "-p", "pvcalculation=true", "-p", "loss=14", "-p", "startyear=2020",
+                   "-p", "endyear=2020"]
+        self.assertEqual(self.run_main(output, *options), 1)
+        self.assertEqual(sorted(os.listdir(output)), [f"site{index}.npz" for index in range(5)])
+        hourly = Hourly.from_file(os.path.join(output, "site2.npz"))
+        self.assertEqual(hourly.params["peakpower"], 3)
+        self.assertEqual(len(hourly.hourly()), 8784)
+
+        # only the failed site is retried
+        requests = self.server.requests
+        self.assertEqual(self.run_main(output, *options), 1)
+        self.assertEqual(self.server.requests, requests)
+
+
+if __name__ == '__main__':
+    unittest.main()
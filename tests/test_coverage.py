@@ -0,0 +1,79 @@
+"""Tests for the radiation database coverage index and request routing."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Daily, Hourly, Monthly, PVGISError, TMY, coverage
+from src.pvgispy.base import BaseAPI
+
+SITES = {"Stuttgart": (48.8, 9.2), "Denver": (39.7, -105.0), "Tromso": (69.6, 18.9), "Sydney": (-33.9, 151.2)}
+
+
+class TestCoverage(unittest.TestCase):
+    def test_candidates(self):
+        names = {site: [database.name for database in coverage.candidates(*location, versions=("v5_3",))]
+                 for site, location in SITES.items()}
+        self.assertEqual(names["Stuttgart"], ["PVGIS-SARAH3", "PVGIS-ERA5"])
+        self.assertEqual(names["Denver"], ["PVGIS-NSRDB", "PVGIS-ERA5"])
+        self.assertEqual(names["Tromso"], ["PVGIS-ERA5"])
+        self.assertEqual(names["Sydney"], ["PVGIS-ERA5"])
+
+    def test_route(self):
+        self.assertEqual(coverage.route(*SITES["Stuttgart"]).name, "PVGIS-SARAH3")
+        self.assertEqual(coverage.route(*SITES["Denver"], raddatabase="PVGIS-SARAH3").name, "PVGIS-NSRDB")
+        self.assertEqual(coverage.route(*SITES["Denver"], startyear=2021, endyear=2022).name, "PVGIS-ERA5")
+        self.assertEqual(coverage.route(*SITES["Stuttgart"], raddatabase="PVGIS-SARAH2"),
+                         ("PVGIS-SARAH2", "v5_2", coverage.METEOSAT, (2005, 2020)))
+        with self.assertRaises(PVGISError):
+            coverage.route(*SITES["Tromso"], raddatabase="PVGIS-SARAH3", fallback=False)
+        with self.assertRaises(PVGISError):
+            coverage.route(*SITES["Tromso"], names=("PVGIS-SARAH3",))
+
+    def test_route_many(self):
+        lats, lons = np.random.default_rng(0).uniform(-90, 90, 500), np.random.default_rng(1).uniform(-180, 180, 500)
+        chosen = coverage.route_many(lats, lons, names=("PVGIS-SARAH3", "PVGIS-NSRDB"))
+        for lat, lon, index in zip(lats, lons, chosen):
+            try:
+                expected = coverage.DATABASES.index(coverage.route(lat, lon, names=("PVGIS-SARAH3", "PVGIS-NSRDB")))
+            except PVGISError:
+                expected = -1
+            self.assertEqual(index, expected)
+
+    def test_endpoint_routing(self):
+        hourly = Hourly(lat=39.7, lon=-105, pvcalculation=False, startyear=2010, endyear=2010, route=True)
+        self.assertEqual(hourly.params["raddatabase"], "PVGIS-NSRDB")
+        self.assertEqual(hourly.database.version, "v5_3")
+        self.assertEqual(hourly._get_endpoint(), BaseAPI.BASE_URL + "seriescalc")
+
+        daily = Daily(lat=48.8, lon=9.2, month=1, raddatabase="PVGIS-SARAH2", route=True)
+        self.assertEqual(daily._get_endpoint(), BaseAPI.BASE_URL_V2 + "DRcalc")
+        daily.set_params(angle=30)
+        self.assertEqual((daily.params["raddatabase"], daily.database.version), ("PVGIS-SARAH2", "v5_2"))
+        daily.set_params(raddatabase="PVGIS-SARAH3")
+        self.assertEqual(daily._get_endpoint(), BaseAPI.BASE_URL + "DRcalc")
+        daily.set_params(raddatabase="PVGIS-SARAH2", route=False)
+        self.assertEqual(daily._get_endpoint(), BaseAPI.BASE_URL + "DRcalc")
+
+        monthly = Monthly(lat=70, lon=-150, route=True)
+        self.assertEqual(monthly.params["raddatabase"], monthly.database.name)
+        self.assertNotIn("raddatabase", Monthly(lat=70, lon=-150).params)
+
+        self.assertEqual(TMY(lat=39.7, lon=-105, route=True).params["raddatabase"], "PVGIS-ERA5")
+        self.assertNotIn("route", TMY(lat=39.7, lon=-105)._init_kwargs())
+
+    def test_compare(self):
+        with MockPVGIS() as server, mock.patch.multiple(BaseAPI, BASE_URL=server.url, BASE_URL_V2=server.url,
+                                                        BASE_URL_V1=server.url):
+            results = coverage.compare(Daily, 48.8, 9.2, month=6)
+            self.assertEqual(list(results), ["PVGIS-SARAH3", "PVGIS-ERA5", "PVGIS-SARAH2", "PVGIS-SARAH",
+                                             "PVGIS-COSMO", "PVGIS-CMSAF"])
+            self.assertTrue(all(result.ok for result in results.values()))
+            self.assertEqual(results["PVGIS-ERA5"].api.params["raddatabase"], "PVGIS-ERA5")
+            self.assertEqual(server.requests, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for the csv output fast path."""
+
+import unittest
+
+import numpy as np
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Hourly, PVGISError, TMY, Transport, csvformat
+
+SERIESCALC = b"""Latitude (decimal degrees):\t45.000\r
+Longitude (decimal degrees):\t8.000\r
+Elevation (m):\t250\r
+Radiation database:\tPVGIS-SARAH3\r
+\r
+\r
+Slope: 35 deg. \r
+Azimuth: -10 deg. \r
+time,P,G(i),H_sun,T2m,WS10m,Int\r
+20160101:0010,0.0,0.0,0.0,3.38,2.34,0.0\r
+20160101:1110,410.5,503.2,21.5,6.1,1.2,0.0\r
+20171231:2310,0.0,0.0,0.0,1.0,0.5,1.0\r
+\r
+P: PV system power (W)\r
+G(i): Global irradiance on the inclined plane (plane of the array) (W/m2)\r
+Int: 1 means solar radiation values are reconstructed\r
+\r
+PVGIS (c) European Union, 2001-2024"""
+
+TMY_CSV = b"""Latitude (decimal degrees): 45.000
+Longitude (decimal degrees): 8.000
+Elevation (m): 250.0
+month,year
+1,2012
+2,2009
+time(UTC),T2m,G(h)
+20120101:0000,1.5,0.0
+20090201:0100,2.5,10.0
+"""
+
+
+class TestParse(unittest.TestCase):
+    def test_seriescalc(self):
+        data = csvformat.parse(SERIESCALC, "hourly")
+        series = data["outputs"]["hourly"]
+        self.assertEqual(series.keys(), ["P", "G(i)", "H_sun", "T2m", "WS10m", "Int"])
+        self.assertEqual(series[1], {"time": "20160101:1110", "P": 410.5, "G(i)": 503.2, "H_sun": 21.5,
+                                     "T2m": 6.1, "WS10m": 1.2, "Int": 0.0})
+        self.assertEqual(series.time[-1], np.datetime64("2017-12-31T23:10"))
+
+        inputs = data["inputs"]
+        self.assertEqual(inputs["location"], {"latitude": 45.0, "longitude": 8.0, "elevation": 250.0})
+        self.assertEqual(inputs["meteo_data"], {"radiation_db": "PVGIS-SARAH3", "year_min": 2016, "year_max": 2017})
+        self.assertEqual(inputs["mounting_system"]["fixed"]["azimuth"], {"value": -10.0})
+
+        variables = data["meta"]["outputs"]["hourly"]["variables"]
+        self.assertEqual(variables["G(i)"], {"description": "Global irradiance on the inclined plane "
+                                                            "(plane of the array)", "units": "W/m2"})
+        self.assertEqual(variables["Int"], {"description": "1 means solar radiation values are reconstructed"})
+
+    def test_tmy(self):
+        data = csvformat.parse(TMY_CSV, "tmy_hourly")
+        self.assertEqual(data["outputs"]["months_selected"], [{"month": 1, "year": 2012}, {"month": 2, "year": 2009}])
+        self.assertEqual(data["outputs"]["tmy_hourly"]["G(h)"].tolist(), [0.0, 10.0])
+        self.assertEqual(data["outputs"]["tmy_hourly"].time_key, "time(UTC)")
+        self.assertNotIn("year_min", data["inputs"]["meteo_data"])
+
+    def test_invalid(self):
+        with self.assertRaises(PVGISError):
+            csvformat.parse(b"1,2,3\n", "hourly")
+        with self.assertRaises(PVGISError):
+            csvformat.parse(b"time,P\n20160101:0010,1.0,2.0\n", "hourly")
+        self.assertEqual(len(csvformat.parse(b"time,P\n", "hourly")["outputs"]["hourly"]), 0)
+
+
+class TestCompact(unittest.TestCase):
+    def test_same_as_json(self):
+        with MockPVGIS() as server:
+            transport = Transport()
+            self.addCleanup(transport.close)
+            apis = {}
+            for compact in (False, True):
+                hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2019,
+                                endyear=2020, columnar=True, compact=compact, transport=transport)
+                tmy = TMY(lat=51, lon=9, compact=compact, transport=transport)
+                hourly.BASE_URL = tmy.BASE_URL = server.url
+                apis[compact] = (hourly, tmy)
+
+            hourly, tmy = apis[True]
+            self.assertEqual(hourly.params["outputformat"], "csv")
+            self.assertEqual(hourly.yearly_pv_production(), apis[False][0].yearly_pv_production())
+            self.assertEqual((hourly.startyear, hourly.endyear), (2019, 2020))
+            self.assertEqual(tmy.yearly_irradiation("direct"), apis[False][1].yearly_irradiation("direct"))
+            self.assertEqual(tmy.months_selected(), [{"month": month["month"], "year": month["year"]}
+                                                     for month in apis[False][1].months_selected()])
+            self.assertEqual(len(list(hourly.iter_hourly())), 8760 + 8784)
+
+
+if __name__ == '__main__':
+    unittest.main()
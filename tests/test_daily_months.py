@@ -0,0 +1,96 @@
+"""Tests for sharing one month=0 request across Daily objects, against the local mock PVGIS server."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Daily, Metrics, Transport
+from src.pvgispy.aio import AsyncDaily, AsyncTransport
+
+
+class TestShareMonths(unittest.TestCase):
+    def setUp(self):
+        self.server = MockPVGIS()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.transport = Transport()
+        self.addCleanup(self.transport.close)
+        Daily._shared.clear()
+        patch = mock.patch.object(Daily, "BASE_URL", self.server.url)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_for_months(self):
+        dailies = Daily.for_months(lat=48, lon=9, transport=self.transport)
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual([daily.month for daily in dailies], list(range(1, 13)))
+
+        single = Daily(lat=48, lon=9, month=6, transport=self.transport)
+        self.assertEqual(dailies[5].irradiance(as_list=True), single.irradiance(as_list=True))
+        self.assertEqual(len(dailies[5].to_frame()), 24)
+        self.assertNotIn("month", dailies[5].data["outputs"]["daily_profile"][0])
+        self.assertEqual(self.server.requests, 2)
+
+    def test_share(self):
+        metrics = Metrics()
+        first = Daily(lat=48, lon=9, month=1, share_months=True, transport=self.transport, metrics=metrics)
+        first.total_irradiance()
+        other = Daily(lat=48, lon=9, month=7, share_months=True, transport=self.transport, metrics=metrics)
+        self.assertGreater(other.total_irradiance(), first.total_irradiance())
+
+        months = Daily(lat=48, lon=9, month=3, share_months=True, transport=self.transport).all_months()
+        self.assertEqual(sorted(months), list(range(1, 13)))
+        self.assertEqual(months[7], other.data["outputs"]["daily_profile"])
+
+        Daily(lat=48, lon=9, month=1, share_months=True, angle=30, transport=self.transport).fetch_data()
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual((metrics.sources["shared"], metrics.sources["network"], metrics.cache_hits), (1, 1, 0))
+
+    def test_evict(self):
+        with mock.patch.object(Daily, "SHARED_SITES", 2):
+            for lat in (40, 41, 42):
+                Daily(lat=lat, lon=9, month=1, share_months=True, transport=self.transport).fetch_data()
+        self.assertEqual(len(Daily._shared), 2)
+
+    def test_async(self):
+        async def run():
+            transport = AsyncTransport()
+            dailies = [AsyncDaily(lat=48, lon=9, month=month, share_months=True, transport=transport)
+                       for month in (1, 2)]
+            try:
+                return [await daily.total_irradiance() for daily in dailies]
+            finally:
+                await transport.aclose()
+
+        self.assertEqual(len(asyncio.run(run())), 2)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_async_all_months(self):
+        async def run():
+            transport = AsyncTransport()
+            daily = AsyncDaily(lat=48, lon=9, month=3, transport=transport)
+            try:
+                return await daily.all_months()
+            finally:
+                await transport.aclose()
+
+        # The month=0 request goes through the async transport, never the blocking one.
+        with mock.patch.object(Transport, "get", side_effect=AssertionError("blocking request")):
+            months = asyncio.run(run())
+        self.assertEqual(sorted(months), list(range(1, 13)))
+        self.assertEqual(self.server.requests, 1)
+        months = Daily(lat=48, lon=9, month=5, transport=self.transport).all_months()
+        self.assertEqual(sorted(months), list(range(1, 13)))
+        self.assertEqual(self.server.requests, 1)
+
+    def test_failed_fetch_releases_lock(self):
+        daily = Daily(lat=48, lon=9, month=1, share_months=True, transport=self.transport)
+        daily.ENDPOINT = "unknown"
+        with self.assertRaises(Exception):
+            daily.fetch_data()
+        self.assertEqual(Daily._fetch_locks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Tests for deriving Daily and Monthly results from an Hourly series."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from benchmarks import fixtures
+from src.pvgispy import Daily, Hourly, Metrics, Monthly
+from src.pvgispy.aio import AsyncMonthly
+from tests.test_aio import FakeTransport
+from tests.test_series import transport_for
+
+
+def fetched_hourly(components=True, angle=30):
+    body = fixtures.seriescalc({"lat": 45, "lon": 9, "startyear": 2019, "endyear": 2020, "angle": angle,
+                                "components": int(components)})
+    hourly = Hourly(lat=45, lon=9, pvcalculation=False, startyear=2019, endyear=2020, angle=angle,
+                    components=int(components), columnar=True, transport=transport_for(body))
+    hourly.fetch_data()
+    return hourly
+
+
+def failing_transport():
+    transport = mock.Mock()
+    transport.get.side_effect = AssertionError("no request expected")
+    return transport
+
+
+class TestDaily(unittest.TestCase):
+    def test_profile(self):
+        hourly = fetched_hourly()
+        series = hourly.series()
+        daily = Daily.from_hourly(hourly, 6, showtemperatures=1, transport=failing_transport())
+        self.assertEqual(daily.params["angle"], 30)
+
+        self.assertIsNone(daily.data)
+        self.assertEqual(len(daily.irradiance(as_list=True)["G(i)"]), 24)
+        rows = daily.data["outputs"]["daily_profile"]
+        self.assertEqual(list(rows[12]), ["time", "G(i)", "Gb(i)", "Gd(i)", "T2m"])
+        self.assertEqual(rows[12]["time"], "12:00")
+
+        june = (series.group_keys("month_of_year") == 6) & (series.group_keys("hour") == 12)
+        self.assertAlmostEqual(rows[12]["Gb(i)"], series["Gb(i)"][june].mean(), places=2)
+        self.assertAlmostEqual(rows[12]["G(i)"], (series["Gb(i)"] + series["Gd(i)"] + series["Gr(i)"])[june].mean(),
+                               places=2)
+        self.assertEqual(daily.data["meta"], {"derived_from": "seriescalc"})
+
+    def test_all_months(self):
+        hourly = fetched_hourly()
+        daily = Daily.from_hourly(hourly, 0, transport=failing_transport())
+        daily.fetch_data()
+        rows = daily.data["outputs"]["daily_profile"]
+        self.assertEqual(len(rows), 12 * 24)
+        self.assertEqual(rows[24]["month"], 2)
+
+        shared = Daily.from_hourly(hourly, 3, share_months=True, transport=failing_transport())
+        self.assertEqual([row["G(i)"] for row in shared.all_months()[3]], shared.irradiance(as_list=True)["G(i)"])
+
+    def test_api_fallback(self):
+        transport = transport_for({"outputs": {"daily_profile": [{"time": "00:00", "G(i)": 1.0}]}})
+        metrics = Metrics()
+        cases = [
+            Daily(45, 9, 6, hourly=Hourly(lat=45, lon=9, pvcalculation=False, startyear=2020, endyear=2020), transport=transport),  # not fetched
+            Daily(45, 9, 6, hourly=fetched_hourly(), transport=transport),  # other angle
+            Daily.from_hourly(fetched_hourly(components=False), 6, transport=transport),  # no components
+            Daily.from_hourly(fetched_hourly(), 6, localtime=1, transport=transport),
+        ]
+        failed_transport = mock.Mock()
+        failed_transport.get.return_value = mock.Mock(status_code=500, text="unavailable")
+        failed = Hourly(lat=45, lon=9, pvcalculation=False, startyear=2019, endyear=2020, angle=30, components=1,
+                        transport=failed_transport, prefetch=True)
+        cases.append(Daily.from_hourly(failed, 6, transport=transport))  # failed prefetch
+        for daily in cases:
+            self.assertEqual(daily.total_irradiance(), 1.0)
+        self.assertEqual(transport.get.call_count, 5)
+
+        Daily.from_hourly(fetched_hourly(), 6, metrics=metrics).fetch_data()
+        self.assertEqual(metrics.summary()["sources"]["derived"], 1)
+
+
+class TestMonthly(unittest.TestCase):
+    def test_monthly(self):
+        hourly = fetched_hourly(components=False, angle=0)
+        series = hourly.series()
+        monthly = Monthly.from_hourly(hourly, transport=failing_transport())
+
+        yearly = monthly.yearly_values()
+        self.assertEqual(list(yearly), [2019, 2020])
+        self.assertAlmostEqual(yearly[2020], series.aggregate("G(i)", "year")[2020] / 1000, places=1)
+        rows = monthly.data["outputs"]["monthly"]
+        self.assertEqual(len(rows), 24)
+        self.assertEqual(list(rows[0]), ["year", "month", "H(h)_m", "T2m"])
+        self.assertAlmostEqual(rows[13]["T2m"], series.aggregate("T2m", "month", "mean")["2020-02"], places=1)
+        self.assertEqual(list(monthly.monthly_average("T2m")), list(range(1, 13)))
+
+        subset = Monthly.from_hourly(hourly, startyear=2020, endyear=2020, transport=failing_transport())
+        self.assertEqual(list(subset.yearly_values()), [2020])
+        self.assertEqual(subset.params["startyear"], 2020)
+        self.assertEqual(monthly.params["startyear"], 2019)
+
+    def test_api_fallback(self):
+        transport = transport_for(fixtures.mrcalc({"startyear": 2015, "endyear": 2020}))
+        monthly = Monthly.from_hourly(fetched_hourly(angle=0), startyear=2015, endyear=2020, transport=transport)
+        self.assertEqual(len(monthly.yearly_values("H(h)_m")), 6)
+        self.assertEqual(transport.get.call_count, 1)
+        with self.assertRaises(ValueError):
+            monthly.yearly_values("P")
+
+        # MRcalc returns H(h)_m of all database years, an inclined series or no year range can't match that
+        cases = [
+            Monthly.from_hourly(fetched_hourly(components=False), transport=transport),  # inclined
+            Monthly(45, 9, hourly=fetched_hourly(components=False, angle=0), transport=transport),  # no years
+        ]
+        for monthly in cases:
+            self.assertEqual(list(monthly.yearly_values("H(h)_m")), list(range(2015, 2021)))
+        self.assertEqual(transport.get.call_count, 3)
+
+    def test_async(self):
+        transport = FakeTransport(fixtures.mrcalc({"startyear": 2015, "endyear": 2020}))
+        monthly = AsyncMonthly(45, 9, startyear=2015, endyear=2020, transport=transport)
+        with mock.patch.object(Monthly, "transport", failing_transport()):
+            self.assertEqual(len(asyncio.run(monthly.yearly_values())), 6)
+            self.assertEqual(list(asyncio.run(monthly.monthly_average())), list(range(1, 13)))
+        self.assertEqual(transport.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Metrics, SingleFlight, TMY, Transport
+from src.pvgispy.aio import AsyncTMY
+from src.pvgispy.series import TimeSeries
+from tests.test_aio import FakeTransport, TMY_RESPONSE
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_threads(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def request():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return {"value": len(calls)}
+
+        def caller(_):
+            return flight.do("key", request)
+
+        with ThreadPoolExecutor(6) as executor:
+            first = executor.submit(caller, 0)
+            started.wait()
+            others = [executor.submit(caller, index) for index in range(5)]
+            results = [future.result() for future in [first] + others]
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 5)
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+        # nothing is kept once the request finished
+        self.assertEqual(flight.do("key", request), ({"value": 2}, False))
+
+    def test_errors(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def request():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("failed")
+
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(flight.do, "key", request)]
+            started.wait()
+            futures += [executor.submit(flight.do, "key", request) for _ in range(2)]
+            for future in futures:
+                with self.assertRaises(ValueError):
+                    future.result()
+
+    def test_async(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        async def main():
+            return await asyncio.gather(*[flight.do_async("key", request) for _ in range(5)])
+
+        self.assertEqual(asyncio.run(main()), [(1, False)] + [(1, True)] * 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+
+class TestEndpoints(unittest.TestCase):
+    def test_threads(self):
+        metrics = Metrics()
+        with MockPVGIS(latency=0.2) as server:
+            transport = Transport()
+            self.addCleanup(transport.close)
+            tmys = [TMY(lat=51, lon=9, transport=transport, metrics=metrics) for _ in range(6)]
+            for tmy in tmys:
+                tmy.BASE_URL = server.url
+            with ThreadPoolExecutor(6) as executor:
+                list(executor.map(TMY.fetch_data, tmys))
+            self.assertEqual(server.requests, 1)
+
+        self.assertTrue(all(tmy.data is tmys[0].data for tmy in tmys))
+        self.assertEqual(metrics.summary()["sources"]["shared"], 5)
+
+        tmy = TMY(lat=51, lon=9, transport=transport, single_flight=SingleFlight())
+        self.assertIsNot(tmy.single_flight, TMY.single_flight)
+
+    def test_decode_modes(self):
+        with MockPVGIS(latency=0.2) as server:
+            transport = Transport()
+            self.addCleanup(transport.close)
+            tmys = [TMY(lat=51, lon=9, stream=stream, transport=transport) for stream in (True, False) * 3]
+            for tmy in tmys:
+                tmy.BASE_URL = server.url
+            with ThreadPoolExecutor(6) as executor:
+                list(executor.map(TMY.fetch_data, tmys))
+            self.assertEqual(server.requests, 2)
+
+        for tmy in tmys:
+            self.assertEqual(isinstance(tmy.data["outputs"]["tmy_hourly"], TimeSeries), tmy.stream)
+
+    def test_async(self):
+        transport = FakeTransport(TMY_RESPONSE)
+
+        async def main():
+            tmys = [AsyncTMY(lat=51, lon=9, transport=transport) for _ in range(4)]
+            return await asyncio.gather(*[tmy.yearly_irradiation() for tmy in tmys])
+
+        self.assertEqual(asyncio.run(main()), [2.0] * 4)
+        self.assertEqual(transport.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
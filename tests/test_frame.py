@@ -0,0 +1,58 @@
+"""Offline tests for DataFrame conversion."""
+
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from src.pvgispy import Daily, Hourly, Monthly, TMY
+
+from tests.test_series import hourly_response, transport_for
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+@unittest.skipIf(pd is None, "pandas not installed")
+class TestToFrame(unittest.TestCase):
+    def test_hourly(self):
+        hourly = Hourly(lat=51, lon=9, pvcalculation=False, startyear=2010, endyear=2010, columnar=True,
+                        transport=transport_for(hourly_response(2010, 2010)))
+        df = hourly.to_frame()
+
+        self.assertEqual(len(df), 8760)
+        self.assertEqual(str(df.index.tz), "UTC")
+        self.assertEqual(df.index[1], pd.Timestamp("2010-01-01 01:10", tz="UTC"))
+        self.assertTrue(np.shares_memory(df["P"].to_numpy(), hourly.hourly()["P"]))
+
+    def test_tmy(self):
+        body = {"outputs": {"tmy_hourly": [{"time(UTC)": "20070101:0000", "G(h)": 1.0}]}}
+        df = TMY(lat=51, lon=9, transport=transport_for(body)).to_frame()
+        self.assertEqual(list(df.columns), ["G(h)"])
+        self.assertEqual(df.index[0], pd.Timestamp("2007-01-01", tz="UTC"))
+
+    def test_daily(self):
+        rows = [{"month": month, "time": f"{hour:02d}:00", "G(i)": float(hour)} for month in (1, 2) for hour in range(24)]
+        df = Daily(lat=51, lon=9, month=0, transport=transport_for({"outputs": {"daily_profile": rows}})).to_frame()
+        self.assertEqual(df.loc[(2, pd.Timedelta(hours=13)), "G(i)"], 13.0)
+        self.assertEqual(list(df.columns), ["G(i)"])
+
+    def test_monthly(self):
+        rows = [{"year": 2010, "month": 2, "H(h)_m": 30.5}]
+        df = Monthly(lat=51, lon=9, transport=transport_for({"outputs": {"monthly": rows}})).to_frame()
+        self.assertEqual(df.index[0], pd.Timestamp("2010-02-01"))
+        self.assertEqual(df["H(h)_m"].iloc[0], 30.5)
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_pandas_not_imported(self):
+        code = "import sys; import src.pvgispy; print('pandas' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Tests for the rate governor."""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import RateGovernor, Transport
+from src.pvgispy.aio import AsyncTransport
+
+
+class TestRateGovernor(unittest.TestCase):
+    def test_rate(self):
+        governor = RateGovernor(rate=40, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            governor.release(governor.acquire(), 400)
+        self.assertGreaterEqual(time.monotonic() - start, 10 / 40 * 0.9)
+
+    def test_aimd(self):
+        governor = RateGovernor(rate=20, min_rate=4, max_concurrency=8, burst=300)
+        tickets = [governor.acquire() for _ in range(3)]
+        self.assertEqual(governor.in_flight, 3)
+
+        # requests in flight before the decrease only back off once
+        governor.release(tickets[0], 429)
+        governor.release(tickets[1], 503)
+        governor.release(tickets[2], None)
+        self.assertEqual((governor.concurrency, governor.rate, governor.in_flight), (4, 10, 0))
+        governor.release(governor.acquire(), 500)
+        governor.release(governor.acquire(), 500)
+        self.assertEqual((governor.concurrency, governor.rate), (1, 4))
+
+        governor.release(governor.acquire(), 200)
+        self.assertEqual((governor.concurrency, governor.rate), (2, 4.25))
+        for _ in range(200):
+            governor.release(governor.acquire(), 200)
+        self.assertEqual((governor.concurrency, governor.rate), (8, 20))
+
+        governor.cancel(governor.acquire())
+        self.assertEqual((governor.in_flight, governor.concurrency), (0, 8))
+        with self.assertRaises(ValueError):
+            RateGovernor(rate=1, min_rate=2)
+
+    def test_concurrency_limit(self):
+        governor = RateGovernor(rate=1000, max_concurrency=2)
+        peak = []
+
+        def request(_):
+            ticket = governor.acquire()
+            peak.append(governor.in_flight)
+            time.sleep(0.01)
+            governor.cancel(ticket)
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(request, range(20)))
+        self.assertEqual(max(peak), 2)
+
+    def test_shared_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rate")
+            first, second = RateGovernor(rate=20, burst=2, path=path), RateGovernor(rate=20, burst=2, path=path)
+            first.release(first.acquire(), 429, retry_after="0.2")
+            self.assertEqual(second.rate, 10)
+
+            start = time.monotonic()
+            second.release(second.acquire(), 200)
+            self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_at_max_rate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            governor = RateGovernor(rate=20, burst=300, path=os.path.join(directory, "rate"))
+            updates = []
+            update = governor.bucket.update
+            governor.bucket.update = lambda change: updates.append(change) or update(change)
+
+            # healthy responses at the maximum rate only take tokens
+            for _ in range(5):
+                governor.release(governor.acquire(), 200)
+            self.assertEqual(len(updates), 5)
+            governor.release(governor.acquire(), 503)
+            governor.release(governor.acquire(), 200)
+            self.assertEqual(len(updates), 9)
+            self.assertEqual(governor.rate, 10.1)
+
+    def test_transport(self):
+        with MockPVGIS(rate_limit=20) as server:
+            transport = Transport(retries=5, governor=RateGovernor(rate=15, burst=1))
+            self.addCleanup(transport.close)
+            url = server.url + "DRcalc"
+            with ThreadPoolExecutor(8) as executor:
+                statuses = list(executor.map(lambda lat: transport.get(url, {"lat": lat, "lon": 9, "month": 1,
+                                                                             "outputformat": "json"}).status_code,
+                                             range(40, 52)))
+            self.assertEqual(statuses, [200] * 12)
+            self.assertEqual(server.throttled, 0)
+            self.assertEqual(transport.governor.in_flight, 0)
+
+    def test_async_transport(self):
+        async def fetch(transport, url):
+            responses = await asyncio.gather(*[transport.get(url, {"lat": lat, "lon": 9, "month": 1})
+                                               for lat in range(40, 50)])
+            await transport.aclose()
+            return responses
+
+        with MockPVGIS(rate_limit=20) as server:
+            transport = AsyncTransport(governor=RateGovernor(rate=15, burst=1, max_concurrency=3))
+            responses = asyncio.run(fetch(transport, server.url + "DRcalc"))
+            self.assertEqual([response.status_code for response in responses], [200] * 10)
+            self.assertEqual(server.throttled, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
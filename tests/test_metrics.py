@@ -0,0 +1,105 @@
+"""Tests for the instrumentation hooks, against the local mock PVGIS server."""
+
+import asyncio
+import tempfile
+import unittest
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import Daily, Hourly, Metrics, ResponseCache, Transport, fetch_many
+from src.pvgispy.aio import AsyncDaily, AsyncTransport
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.server = MockPVGIS(error_rate=0.2, seed=1)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.transport = Transport(retries=20, backoff=0.001)
+        self.addCleanup(self.transport.close)
+        self.metrics = Metrics()
+
+    def daily(self, lat, **kwargs):
+        daily = Daily(lat=lat, lon=9, month=6, transport=self.transport, metrics=self.metrics, **kwargs)
+        daily.BASE_URL = self.server.url
+        return daily
+
+    def test_requests(self):
+        records = []
+        self.metrics.subscribe(records.append)
+        cache = ResponseCache(tempfile.mkdtemp())
+
+        self.daily(45, cache=cache).total_irradiance()
+        self.daily(45, cache=cache).total_irradiance()
+
+        summary = self.metrics.summary()
+        self.assertEqual(summary["requests"], 2)
+        self.assertEqual(summary["sources"], {"network": 1, "cache": 1, "site_index": 0, "shared": 0, "derived": 0})
+        self.assertEqual((summary["cache_hits"], summary["cache_misses"]), (1, 1))
+        self.assertEqual(summary["status"], {200: 1})
+        self.assertEqual(summary["retries"], self.server.errors)
+        self.assertGreater(summary["bytes"], 0)
+        self.assertEqual(summary["timings"]["total_irradiance"]["count"], 2)
+        for phase in ("wait", "download", "backoff", "decode", "load", "total"):
+            self.assertIn(phase, summary["timings"])
+
+        self.assertEqual([record["kind"] for record in records], ["request", "operation"] * 2)
+        self.assertEqual(records[0]["endpoint"], "DRcalc")
+        self.assertEqual(self.metrics.flatten()["pvgis.sources.cache"], 1)
+
+    def test_batch_and_errors(self):
+        fetch_many([self.daily(lat) for lat in range(40, 50)], max_workers=4)
+        daily = self.daily(45)
+        daily.ENDPOINT = "unknown"
+        with self.assertRaises(Exception):
+            daily.fetch_data()
+
+        summary = self.metrics.summary()
+        self.assertEqual(summary["requests"], 11)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["status"][404], 1)
+        self.assertEqual(summary["timings"]["total"]["count"], 11)
+
+    def test_stream(self):
+        records = []
+        self.metrics.subscribe(records.append)
+        hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2020, endyear=2020,
+                        stream=True, transport=self.transport, metrics=self.metrics)
+        hourly.BASE_URL = self.server.url
+        hourly.yearly_pv_production()
+
+        timings = self.metrics.summary()["timings"]
+        self.assertNotIn("decode", timings)
+        self.assertIn("download", timings)
+        self.assertIn("yearly_pv_production", timings)
+        self.assertGreater(self.metrics.bytes, 100000)
+
+        # The body parsed while streaming counts as download, so the phases add up to the total.
+        phases = records[0]["phases"]
+        measured = sum(seconds for name, seconds in phases.items() if name != "total")
+        self.assertAlmostEqual(measured, phases["total"], delta=0.05 + 0.1 * phases["total"])
+
+    def test_async(self):
+        async def run():
+            transport = AsyncTransport(retries=20, backoff=0.001)
+            daily = AsyncDaily(lat=45, lon=9, month=6, transport=transport, metrics=self.metrics)
+            daily.api.BASE_URL = self.server.url
+            try:
+                return await daily.total_irradiance()
+            finally:
+                await transport.aclose()
+
+        asyncio.run(run())
+        summary = self.metrics.summary()
+        self.assertEqual(summary["requests"], 1)
+        self.assertGreater(summary["bytes"], 0)
+        self.assertIn("wait", summary["timings"])
+
+    def test_disabled(self):
+        daily = Daily(lat=45, lon=9, month=6, transport=self.transport)
+        daily.BASE_URL = self.server.url
+        daily.total_irradiance()
+        self.assertEqual(self.metrics.requests, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
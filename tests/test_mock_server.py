@@ -0,0 +1,41 @@
+"""End-to-end tests against the local mock PVGIS server used by the benchmarks."""
+
+import unittest
+
+from benchmarks import run
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import TMY, Daily, Hourly, Monthly, Transport
+from src.pvgispy.base import BaseAPI
+
+
+class TestMockServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockPVGIS(error_rate=0.3, seed=3)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.transport = Transport(retries=20, backoff=0.001)
+        self.addCleanup(self.transport.close)
+
+    def endpoint(self, cls, **kwargs):
+        api = cls(transport=self.transport, **kwargs)
+        api.BASE_URL = self.server.url
+        return api
+
+    def test_endpoints_with_errors(self):
+        hourly = self.endpoint(Hourly, lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14,
+                               startyear=2020, endyear=2020, stream=True)
+        self.assertEqual(len(hourly.hourly()), 8784)
+        self.assertEqual(len(self.endpoint(TMY, lat=51, lon=9).hourly()), 8760)
+        self.assertEqual(len(self.endpoint(Daily, lat=51, lon=9, month=0).to_frame()), 288)
+        self.assertEqual(len(self.endpoint(Monthly, lat=51, lon=9).to_frame()), 19 * 12)
+        self.assertGreater(self.server.errors, 0)
+
+    def test_benchmark_report(self):
+        report = run.main(["--repeat", "1", "--years", "1", "--sites", "3", "--output", "/dev/null"])
+        self.assertEqual({result["benchmark"] for result in report["results"]},
+                         {"fetch", "parse", "aggregate", "sites"})
+        self.assertEqual(BaseAPI.BASE_URL, "https://re.jrc.ec.europa.eu/api/v5_3/")
+
+
+if __name__ == '__main__':
+    unittest.main()
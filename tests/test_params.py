@@ -0,0 +1,88 @@
+"""Offline tests for parameter updates, invalidation and memoized results."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.pvgispy import Daily, Hourly, Monthly, TMY
+from tests.test_series import hourly_response, transport_for
+
+DAILY_RESPONSE = {"outputs": {"daily_profile": [{"time": "12:00", "G(i)": 500.0, "Gb(i)": 300.0, "Gd(i)": 200.0}]}}
+
+
+class TestSetParams(unittest.TestCase):
+    def test_updates_take_effect(self):
+        daily = Daily(lat=48, lon=9, month=1, transport=transport_for(DAILY_RESPONSE))
+        daily.set_params(raddatabase="PVGIS-ERA5", month=6)
+        self.assertEqual(daily.params["raddatabase"], "PVGIS-ERA5")
+        self.assertEqual(daily.params["month"], 6)
+
+        monthly = Monthly(lat=48, lon=9)
+        monthly.set_params(startyear=2010, lat=50)
+        self.assertEqual((monthly.params["startyear"], monthly.params["lat"]), (2010, 50))
+
+        tmy = TMY(lat=48, lon=9, columnar=True)
+        tmy.set_params(usehorizon=0)
+        self.assertEqual(tmy.params["usehorizon"], 0)
+        self.assertTrue(tmy.columnar)
+
+    def test_invalidation(self):
+        transport = transport_for(hourly_response(2010, 2010))
+        hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2010, endyear=2010,
+                        transport=transport)
+        hourly.fetch_data()
+        hourly.set_params(angle=0, loss=14)
+        self.assertIsNotNone(hourly.data)
+        self.assertEqual(hourly.version, 0)
+
+        hourly.set_params(angle=30, peakpower=2)
+        self.assertIsNone(hourly.data)
+        self.assertEqual(hourly.version, 1)
+        hourly.hourly()
+        params = transport.get.call_args.kwargs["params"]
+        self.assertEqual((params["angle"], params["peakpower"]), (30, 2))
+
+    def test_validation(self):
+        hourly = Hourly(lat=51, lon=9, pvcalculation=False, startyear=2010, endyear=2010)
+        with self.assertRaises(ValueError):
+            hourly.set_params(startyear=2030)
+        with self.assertRaises(ValueError):
+            hourly.set_params(pvcalculation=True)
+        self.assertEqual(hourly.params["startyear"], 2010)
+        self.assertEqual(hourly.params["pvcalculation"], 0)
+
+
+class TestMemoized(unittest.TestCase):
+    def test_results_are_memoized(self):
+        hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2010, endyear=2010,
+                        transport=transport_for(hourly_response(2010, 2010)))
+        expected = hourly.yearly_pv_production()
+        with mock.patch.object(type(hourly.series()), "aggregate") as aggregate:
+            self.assertEqual(hourly.yearly_pv_production(), expected)
+            aggregate.assert_not_called()
+
+        result = hourly.yearly_pv_production()
+        result[2010] = 0
+        self.assertEqual(hourly.yearly_pv_production(), expected)
+
+        labels = np.zeros(8760)
+        self.assertEqual(hourly.aggregate("P", labels, "count"), {0.0: 8760})
+        self.assertEqual(len(hourly._memo), 1)
+        for _ in range(3):
+            self.assertEqual(hourly.aggregate("P", lambda time: time.astype("datetime64[Y]"), "count"),
+                             {"2010": 8760})
+        self.assertEqual(len(hourly._memo), 1)
+
+    def test_reset_on_new_data(self):
+        daily = Daily(lat=48, lon=9, month=1, transport=transport_for(DAILY_RESPONSE))
+        self.assertEqual(daily.total_irradiance(), 500.0)
+        self.assertEqual(daily.irradiance(as_list=True)["G(i)"], [500.0])
+
+        daily._load({"outputs": {"daily_profile": [{"time": "12:00", "G(i)": 100.0}]}})
+        self.assertEqual(daily.total_irradiance(), 100.0)
+        self.assertEqual(daily.total_irradiance("direct"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
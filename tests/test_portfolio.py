@@ -0,0 +1,95 @@
+"""Tests for the shared-memory portfolio analytics."""
+
+import unittest
+
+import numpy as np
+
+from src.pvgispy import Hourly, pvmodel
+from src.pvgispy.portfolio import Portfolio
+from src.pvgispy.series import TimeSeries
+from tests.test_series import hourly_response, transport_for
+
+
+def site_series(seed, startyear=2019, endyear=2020):
+    series = TimeSeries.from_records(hourly_response(startyear, endyear)["outputs"]["hourly"])
+    rng = np.random.default_rng(seed)
+    series.columns["G(i)"] = rng.uniform(0, 900, len(series)) * (series["G(i)"] > 10)
+    series.columns["T2m"] = rng.normal(12, 8, len(series))
+    series.columns["WS10m"] = rng.uniform(0, 8, len(series))
+    return series
+
+
+class TestPortfolio(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.sites = [site_series(seed) for seed in range(7)]
+        cls.portfolio = Portfolio(cls.sites, max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.portfolio.close()
+
+    def test_layout(self):
+        self.assertEqual(len(self.portfolio), 7)
+        self.assertEqual(self.portfolio.arrays["G(i)"].shape, (7, 8760 + 8784))
+        self.assertEqual(sorted(self.portfolio.arrays), ["G(i)", "Int", "P", "T2m", "WS10m"])
+        np.testing.assert_array_equal(self.portfolio.arrays["T2m"][3], self.sites[3]["T2m"])
+
+    def test_aggregate(self):
+        for by, how, q in [("year", "sum", None), ("month", "mean", None), ("hour", "max", None),
+                           ("month_of_year", "min", None), ("day", "count", None), ("year", "percentile", 90)]:
+            result = self.portfolio.aggregate("G(i)", by, how, q)
+            for index, series in enumerate(self.sites):
+                expected = series.aggregate("G(i)", by, how, q)
+                self.assertEqual(list(result), list(expected))
+                np.testing.assert_allclose([values[index] for values in result.values()], list(expected.values()))
+
+        labels = np.arange(len(self.sites[0])) % 5
+        result = self.portfolio.aggregate("T2m", labels, "mean")
+        self.assertEqual(list(result), [0, 1, 2, 3, 4])
+        self.assertAlmostEqual(result[2][1], self.sites[1].aggregate("T2m", labels, "mean")[2])
+        with self.assertRaises(ValueError):
+            self.portfolio.aggregate("H_sun")
+
+    def test_simulate(self):
+        peakpower = np.arange(1, 8)
+        power = self.portfolio.simulate(peakpower, 14, name="P_sim")
+        for index, series in enumerate(self.sites):
+            np.testing.assert_allclose(power[index], pvmodel.simulate(series, peakpower[index], 14))
+
+        energy = self.portfolio.yearly_energy("P_sim")
+        yields = self.portfolio.specific_yield(peakpower, "P_sim")
+        np.testing.assert_allclose(yields[2019], energy[2019] / 1000 / peakpower)
+        np.testing.assert_allclose(self.portfolio.capacity_factor(peakpower, "P_sim"),
+                                   power.mean(axis=1) / (peakpower * 1000))
+        self.assertEqual(list(self.portfolio.monthly_profile("P_sim")), list(range(1, 13)))
+        with self.assertRaises(ValueError):
+            self.portfolio.simulate(1, 100)
+
+
+class TestBuild(unittest.TestCase):
+    def test_from_apis(self):
+        apis = [Hourly(lat=45, lon=8 + index, pvcalculation=True, peakpower=1, loss=14, startyear=2020,
+                       endyear=2020, columnar=True, transport=transport_for(hourly_response(2020, 2020)))
+                for index in range(3)]
+        with Portfolio(apis, variables=["P"], max_workers=1) as portfolio:
+            self.assertEqual(list(portfolio.arrays), ["P"])
+            self.assertEqual(portfolio.yearly_energy()[2020].tolist(), [apis[0].yearly_pv_production()[2020]] * 3)
+        self.assertEqual(portfolio.arrays, {})
+
+    def test_after_close(self):
+        sites = [site_series(seed, 2020, 2020) for seed in range(2)]
+        with Portfolio(sites, max_workers=1) as portfolio:
+            power = portfolio.simulate(1, 14)
+        self.assertEqual(portfolio.arrays, {})
+        np.testing.assert_allclose(power[1], pvmodel.simulate(sites[1], 1, 14))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Portfolio([])
+        with self.assertRaises(ValueError):
+            Portfolio([site_series(0, 2020, 2020), site_series(0, 2019, 2020)])
+
+
+if __name__ == '__main__':
+    unittest.main()
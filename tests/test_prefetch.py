@@ -0,0 +1,105 @@
+"""Tests for background prefetching."""
+
+import concurrent.futures
+import time
+import unittest
+from unittest import mock
+
+from benchmarks.mock_server import MockPVGIS
+from src.pvgispy import APIError, Daily, Hourly, TMY, Transport
+from src.pvgispy.aio import AsyncTMY
+from src.pvgispy.base import BaseAPI
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.server = MockPVGIS(latency=0.2)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        patcher = mock.patch.multiple(BaseAPI, BASE_URL=self.server.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.transport = Transport()
+        self.addCleanup(self.transport.close)
+
+    def test_overlapping_requests(self):
+        start = time.monotonic()
+        dailies = [Daily(lat=40 + index, lon=9, month=6, transport=self.transport, prefetch=True)
+                   for index in range(10)]
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertFalse(dailies[0].ready())
+
+        self.assertTrue(all(daily.total_irradiance() > 0 for daily in dailies))
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertTrue(all(daily.ready() for daily in dailies))
+        self.assertEqual(self.server.requests, 10)
+
+    def test_result(self):
+        executor = concurrent.futures.ThreadPoolExecutor(2)
+        self.addCleanup(executor.shutdown)
+        daily = Daily(lat=45, lon=9, month=6, transport=self.transport, prefetch=executor)
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            daily.result(timeout=0.01)
+        self.assertIs(daily.result(timeout=5), daily.data)
+        self.assertTrue(daily.ready())
+        self.assertIn("G(i)", daily.irradiance())
+
+        # without a prefetch result fetches synchronously, prefetch does nothing once loaded
+        daily = Daily(lat=46, lon=9, month=6, transport=self.transport)
+        self.assertFalse(daily.ready())
+        self.assertIsNotNone(daily.result())
+        self.assertIs(daily.prefetch(), daily)
+        self.assertEqual(self.server.requests, 2)
+
+        daily = Daily(lat=47, lon=9, month=6, transport=self.transport, prefetch=True, preload=True)
+        self.assertTrue(daily.ready())
+        self.assertEqual(self.server.requests, 3)
+
+    def test_set_params_waits(self):
+        hourly = Hourly(lat=45, lon=9, pvcalculation=False, startyear=2020, endyear=2020, columnar=True,
+                        transport=self.transport, prefetch=True)
+        hourly.set_params(startyear=2019)
+        self.assertIsNone(hourly.data)
+        self.assertEqual(len(hourly.hourly()), 8760 + 8784)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_error(self):
+        transport = mock.Mock()
+        transport.get.return_value = mock.Mock(status_code=400, text="bad request")
+        tmy = TMY(lat=45, lon=9, transport=transport, prefetch=True)
+        with self.assertRaises(APIError):
+            tmy.months_selected()
+
+        transport.get.return_value = mock.Mock(status_code=200, **{"json.return_value": {
+            "inputs": {}, "outputs": {"months_selected": [], "tmy_hourly": []}}})
+        self.assertEqual(tmy.months_selected(), [])
+
+    def test_retry_after_error(self):
+        transport = mock.Mock()
+        transport.get.return_value = mock.Mock(status_code=400, text="bad request")
+        ok = mock.Mock(status_code=200, **{"json.return_value": {
+            "inputs": {}, "outputs": {"months_selected": [1], "tmy_hourly": []}}})
+
+        # a failed prefetch is started again
+        tmy = TMY(lat=45, lon=9, transport=transport, prefetch=True)
+        concurrent.futures.wait([tmy._future])
+        transport.get.return_value = ok
+        tmy.prefetch().result(timeout=5)
+        self.assertEqual(tmy.months_selected(), [1])
+
+        # changed parameters don't raise the error of the old ones
+        transport.get.return_value = mock.Mock(status_code=400, text="bad request")
+        tmy = TMY(lat=45, lon=9, transport=transport, prefetch=True)
+        concurrent.futures.wait([tmy._future])
+        transport.get.return_value = ok
+        tmy.set_params(startyear=2010)
+        self.assertIsNone(tmy._future)
+        self.assertEqual(tmy.months_selected(), [1])
+
+    def test_async_rejected(self):
+        with self.assertRaises(ValueError):
+            AsyncTMY(lat=45, lon=9, prefetch=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Offline tests for the local PV power model."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.pvgispy import Hourly
+from src.pvgispy import pvmodel
+
+ROWS = [
+    {"time": "20100601:1210", "G(i)": 1000.0, "T2m": 25.0 - 1000 / (26.9 + 6.2), "WS10m": 1.0, "P": 860.0},
+    {"time": "20100601:1310", "G(i)": 500.0, "T2m": 20.0, "WS10m": 3.0, "P": 420.0},
+    {"time": "20100601:2310", "G(i)": 0.0, "T2m": 12.0, "WS10m": 2.0, "P": 0.0},
+]
+
+
+class TestPVModel(unittest.TestCase):
+    def test_standard_conditions(self):
+        # At 1000 W/m2 and 25°C module temperature the relative efficiency is 1.
+        efficiency = pvmodel.relative_efficiency([1000.0], [25.0 - 1000 / (26.9 + 6.2)], [1.0])
+        self.assertAlmostEqual(efficiency[0], 1.0)
+        self.assertEqual(pvmodel.relative_efficiency([0.0], [20.0], [1.0])[0], 0.0)
+
+    def test_simulate_configurations(self):
+        single = pvmodel.simulate(ROWS, peakpower=1, loss=14)
+        self.assertEqual(single.shape, (3,))
+        self.assertAlmostEqual(single[0], 860.0)
+        self.assertEqual(single[2], 0.0)
+
+        sweep = pvmodel.simulate(ROWS, peakpower=[1, 2, 2], loss=[14, 14, 0], pvtech=["crystSi", "crystSi", "CdTe"])
+        self.assertEqual(sweep.shape, (3, 3))
+        np.testing.assert_allclose(sweep[1], 2 * single)
+        self.assertNotAlmostEqual(sweep[2][1], sweep[1][1] / 0.86)
+
+        with self.assertRaises(ValueError):
+            pvmodel.simulate(ROWS, peakpower=1, loss=100)
+        with self.assertRaises(ValueError):
+            pvmodel.simulate([{"time": "20100601:1210", "G(i)": 1.0}], peakpower=1, loss=14)
+
+    def test_hourly_simulate_and_compare(self):
+        transport = mock.Mock()
+        transport.get.return_value = mock.Mock(status_code=200, **{"json.return_value": {
+            "inputs": {"meteo_data": {"year_min": 2010, "year_max": 2010}}, "outputs": {"hourly": ROWS}}})
+        hourly = Hourly(lat=51, lon=9, pvcalculation=False, startyear=2010, endyear=2010, transport=transport)
+
+        power = hourly.simulate(peakpower=1, loss=14)
+        comparison = pvmodel.compare(hourly.hourly(), power)
+        self.assertLess(abs(comparison["energy_ratio"] - 1), 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Offline tests for the columnar series storage."""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+from src.pvgispy import Hourly, TMY
+from src.pvgispy.series import TimeSeries, parse_times
+
+
+def hourly_rows(startyear, endyear, time_key="time"):
+    rows = []
+    time = datetime(startyear, 1, 1, 0, 10)
+    while time.year <= endyear:
+        rows.append({time_key: time.strftime("%Y%m%d:%H%M"), "P": float(time.hour), "G(i)": 2.0 * time.hour,
+                     "T2m": 10.5, "Int": 0})
+        time += timedelta(hours=1)
+    return rows
+
+
+def hourly_response(startyear, endyear):
+    return {"inputs": {"meteo_data": {"year_min": startyear, "year_max": endyear}},
+            "outputs": {"hourly": hourly_rows(startyear, endyear)}}
+
+
+def transport_for(body):
+    transport = mock.Mock()
+    transport.get.return_value = mock.Mock(status_code=200, **{"json.return_value": body})
+    return transport
+
+
+class TestTimeSeries(unittest.TestCase):
+    def test_parse_times(self):
+        times = parse_times(["20100101:0010", "20201231:2310"])
+        self.assertEqual(times[0], np.datetime64("2010-01-01T00:10"))
+        self.assertEqual(times[1], np.datetime64("2020-12-31T23:10"))
+        with self.assertRaises(ValueError):
+            parse_times(["2010"])
+
+    def test_rows(self):
+        rows = hourly_rows(2010, 2010)
+        series = TimeSeries.from_records(rows)
+        self.assertEqual(len(series), 8760)
+        self.assertEqual(series[5], rows[5])
+        self.assertEqual(series.to_records(), rows)
+        self.assertEqual(series["P"].dtype, np.float64)
+        self.assertEqual(series[:24].years().tolist(), [2010] * 24)
+
+
+class TestAggregate(unittest.TestCase):
+    def setUp(self):
+        self.series = TimeSeries.from_records(hourly_rows(2010, 2011))
+
+    def test_groupings(self):
+        self.assertEqual(self.series.aggregate("P", "year", "count"), {2010: 8760, 2011: 8760})
+        self.assertEqual(self.series.aggregate("P", "hour", "mean")[13], 13.0)
+        self.assertEqual(len(self.series.aggregate("P", "day")), 730)
+        self.assertEqual(self.series.aggregate("P", "day")["2010-01-01"], sum(range(24)))
+        self.assertEqual(list(self.series.aggregate("P", "month"))[:2], ["2010-01", "2010-02"])
+        self.assertEqual(self.series.aggregate("P", "month_of_year", "count")[2], 2 * 28 * 24)
+        self.assertEqual(self.series.aggregate("G(i)", "year", "max"), {2010: 46.0, 2011: 46.0})
+        self.assertEqual(self.series.aggregate("G(i)", "year", "min"), {2010: 0.0, 2011: 0.0})
+        self.assertEqual(self.series.aggregate("P", "year", "percentile", q=50), {2010: 11.5, 2011: 11.5})
+
+    def test_custom_groups(self):
+        night = self.series.aggregate("P", lambda time: self.series["G(i)"] == 0, "count")
+        self.assertEqual(night, {False: 23 * 730, True: 730})
+        with self.assertRaises(ValueError):
+            self.series.aggregate("P", by=[1, 2])
+        with self.assertRaises(ValueError):
+            self.series.aggregate("X")
+        with self.assertRaises(ValueError):
+            self.series.aggregate("P", how="median")
+
+
+class TestColumnar(unittest.TestCase):
+    def test_hourly(self):
+        body = hourly_response(2010, 2011)
+        rows = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2010, endyear=2011,
+                      transport=transport_for(body))
+        columns = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2010, endyear=2011,
+                         columnar=True, transport=transport_for(body))
+
+        self.assertIsInstance(columns.hourly(), TimeSeries)
+        self.assertIsInstance(body["outputs"]["hourly"], list)
+        self.assertEqual(columns.yearly_pv_production(), rows.yearly_pv_production())
+
+    def test_tmy(self):
+        body = {"outputs": {"tmy_hourly": [{"time(UTC)": "20070101:0000", "G(h)": 1.0, "Gd(h)": 0.5},
+                                           {"time(UTC)": "20070101:0100", "G(h)": 2.0, "Gd(h)": 0.25}]}}
+        tmy = TMY(lat=51, lon=9, columnar=True, transport=transport_for(body))
+        self.assertEqual(tmy.yearly_irradiation(), 3.0)
+        self.assertEqual(tmy.yearly_irradiation("diffuse"), 0.75)
+        self.assertEqual(tmy.yearly_irradiation("direct"), 0)
+        self.assertEqual(tmy.hourly()[1]["time(UTC)"], "20070101:0100")
+        with self.assertRaises(ValueError):
+            tmy.yearly_irradiation("reflected")
+
+
+if __name__ == '__main__':
+    unittest.main()
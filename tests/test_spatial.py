@@ -0,0 +1,86 @@
+"""Offline tests for coordinate snapping and the site index."""
+
+import unittest
+from unittest import mock
+
+from src.pvgispy import SiteIndex, TMY
+from src.pvgispy.spatial import distance, snap
+
+
+def counting_transport():
+    transport = mock.Mock()
+    transport.get.side_effect = lambda url, params=None, stream=False: mock.Mock(
+        status_code=200, **{"json.return_value": {"inputs": {"location": {"latitude": params["lat"]}},
+                                                  "outputs": {"tmy_hourly": []}}})
+    return transport
+
+
+class TestSnap(unittest.TestCase):
+    def test_snap(self):
+        self.assertEqual(snap(51.00001, 9.00002), snap(51.00002, 9.04))
+        self.assertEqual(snap(51.00001, 9.00002), (51.025, 9.025))
+        self.assertEqual(snap(51.1, 9.1, "PVGIS-ERA5"), (51.125, 9.125))
+        self.assertEqual(snap(-0.01, -179.99, resolution=1), (-0.5, -179.5))
+
+    def test_snapped_requests(self):
+        first = TMY(lat=51.00001, lon=9.00002, snap=True)
+        second = TMY(lat=51.00002, lon=9.00001, snap=True)
+        self.assertEqual(first.params, second.params)
+        self.assertEqual(TMY(lat=51.00001, lon=9, snap=0.5).lat, 51.25)
+
+
+class TestSiteIndex(unittest.TestCase):
+    def test_nearest_within_tolerance(self):
+        index = SiteIndex(tolerance=2)
+        index.add("tmy", {"lat": 51.0, "lon": 9.0, "usehorizon": 1}, "a")
+        index.add("tmy", {"lat": 51.01, "lon": 9.0, "usehorizon": 1}, "b")
+
+        self.assertEqual(index.nearest("tmy", {"lat": 51.009, "lon": 9.001, "usehorizon": 1})[1], "b")
+        self.assertIsNone(index.nearest("tmy", {"lat": 51.009, "lon": 9.001, "usehorizon": 0}))
+        self.assertIsNone(index.nearest("tmy", {"lat": 51.1, "lon": 9.0, "usehorizon": 1}))
+        self.assertEqual((index.hits, index.misses), (1, 2))
+
+    def test_high_latitude(self):
+        index = SiteIndex(tolerance=5)
+        index.add("tmy", {"lat": 80.0, "lon": 10.0}, "a")
+        self.assertLess(distance(80, 10, 80, 10.2), 5)
+        self.assertEqual(index.nearest("tmy", {"lat": 80.0, "lon": 10.2})[1], "a")
+
+    def test_fetch_uses_index(self):
+        transport = counting_transport()
+        index = SiteIndex(tolerance=1)
+        TMY(lat=51.0, lon=9.0, transport=transport, site_index=index).fetch_data()
+        nearby = TMY(lat=51.005, lon=9.0, transport=transport, site_index=index)
+        nearby.fetch_data()
+        TMY(lat=52.0, lon=9.0, transport=transport, site_index=index).fetch_data()
+
+        self.assertEqual(transport.get.call_count, 2)
+        self.assertEqual(nearby.data["inputs"]["location"]["latitude"], 51.0)
+        self.assertEqual(len(index), 2)
+
+    def test_replace_and_evict(self):
+        index = SiteIndex(tolerance=1, max_sites=2)
+        index.add("tmy", {"lat": 51.0, "lon": 9.0}, "a")
+        index.add("tmy", {"lat": 51.0, "lon": 9.0}, "b")
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.nearest("tmy", {"lat": 51.0, "lon": 9.0})[1], "b")
+
+        index.add("tmy", {"lat": 52.0, "lon": 9.0}, "c")
+        index.nearest("tmy", {"lat": 51.0, "lon": 9.0})
+        index.add("tmy", {"lat": 53.0, "lon": 9.0}, "d")
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.nearest("tmy", {"lat": 52.0, "lon": 9.0}))
+        self.assertEqual(index.nearest("tmy", {"lat": 51.0, "lon": 9.0})[1], "b")
+
+    def test_cache_hits_not_added(self):
+        transport = counting_transport()
+        index = SiteIndex(tolerance=1)
+        cache = mock.Mock()
+        cache.get.side_effect = [None] + [{"inputs": {}, "outputs": {"tmy_hourly": []}}] * 4
+        for _ in range(5):
+            TMY(lat=51.0, lon=9.0, transport=transport, site_index=index, cache=cache).fetch_data()
+        self.assertEqual((transport.get.call_count, len(index)), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
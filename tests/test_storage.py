@@ -0,0 +1,81 @@
+"""Offline tests for binary export and import."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.pvgispy import Daily, Hourly
+from src.pvgispy.base import BaseAPI
+from src.pvgispy.series import TimeSeries
+
+from tests.test_series import hourly_response, transport_for
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=2, loss=14, startyear=2010, endyear=2011,
+                             transport=transport_for(hourly_response(2010, 2011)), usehorizon=0)
+        self.hourly.fetch_data()
+
+    def roundtrip(self, name, **kwargs):
+        path = os.path.join(self.tmp.name, name)
+        self.hourly.export(path, **kwargs)
+        loaded = BaseAPI.from_file(path, transport=mock.Mock())
+        self.assertIsInstance(loaded, Hourly)
+        self.assertEqual(loaded.params, self.hourly.params)
+        self.assertEqual(loaded.yearly_pv_production(), self.hourly.yearly_pv_production())
+        self.assertEqual(loaded.hourly().to_records(), self.hourly.hourly())
+        loaded.transport.get.assert_not_called()
+        return loaded
+
+    def test_npz(self):
+        loaded = self.roundtrip("site.npz")
+        self.assertNotIsInstance(loaded.hourly()["P"], np.memmap)
+
+    def test_npz_mmap(self):
+        loaded = self.roundtrip("site.npz", compress=False)
+        self.assertIsInstance(loaded.hourly()["P"].base, np.memmap)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not installed")
+    def test_arrow_and_parquet(self):
+        self.roundtrip("site.arrow", compress=False)
+        self.roundtrip("site.feather")
+        self.roundtrip("site.parquet")
+
+    def test_json_and_load_data(self):
+        path = os.path.join(self.tmp.name, "site.json")
+        self.hourly.export(path)
+        hourly = Hourly(lat=51, lon=9, pvcalculation=False, startyear=2010, endyear=2011)
+        hourly.load_data(path)
+        self.assertEqual(hourly.hourly(), self.hourly.hourly())
+
+    def test_daily_and_wrong_class(self):
+        daily = Daily(lat=51, lon=9, month=3, transport=transport_for({"outputs": {"daily_profile": [{"G(i)": 1.0}]}}))
+        path = os.path.join(self.tmp.name, "daily.npz")
+        daily.export(path)
+
+        loaded = Daily.from_file(path)
+        self.assertEqual(loaded.month, 3)
+        self.assertEqual(loaded.total_irradiance(), 1.0)
+        with self.assertRaises(ValueError):
+            Hourly.from_file(path)
+        self.assertIsInstance(Hourly.from_file(self._hourly_file()).hourly(), TimeSeries)
+
+    def _hourly_file(self):
+        path = os.path.join(self.tmp.name, "hourly.npz")
+        self.hourly.export(path)
+        return path
+
+
+if __name__ == '__main__':
+    unittest.main()
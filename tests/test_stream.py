@@ -0,0 +1,66 @@
+"""Offline tests for streaming json parsing."""
+
+import json
+import unittest
+from unittest import mock
+
+from src.pvgispy import Hourly, TMY
+from src.pvgispy.series import TimeSeries
+from src.pvgispy.stream import SeriesStream, read_series
+
+from tests.test_series import hourly_response
+
+
+def chunked(body, size):
+    raw = json.dumps(body).encode("utf-8")
+    return [raw[start:start + size] for start in range(0, len(raw), size)]
+
+
+def streaming_transport(body, size=7):
+    response = mock.Mock(status_code=200)
+    response.iter_content.side_effect = lambda chunk_size: iter(chunked(body, size))
+    transport = mock.Mock()
+    transport.get.return_value = response
+    return transport
+
+
+class TestStream(unittest.TestCase):
+    def test_rows_and_document(self):
+        body = hourly_response(2010, 2010)
+        body["meta"] = {"inputs": {"lat": "ünïcode"}}
+        stream = SeriesStream(chunked(body, 61), "hourly")
+
+        rows = list(stream)
+        self.assertEqual(rows, body["outputs"]["hourly"])
+        self.assertEqual(stream.document["inputs"], body["inputs"])
+        self.assertEqual(stream.document["meta"], body["meta"])
+        self.assertIsNone(stream.document["outputs"]["hourly"])
+
+    def test_read_series(self):
+        body = {"inputs": {"n": 12345}, "outputs": {"tmy_hourly": [{"time(UTC)": "20070101:0000", "G(h)": -1.25e2}],
+                                                    "months_selected": []}}
+        document = read_series(chunked(body, 3), "tmy_hourly")
+        self.assertEqual(document["inputs"]["n"], 12345)
+        self.assertEqual(document["outputs"]["tmy_hourly"].to_records(), body["outputs"]["tmy_hourly"])
+
+    def test_hourly_stream(self):
+        body = hourly_response(2010, 2011)
+        hourly = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2010, endyear=2011,
+                        stream=True, transport=streaming_transport(body, 4096))
+        reference = Hourly(lat=51, lon=9, pvcalculation=True, peakpower=1, loss=14, startyear=2010, endyear=2011,
+                           transport=mock.Mock(**{"get.return_value": mock.Mock(status_code=200, **{
+                               "json.return_value": body})}))
+
+        self.assertIsInstance(hourly.hourly(), TimeSeries)
+        self.assertEqual(hourly.yearly_pv_production(), reference.yearly_pv_production())
+        self.assertTrue(hourly.transport.get.call_args.kwargs["stream"])
+
+    def test_iter_hourly(self):
+        body = {"outputs": {"tmy_hourly": [{"time(UTC)": "20070101:0000", "G(h)": 1.0}]}}
+        tmy = TMY(lat=51, lon=9, transport=streaming_transport(body))
+        self.assertEqual(list(tmy.iter_hourly()), body["outputs"]["tmy_hourly"])
+        tmy.transport.get.return_value.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
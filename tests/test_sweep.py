@@ -0,0 +1,59 @@
+"""Offline tests for the orientation sweep."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.pvgispy import Hourly, OrientationSweep
+from src.pvgispy.sweep import solar_position
+
+from tests.test_series import hourly_rows
+
+
+def component_response(lat, lon):
+    rows = hourly_rows(2010, 2010)
+    times = np.array([np.datetime64(f"{r['time'][:4]}-{r['time'][4:6]}-{r['time'][6:8]}T{r['time'][9:11]}:"
+                                    f"{r['time'][11:]}") for r in rows])
+    elevation, _ = solar_position(times, lat, lon)
+    for row, h in zip(rows, elevation):
+        up = max(np.sin(h), 0)
+        row.update({"Gb(i)": 700 * up, "Gd(i)": 120.0 if up else 0.0, "Gr(i)": 0.0, "H_sun": np.degrees(h),
+                    "T2m": 15.0, "WS10m": 2.0})
+        del row["P"], row["G(i)"]
+    return {"inputs": {"meteo_data": {"year_min": 2010, "year_max": 2010}}, "outputs": {"hourly": rows}}
+
+
+class TestOrientationSweep(unittest.TestCase):
+    def setUp(self):
+        transport = mock.Mock()
+        transport.get.return_value = mock.Mock(status_code=200,
+                                               **{"json.return_value": component_response(51, 9)})
+        self.sweep = OrientationSweep.for_site(51, 9, 2010, 2010, transport=transport)
+        self.transport = transport
+
+    def test_solar_position(self):
+        elevation, azimuth = solar_position(np.array(["2010-06-21T11:24"], dtype="datetime64[m]"), 51, 9)
+        self.assertAlmostEqual(np.degrees(elevation[0]), 62.4, delta=0.5)
+        self.assertAlmostEqual(np.degrees(azimuth[0]), 0, delta=3)
+
+    def test_horizontal_matches_components(self):
+        series = self.sweep.hourly.hourly()
+        irradiance = self.sweep.plane_irradiance([0], [0])[0, 0]
+        np.testing.assert_allclose(irradiance, series["Gb(i)"] + series["Gd(i)"], atol=1e-6)
+
+    def test_optimum_faces_south(self):
+        best = self.sweep.optimum()
+        self.assertEqual(best["aspect"], 0)
+        self.assertTrue(25 <= best["angle"] <= 50)
+        self.assertEqual(self.sweep.irradiation([0, 30, 60], [-90, 0, 90]).shape, (3, 3))
+        self.assertEqual(self.transport.get.call_count, 1)
+
+    def test_requires_components(self):
+        hourly = Hourly(lat=51, lon=9, pvcalculation=False, angle=30, startyear=2010, endyear=2010)
+        with self.assertRaises(ValueError):
+            OrientationSweep(hourly)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Offline tests for the HTTP transport."""
+
+import datetime
+import os
+import unittest
+from unittest import mock
+
+import requests
+
+from src.pvgispy import APIError, TMY, Transport
+from src.pvgispy.transport import parse_retry_after
+
+
+def response(status_code, headers=None, body=None):
+    return mock.Mock(status_code=status_code, headers=headers or {}, text="error",
+                     elapsed=datetime.timedelta(seconds=0.25), **{"json.return_value": body})
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        sleep = mock.patch("src.pvgispy.transport.time.sleep")
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_retries_transient_errors(self):
+        transport = Transport(retries=3)
+        session = mock.Mock()
+        session.get.side_effect = [requests.ConnectionError(), response(503), response(429, {"Retry-After": "7"}),
+                                   response(200, body={"ok": 1})]
+        transport._session, transport._pid = session, os.getpid()
+
+        result = transport.get("url")
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(session.get.call_count, 4)
+        self.assertEqual(self.sleep.call_args_list[-1], mock.call(7.0))
+        self.assertEqual(result.retries, 3)
+        self.assertEqual(result.timings["wait"], 0.25)
+        self.assertGreaterEqual(result.timings["backoff"], 7.0)
+
+    def test_retried_responses(self):
+        transport = Transport(retries=2, max_backoff=10)
+        session = mock.Mock()
+        retried = [response(503), response(429, {"Retry-After": "3600"})]
+        session.get.side_effect = retried + [response(200)]
+        transport._session, transport._pid = session, os.getpid()
+
+        result = transport.get("url", stream=True)
+        self.assertEqual(self.sleep.call_args_list[-1], mock.call(10))
+        for retry in retried:
+            retry.close.assert_called_once_with()
+        result.close.assert_not_called()
+
+    def test_gives_up(self):
+        transport = Transport(retries=1)
+        session = mock.Mock()
+        session.get.return_value = response(500)
+        transport._session, transport._pid = session, os.getpid()
+
+        tmy = TMY(lat=51, lon=9, transport=transport)
+        with self.assertRaises(APIError) as error:
+            tmy.fetch_data()
+        self.assertEqual(error.exception.status_code, 500)
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_session_per_process(self):
+        transport = Transport(pool_size=2)
+        self.assertIs(transport.session, transport.session)
+        self.assertEqual(transport.session.headers["Accept-Encoding"], "gzip, deflate")
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+if __name__ == '__main__':
+    unittest.main()